@@ -0,0 +1,173 @@
+"""
+Disk-backed PCM audio read in bounded blocks, with block-wise downmixing and polyphase resampling
+"""
+import os
+import math
+import logging
+from typing import Iterator, Optional, Tuple, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Samples per block when converting, scanning or copying audio.
+AUDIO_BLOCK_SECONDS = float(os.getenv("AUDIO_BLOCK_SECONDS", "30"))
+# Longest window of audio handed to Whisper in one call.
+AUDIO_WINDOW_SECONDS = float(os.getenv("AUDIO_WINDOW_SECONDS", "600"))
+
+PCM_DTYPE = np.float32
+
+
+class PcmFile:
+    """Mono float32 PCM in a raw file, sliced like an array without loading the whole recording.
+
+    Only the requested range is read, so memory use depends on the slice, not the lecture length.
+    """
+
+    def __init__(self, path: str, sample_rate: int):
+        self.path = path
+        self.sample_rate = sample_rate
+        self._samples = os.path.getsize(path) // PCM_DTYPE().itemsize
+
+    def __len__(self) -> int:
+        return self._samples
+
+    @property
+    def duration(self) -> float:
+        return self._samples / self.sample_rate
+
+    def read(self, start: int, end: int) -> np.ndarray:
+        start = max(0, min(start, self._samples))
+        end = max(start, min(end, self._samples))
+        with open(self.path, "rb") as f:
+            f.seek(start * PCM_DTYPE().itemsize)
+            return np.fromfile(f, dtype=PCM_DTYPE, count=end - start)
+
+    def __getitem__(self, key: slice) -> np.ndarray:
+        if not isinstance(key, slice) or key.step not in (None, 1):
+            raise TypeError("PcmFile supports contiguous slices only")
+        start, end, _ = key.indices(self._samples)
+        return self.read(start, end)
+
+    def blocks(self, block_samples: int, start: int = 0, end: Optional[int] = None) -> Iterator[Tuple[int, np.ndarray]]:
+        """Yield (offset, samples) for consecutive blocks of [start, end)."""
+        end = self._samples if end is None else min(end, self._samples)
+        for offset in range(start, end, max(1, block_samples)):
+            yield offset, self.read(offset, min(offset + block_samples, end))
+
+
+AudioData = Union[np.ndarray, PcmFile]
+
+
+def iter_blocks(audio: AudioData, block_samples: int, start: int = 0, end: Optional[int] = None) -> Iterator[Tuple[int, np.ndarray]]:
+    """Blocks of an in-memory array (as views) or of a PcmFile (as reads)."""
+    if isinstance(audio, PcmFile):
+        yield from audio.blocks(block_samples, start, end)
+        return
+    end = len(audio) if end is None else min(end, len(audio))
+    for offset in range(start, end, max(1, block_samples)):
+        yield offset, audio[offset:min(offset + block_samples, end)]
+
+
+class PcmWriter:
+    """Appends float32 blocks to a raw PCM file and hands back a PcmFile when closed."""
+
+    def __init__(self, path: str, sample_rate: int):
+        self.path = path
+        self.sample_rate = sample_rate
+        self._file = open(path, "wb")
+
+    def write(self, samples: np.ndarray) -> None:
+        np.asarray(samples, dtype=PCM_DTYPE).tofile(self._file)
+
+    def close(self) -> PcmFile:
+        self._file.close()
+        return PcmFile(self.path, self.sample_rate)
+
+    def __enter__(self) -> "PcmWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if not self._file.closed:
+            self._file.close()
+        if exc_type is not None and os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class StreamingResampler:
+    """Polyphase resampling of a signal that arrives in blocks.
+
+    Output matches scipy.signal.resample_poly over the whole signal: each block is filtered with
+    enough input on either side to cover the filter, and only the outputs those samples fully
+    determine are emitted.
+    """
+
+    def __init__(self, from_rate: int, to_rate: int):
+        divisor = math.gcd(from_rate, to_rate)
+        self.up = to_rate // divisor
+        self.down = from_rate // divisor
+        # resample_poly's default filter spans 10 * max(up, down) taps each side at the upsampled rate.
+        context = 10 * max(self.up, self.down) / self.up + 1
+        self._pad = self.down * math.ceil(context / self.down)
+        self._buffer = np.zeros(0, dtype=PCM_DTYPE)
+        self._base = 0
+        self._emitted_input = 0
+        self._emitted_output = 0
+        self._total_input = 0
+
+    def _filter(self, samples: np.ndarray) -> np.ndarray:
+        from scipy import signal
+        return signal.resample_poly(samples, self.up, self.down).astype(PCM_DTYPE)
+
+    def feed(self, samples: np.ndarray) -> np.ndarray:
+        """Add the next input block; returns the output samples that are now final."""
+        self._buffer = np.concatenate((self._buffer, np.asarray(samples, dtype=PCM_DTYPE)))
+        self._total_input += len(samples)
+        ready = (self._total_input - self._pad) // self.down * self.down
+        if ready <= self._emitted_input:
+            return np.zeros(0, dtype=PCM_DTYPE)
+
+        filtered = self._filter(self._buffer[:ready + self._pad - self._base])
+        first = (self._emitted_input - self._base) * self.up // self.down
+        last = (ready - self._base) * self.up // self.down
+        output = filtered[first:last]
+        self._emitted_input = ready
+        self._emitted_output += len(output)
+
+        new_base = max(0, ready - self._pad)
+        self._buffer = self._buffer[new_base - self._base:]
+        self._base = new_base
+        return output
+
+    def flush(self) -> np.ndarray:
+        """The remaining output once the input has ended."""
+        total_output = -(-self._total_input * self.up // self.down)
+        if not len(self._buffer) or total_output <= self._emitted_output:
+            return np.zeros(0, dtype=PCM_DTYPE)
+        filtered = self._filter(self._buffer)
+        first = (self._emitted_input - self._base) * self.up // self.down
+        output = filtered[first:first + total_output - self._emitted_output]
+        self._emitted_output += len(output)
+        self._buffer = np.zeros(0, dtype=PCM_DTYPE)
+        return output
+
+
+def convert_audio_file(audio_path: str, output_path: str, sample_rate: int) -> PcmFile:
+    """Convert an audio file to mono float32 PCM at sample_rate, one block at a time.
+
+    Each block is read as float32, averaged across channels and resampled before the next is
+    read, so memory use stays at a few blocks whatever the recording's length.
+    """
+    import soundfile as sf
+
+    with sf.SoundFile(audio_path) as source, PcmWriter(output_path, sample_rate) as writer:
+        resampler = StreamingResampler(source.samplerate, sample_rate) if source.samplerate != sample_rate else None
+        block_frames = max(1, int(AUDIO_BLOCK_SECONDS * source.samplerate))
+        for block in source.blocks(blocksize=block_frames, dtype="float32", always_2d=True):
+            mono = block.mean(axis=1, dtype=PCM_DTYPE) if block.shape[1] > 1 else block[:, 0]
+            writer.write(resampler.feed(mono) if resampler else mono)
+        if resampler:
+            writer.write(resampler.flush())
+        pcm = writer.close()
+    logger.info(f"Audio converted to {sample_rate}Hz mono PCM ({pcm.duration:.1f}s): {output_path}")
+    return pcm
@@ -0,0 +1,190 @@
+"""
+Batches of lectures submitted together, tracked as one unit with aggregate throughput
+"""
+import os
+import time
+import uuid
+import logging
+import threading
+from pathlib import Path
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+from .jobs import Job, JobNotFoundError, JobQueue, JobQueueFullError
+
+logger = logging.getLogger(__name__)
+
+BATCH_MAX_LECTURES = int(os.getenv("BATCH_MAX_LECTURES", "50"))
+# Directory that manifest paths must live under; manifests are refused when unset.
+BATCH_MANIFEST_ROOT = os.getenv("BATCH_MANIFEST_ROOT", "")
+
+
+class BatchNotFoundError(Exception):
+    """Raised when a batch id is unknown or has expired."""
+    pass
+
+
+class BatchPartiallyQueuedError(Exception):
+    """Raised when queueing stops partway through a batch; batch holds the lectures that were queued."""
+
+    def __init__(self, batch: "Batch", error: Exception):
+        super().__init__(f"Queued {len(batch.jobs)} lectures of the batch, then: {error}")
+        self.batch = batch
+        self.error = error
+
+
+class InvalidManifestPathError(ValueError):
+    """Raised when a manifest names a file outside BATCH_MANIFEST_ROOT or one that does not exist."""
+    pass
+
+
+class ManifestLecture(BaseModel):
+    title: str
+    video_path: str
+    slides_path: Optional[str] = None
+
+
+class BatchManifest(BaseModel):
+    lectures: List[ManifestLecture]
+    whisper_tier: Optional[str] = None
+
+
+def resolve_manifest_path(path: str, root: str = BATCH_MANIFEST_ROOT) -> Path:
+    """The real path of a manifest entry, which must be an existing file under root."""
+    if not root:
+        raise InvalidManifestPathError("Manifest batches are disabled; set BATCH_MANIFEST_ROOT")
+    root_path = Path(root).resolve()
+    resolved = (root_path / path).resolve()
+    if resolved != root_path and root_path not in resolved.parents:
+        raise InvalidManifestPathError(f"Path is outside the manifest root: {path}")
+    if not resolved.is_file():
+        raise InvalidManifestPathError(f"File not found: {path}")
+    return resolved
+
+
+class Batch:
+    """The jobs of one batch and the Whisper tier they share."""
+
+    def __init__(self, batch_id: str, whisper_tier: str, jobs: List[Job]):
+        self.batch_id = batch_id
+        self.whisper_tier = whisper_tier
+        self.jobs = jobs
+        self.created_at = time.time()
+
+    @property
+    def finished(self) -> bool:
+        return all(job.finished for job in self.jobs)
+
+    @property
+    def finished_at(self) -> Optional[float]:
+        if not self.finished:
+            return None
+        return max((job.finished_at or self.created_at) for job in self.jobs)
+
+    def to_dict(self) -> dict:
+        """Per-lecture state plus throughput: audio transcribed per wall-clock time since submission."""
+        counts = {status: 0 for status in (Job.QUEUED_STATUS, Job.RUNNING_STATUS) + Job.FINISHED_STATUSES}
+        lectures = []
+        audio_seconds = 0.0
+        for job in self.jobs:
+            result = job.result or {}
+            lecture_audio = (result.get("transcription") or {}).get("audio_seconds")
+            if job.status == Job.COMPLETED_STATUS and result.get("status") != "completed":
+                # The job ran, but the lecture itself failed.
+                status = Job.FAILED_STATUS
+            else:
+                status = job.status
+            counts[status] += 1
+            audio_seconds += lecture_audio or 0.0
+            lectures.append({
+                "job_id": job.job_id,
+                "lecture_id": job.lecture_id,
+                "title": job.title,
+                "status": status,
+                "audio_seconds": lecture_audio,
+                "error": job.error or result.get("error"),
+            })
+
+        wall_seconds = (self.finished_at or time.time()) - self.created_at
+        return {
+            "batch_id": self.batch_id,
+            "status": Job.COMPLETED_STATUS if self.finished else Job.RUNNING_STATUS,
+            "whisper_tier": self.whisper_tier,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "counts": counts,
+            "lectures": lectures,
+            "audio_seconds": round(audio_seconds, 1),
+            "wall_seconds": round(wall_seconds, 1),
+            "audio_hours_per_hour": round(audio_seconds / wall_seconds, 2) if wall_seconds > 0 else None,
+        }
+
+
+class BatchRegistry:
+    """Submits a batch's lectures to the job queue in order and keeps track of them."""
+
+    def __init__(self, job_queue: JobQueue, max_lectures: int = BATCH_MAX_LECTURES):
+        self.job_queue = job_queue
+        self.max_lectures = max_lectures
+        self._batches: dict = {}
+        self._lock = threading.Lock()
+
+    def _prune_locked(self) -> None:
+        cutoff = time.time() - self.job_queue.result_ttl
+        expired = [
+            batch_id for batch_id, batch in self._batches.items()
+            if batch.finished and batch.finished_at < cutoff
+        ]
+        for batch_id in expired:
+            del self._batches[batch_id]
+
+    def check_capacity(self, count: int) -> None:
+        """Raise before any file is saved if the batch could not be queued whole."""
+        if count > self.max_lectures:
+            raise JobQueueFullError(f"Batch has {count} lectures, the limit is {self.max_lectures}")
+        pending = self.job_queue.pending_count()
+        if pending + count > self.job_queue.max_pending:
+            raise JobQueueFullError(
+                f"Batch of {count} lectures does not fit the queue ({pending} of {self.job_queue.max_pending} in progress)"
+            )
+
+    def submit(self, lectures: List[tuple], whisper_tier: str) -> Batch:
+        """Queue (lecture_id, title, payload) entries in order; all of them share whisper_tier.
+
+        If the queue refuses a lecture after others were queued, the batch keeps the queued ones
+        and BatchPartiallyQueuedError reports how far it got.
+        """
+        self.check_capacity(len(lectures))
+        batch_id = str(uuid.uuid4())
+        jobs = []
+        batch = Batch(batch_id, whisper_tier, jobs)
+        with self._lock:
+            self._prune_locked()
+            self._batches[batch_id] = batch
+        try:
+            for lecture_id, title, payload in lectures:
+                jobs.append(self.job_queue.submit(
+                    lecture_id, title, {**payload, "batch_id": batch_id, "whisper_tier": whisper_tier}
+                ))
+        except Exception as e:
+            if not jobs:
+                with self._lock:
+                    self._batches.pop(batch_id, None)
+                raise
+            logger.warning(f"Batch partially queued | Batch: {batch_id} | Lectures: {len(jobs)}/{len(lectures)} | Error: {str(e)}")
+            raise BatchPartiallyQueuedError(batch, e) from e
+        logger.info(f"Batch queued | Batch: {batch_id} | Lectures: {len(jobs)} | Whisper tier: {whisper_tier}")
+        return batch
+
+    def get(self, batch_id: str) -> Batch:
+        with self._lock:
+            batch = self._batches.get(batch_id)
+        if batch is None:
+            raise BatchNotFoundError(f"Batch not found: {batch_id}")
+        for index, job in enumerate(batch.jobs):
+            try:
+                batch.jobs[index] = self.job_queue.get(job.job_id)
+            except JobNotFoundError:
+                pass
+        return batch
@@ -0,0 +1,207 @@
+"""
+Content-addressed, size-bounded caches of lecture pipeline artifacts and Gemini replies
+"""
+import os
+import json
+import time
+import hashlib
+import logging
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+RESULT_CACHE_ENABLED = os.getenv("RESULT_CACHE_ENABLED", "true").lower() == "true"
+RESULT_CACHE_MAX_BYTES = int(os.getenv("RESULT_CACHE_MAX_MB", "512")) * 1024 * 1024
+HASH_CHUNK_SIZE = 1024 * 1024
+GEMINI_RESPONSE_CACHE_ENABLED = os.getenv("GEMINI_RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+GEMINI_RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("GEMINI_RESPONSE_CACHE_TTL_SECONDS", "86400"))
+GEMINI_RESPONSE_CACHE_MAX_BYTES = int(os.getenv("GEMINI_RESPONSE_CACHE_MAX_MB", "64")) * 1024 * 1024
+
+
+def file_sha256(path: str) -> str:
+    """Hash a file in fixed-size chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def make_cache_key(*parts: Any) -> str:
+    """Derive a stable key from input hashes and version identifiers."""
+    return hashlib.sha256("|".join("" if part is None else str(part) for part in parts).encode()).hexdigest()
+
+
+class ResultCache:
+    """JSON artifacts stored by key on disk, evicted least recently used first."""
+
+    def __init__(self, root: Path, max_bytes: int = RESULT_CACHE_MAX_BYTES):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._hits: dict = {}
+        self._misses: dict = {}
+        self._evictions = 0
+        self._size = sum(path.stat().st_size for path in self._entries())
+
+    def _entries(self) -> list:
+        return [path for path in self.root.glob("*/*/*.json") if path.is_file()]
+
+    def _path(self, namespace: str, key: str) -> Path:
+        return self.root / namespace / key[:2] / f"{key}.json"
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        """Return a cached value, or None on a miss."""
+        path = self._path(namespace, key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                value = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            with self._lock:
+                self._misses[namespace] = self._misses.get(namespace, 0) + 1
+            return None
+
+        with self._lock:
+            self._hits[namespace] = self._hits.get(namespace, 0) + 1
+        logger.info(f"Cache hit: {namespace}/{key[:12]}")
+        return value
+
+    def put(self, namespace: str, key: str, value: Any) -> None:
+        """Store a JSON-serialisable value, evicting old entries if over budget."""
+        path = self._path(namespace, key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            data = json.dumps(value).encode("utf-8")
+            with tempfile.NamedTemporaryFile(dir=path.parent, delete=False, suffix=".tmp") as tmp_file:
+                tmp_file.write(data)
+            previous_size = path.stat().st_size if path.exists() else 0
+            os.replace(tmp_file.name, path)
+        except Exception as e:
+            logger.warning(f"Failed to write cache entry {namespace}/{key[:12]}: {str(e)}")
+            return
+
+        with self._lock:
+            self._size += len(data) - previous_size
+            if self._size > self.max_bytes:
+                self._evict_locked()
+
+    def _evict_locked(self) -> None:
+        """Delete least recently used entries until the cache fits its budget."""
+        entries = []
+        for path in self._entries():
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+
+        self._size = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if self._size <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            self._size -= size
+            self._evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            namespaces = sorted(set(self._hits) | set(self._misses))
+            return {
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "evictions": self._evictions,
+                "hits": sum(self._hits.values()),
+                "misses": sum(self._misses.values()),
+                "namespaces": {
+                    namespace: {"hits": self._hits.get(namespace, 0), "misses": self._misses.get(namespace, 0)}
+                    for namespace in namespaces
+                },
+            }
+
+
+class ResponseCache:
+    """Reply texts in memory keyed by prompt hash, expiring after ttl_seconds and evicted least recently used."""
+
+    def __init__(self, max_bytes: int = GEMINI_RESPONSE_CACHE_MAX_BYTES, ttl_seconds: float = GEMINI_RESPONSE_CACHE_TTL_SECONDS):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._size = 0
+        self._hits = 0
+        self._misses = 0
+        self._expirations = 0
+        self._evictions = 0
+
+    @staticmethod
+    def key(model_name: str, prompt: str) -> str:
+        return make_cache_key(model_name, hashlib.sha256(prompt.encode("utf-8")).hexdigest())
+
+    @staticmethod
+    def _entry_size(key: str, text: str) -> int:
+        return len(key) + len(text.encode("utf-8"))
+
+    def _remove_locked(self, key: str) -> None:
+        _, text = self._entries.pop(key)
+        self._size -= self._entry_size(key, text)
+
+    def get(self, key: str) -> Optional[str]:
+        """Return a reply stored less than ttl_seconds ago, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] > self.ttl_seconds:
+                self._remove_locked(key)
+                self._expirations += 1
+                entry = None
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[1]
+
+    def put(self, key: str, text: str) -> None:
+        """Store a reply, dropping expired entries and then the least recently used until under budget."""
+        size = self._entry_size(key, text)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                if self._entries[key][1] == text:
+                    # Storing a reply that was itself served from the cache does not extend its life.
+                    self._entries.move_to_end(key)
+                    return
+                self._remove_locked(key)
+            self._entries[key] = (time.monotonic(), text)
+            self._size += size
+            if self._size > self.max_bytes:
+                cutoff = time.monotonic() - self.ttl_seconds
+                for expired in [k for k, (stored_at, _) in self._entries.items() if stored_at < cutoff]:
+                    self._remove_locked(expired)
+                    self._expirations += 1
+            while self._size > self.max_bytes:
+                self._remove_locked(next(iter(self._entries)))
+                self._evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self._hits,
+                "misses": self._misses,
+                "expirations": self._expirations,
+                "evictions": self._evictions,
+            }
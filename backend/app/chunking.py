@@ -0,0 +1,192 @@
+"""
+Transcript chunking and merge helpers for map-reduce generation
+"""
+import os
+import re
+from typing import Callable, List, Optional
+
+TRANSCRIPT_CHUNK_CHARS = int(os.getenv("TRANSCRIPT_CHUNK_CHARS", "12000"))
+TRANSCRIPT_CHUNK_OVERLAP_CHARS = int(os.getenv("TRANSCRIPT_CHUNK_OVERLAP_CHARS", "600"))
+# Slide text sent along with each chunk when flashcards and quiz questions are asked per chunk.
+SLIDES_CHUNK_CHARS = int(os.getenv("SLIDES_CHUNK_CHARS", "3000"))
+DUPLICATE_SIMILARITY_THRESHOLD = 0.8
+
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+")
+_NON_WORD = re.compile(r"[^\w\s]")
+_SLIDES_PAGE = re.compile(r"^\[Page \d+\]$", re.MULTILINE)
+# Words shorter than this are mostly function words and say little about what a slide covers.
+_TOPIC_WORD_MIN_LENGTH = 4
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split text after sentence-ending punctuation."""
+    return [sentence for sentence in _SENTENCE_BOUNDARY.split(text.strip()) if sentence]
+
+
+def _split_long_unit(unit: str, max_chars: int) -> List[str]:
+    """Break a unit longer than a chunk at whitespace."""
+    pieces = []
+    while len(unit) > max_chars:
+        cut = unit.rfind(" ", 0, max_chars)
+        if cut <= 0:
+            cut = max_chars
+        pieces.append(unit[:cut].strip())
+        unit = unit[cut:].strip()
+    if unit:
+        pieces.append(unit)
+    return pieces
+
+
+class IncrementalChunker:
+    """Pack units into overlapping chunks as they arrive, handing back each chunk once it is closed."""
+
+    def __init__(self, max_chars: int = TRANSCRIPT_CHUNK_CHARS, overlap_chars: int = TRANSCRIPT_CHUNK_OVERLAP_CHARS):
+        self.max_chars = max_chars
+        self.overlap_chars = overlap_chars
+        self._current: List[str] = []
+        self._current_len = 0
+
+    def add(self, unit: str) -> List[str]:
+        """Add a segment or sentence; returns the chunks it closed, usually none."""
+        closed = []
+        for piece in _split_long_unit(unit.strip(), self.max_chars):
+            if self._current and self._current_len + len(piece) + 1 > self.max_chars:
+                closed.append(" ".join(self._current))
+                overlap: List[str] = []
+                overlap_len = 0
+                for previous in reversed(self._current):
+                    if overlap_len + len(previous) + 1 > self.overlap_chars:
+                        break
+                    overlap.insert(0, previous)
+                    overlap_len += len(previous) + 1
+                self._current, self._current_len = overlap, overlap_len
+            self._current.append(piece)
+            self._current_len += len(piece) + 1
+        return closed
+
+    def close(self) -> List[str]:
+        """Return the final, partly filled chunk."""
+        chunks = [" ".join(self._current)] if self._current else []
+        self._current, self._current_len = [], 0
+        return chunks
+
+
+def chunk_units(
+    units: List[str],
+    max_chars: int = TRANSCRIPT_CHUNK_CHARS,
+    overlap_chars: int = TRANSCRIPT_CHUNK_OVERLAP_CHARS,
+) -> List[str]:
+    """Pack segments or sentences into chunks of at most max_chars, repeating a short tail as overlap."""
+    chunker = IncrementalChunker(max_chars, overlap_chars)
+    chunks = []
+    for unit in units:
+        chunks.extend(chunker.add(unit))
+    return chunks + chunker.close()
+
+
+def needs_chunking(transcript: str, max_chars: int = TRANSCRIPT_CHUNK_CHARS) -> bool:
+    return len(transcript) > max_chars
+
+
+def chunk_transcript(
+    transcript: str,
+    max_chars: int = TRANSCRIPT_CHUNK_CHARS,
+    overlap_chars: int = TRANSCRIPT_CHUNK_OVERLAP_CHARS,
+) -> List[str]:
+    """Split a transcript at sentence boundaries into overlapping chunks."""
+    return chunk_units(split_sentences(transcript), max_chars, overlap_chars)
+
+
+def chunk_segments(
+    segments: List[dict],
+    max_chars: int = TRANSCRIPT_CHUNK_CHARS,
+    overlap_chars: int = TRANSCRIPT_CHUNK_OVERLAP_CHARS,
+) -> List[str]:
+    """Chunk timestamped transcript segments, never splitting a segment unless it alone is too long."""
+    return chunk_units([segment["text"] for segment in segments], max_chars, overlap_chars)
+
+
+def _topic_words(text: str) -> set:
+    return {word for word in _normalize(text).split() if len(word) >= _TOPIC_WORD_MIN_LENGTH}
+
+
+def slides_for_chunk(slides: Optional[str], chunk: str, max_chars: int = SLIDES_CHUNK_CHARS) -> Optional[str]:
+    """The slide pages sharing the most words with a transcript chunk, up to max_chars, in page order.
+
+    Sending every chunk the whole deck would pay for the slide tokens once per chunk.
+    """
+    if not slides:
+        return None
+    starts = [match.start() for match in _SLIDES_PAGE.finditer(slides)] or [0]
+    if starts[0] != 0:
+        starts.insert(0, 0)
+    pages = [slides[start:end].strip() for start, end in zip(starts, starts[1:] + [len(slides)])]
+    chunk_words = _topic_words(chunk)
+    scored = sorted(
+        ((len(_topic_words(page) & chunk_words), index) for index, page in enumerate(pages) if page),
+        reverse=True,
+    )
+
+    picked, used = [], 0
+    for score, index in scored:
+        if score == 0:
+            break
+        if used + len(pages[index]) <= max_chars:
+            picked.append(index)
+            used += len(pages[index]) + 2
+    if not picked and scored and scored[0][0]:
+        return pages[scored[0][1]][:max_chars]
+    return "\n\n".join(pages[index] for index in sorted(picked)) or None
+
+
+def distribute(total: int, parts: int) -> List[int]:
+    """Spread a requested item count over chunks as evenly as possible."""
+    if parts <= 0:
+        return []
+    base, remainder = divmod(total, parts)
+    return [base + (1 if index < remainder else 0) for index in range(parts)]
+
+
+def _normalize(text: str) -> str:
+    return " ".join(_NON_WORD.sub(" ", text.lower()).split())
+
+
+def _similarity(first: set, second: set) -> float:
+    if not first or not second:
+        return 0.0
+    return len(first & second) / len(first | second)
+
+
+def merge_unique(
+    groups: List[List[dict]],
+    limit: int,
+    key: Callable[[dict], Optional[str]] = lambda item: item.get("question"),
+) -> List[dict]:
+    """Take per-chunk items round-robin, dropping near-duplicate questions, up to limit.
+
+    When there are more chunks than items wanted, evenly spaced chunks are visited first so the
+    result still spans the whole lecture. The merged items keep lecture order.
+    """
+    if len(groups) > limit > 0:
+        preferred = sorted({index * len(groups) // limit for index in range(limit)})
+        order = preferred + [index for index in range(len(groups)) if index not in preferred]
+    else:
+        order = list(range(len(groups)))
+
+    seen: List[set] = []
+    picked: List[tuple] = []
+    longest = max((len(group) for group in groups), default=0)
+    for position in range(longest):
+        for group_index in order:
+            group = groups[group_index]
+            if position >= len(group) or len(picked) >= limit:
+                continue
+            text = key(group[position])
+            if not text:
+                continue
+            words = set(_normalize(text).split())
+            if any(_similarity(words, other) >= DUPLICATE_SIMILARITY_THRESHOLD for other in seen):
+                continue
+            seen.append(words)
+            picked.append((group_index, position, group[position]))
+    return [item for _, _, item in sorted(picked, key=lambda entry: entry[:2])]
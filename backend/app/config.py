@@ -0,0 +1,6 @@
+"""
+Load backend/.env into the environment; app modules read their settings when imported, so import this first
+"""
+from dotenv import load_dotenv
+
+load_dotenv()
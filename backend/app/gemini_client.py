@@ -0,0 +1,284 @@
+"""
+Shared Gemini client: reused model objects, a process-wide rate limit and retries on transient errors
+"""
+import os
+import time
+import logging
+import itertools
+import threading
+import contextvars
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from tenacity import RetryCallState, Retrying, retry_if_exception, stop_after_attempt, wait_random_exponential
+
+from . import metrics
+from .cache import GEMINI_RESPONSE_CACHE_ENABLED, ResponseCache
+from .metrics import record_operation, timed
+
+logger = logging.getLogger(__name__)
+
+GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+GEMINI_MAX_CONCURRENT_CALLS = int(os.getenv("GEMINI_MAX_CONCURRENT_CALLS", "4"))
+GEMINI_REQUESTS_PER_MINUTE = float(os.getenv("GEMINI_REQUESTS_PER_MINUTE", "60"))
+GEMINI_RATE_LIMIT_BURST = int(os.getenv("GEMINI_RATE_LIMIT_BURST", str(GEMINI_MAX_CONCURRENT_CALLS)))
+GEMINI_MAX_RETRIES = int(os.getenv("GEMINI_MAX_RETRIES", "4"))
+GEMINI_RETRY_INITIAL_SECONDS = float(os.getenv("GEMINI_RETRY_INITIAL_SECONDS", "1"))
+GEMINI_RETRY_MAX_SECONDS = float(os.getenv("GEMINI_RETRY_MAX_SECONDS", "30"))
+
+
+@lru_cache(maxsize=None)
+def transient_errors() -> Tuple[type, ...]:
+    """Rate limiting, overload and server-side failures; bad requests and blocked prompts are not retried.
+
+    Built on first use: google.api_core pulls in gRPC, which the API process should not pay for at startup.
+    """
+    from google.api_core import exceptions as google_exceptions
+
+    return (
+        google_exceptions.TooManyRequests,
+        google_exceptions.ServiceUnavailable,
+        google_exceptions.InternalServerError,
+        google_exceptions.DeadlineExceeded,
+        google_exceptions.GatewayTimeout,
+        google_exceptions.Aborted,
+        ConnectionError,
+        TimeoutError,
+    )
+
+
+class TokenBucket:
+    """Allows rate_per_second calls on average with bursts of up to capacity."""
+
+    def __init__(self, rate_per_second: float, capacity: int):
+        self.rate = rate_per_second
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Take a token, possibly ahead of time; returns how long to wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def acquire(self) -> float:
+        """Block until a call is allowed; returns the seconds waited."""
+        if self.rate <= 0:
+            return 0.0
+        delay = self._reserve()
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+
+def is_transient(error: BaseException) -> bool:
+    return isinstance(error, transient_errors())
+
+
+# Set while replies should be fetched again rather than read from the response cache.
+_refreshing: contextvars.ContextVar = contextvars.ContextVar("gemini_refreshing", default=False)
+
+
+@contextmanager
+def refreshing_responses() -> Iterator[None]:
+    """Skip cached replies for calls made in this context; the new replies replace them in the cache."""
+    token = _refreshing.set(True)
+    try:
+        yield
+    finally:
+        _refreshing.reset(token)
+
+
+class CachedResponse:
+    """A reply served from the response cache, shaped like the SDK response where callers read it."""
+
+    usage_metadata = None
+
+    def __init__(self, text: str):
+        self.text = text
+
+
+def response_text(response: Any) -> str:
+    """Reply text, or an empty string for a blocked or empty candidate."""
+    try:
+        return response.text or ""
+    except (ValueError, AttributeError):
+        return ""
+
+
+class GeminiClient:
+    """One client for every lecture in the process, so limits hold across concurrent jobs."""
+
+    def __init__(
+        self,
+        max_concurrent_calls: int = GEMINI_MAX_CONCURRENT_CALLS,
+        requests_per_minute: float = GEMINI_REQUESTS_PER_MINUTE,
+        burst: int = GEMINI_RATE_LIMIT_BURST,
+        max_retries: int = GEMINI_MAX_RETRIES,
+        retry_initial_seconds: float = GEMINI_RETRY_INITIAL_SECONDS,
+        retry_max_seconds: float = GEMINI_RETRY_MAX_SECONDS,
+        response_cache: Optional[ResponseCache] = None,
+    ):
+        self.max_concurrent_calls = max_concurrent_calls
+        self.max_retries = max_retries
+        self.retry_initial_seconds = retry_initial_seconds
+        self.retry_max_seconds = retry_max_seconds
+        self.response_cache = response_cache
+        self._call_slots = threading.BoundedSemaphore(max_concurrent_calls)
+        self._rate_limiter = TokenBucket(requests_per_minute / 60, burst)
+        self._models: Dict[str, Any] = {}
+        self._models_lock = threading.Lock()
+        self._configured = False
+
+    def load(self) -> Any:
+        """Import and configure the Gemini SDK on first use; it is the slowest import in the app."""
+        import google.generativeai as genai
+
+        with self._models_lock:
+            if not self._configured:
+                if GEMINI_API_KEY:
+                    genai.configure(api_key=GEMINI_API_KEY)
+                self._configured = True
+        return genai
+
+    def model(self, model_name: str) -> Any:
+        """The GenerativeModel for model_name, created once and shared by all threads."""
+        genai = self.load()
+        with self._models_lock:
+            if model_name not in self._models:
+                self._models[model_name] = genai.GenerativeModel(model_name)
+            return self._models[model_name]
+
+    def _attempt(self, model_name: str, prompt: str) -> Any:
+        record_operation("gemini_rate_limit_wait", self._rate_limiter.acquire())
+        waiting_since = time.perf_counter()
+        with self._call_slots:
+            record_operation("gemini_wait", time.perf_counter() - waiting_since)
+            with timed("gemini_call"):
+                return self.model(model_name).generate_content(prompt)
+
+    @staticmethod
+    def _before_retry(retry_state: RetryCallState) -> None:
+        error = retry_state.outcome.exception()
+        wait_seconds = retry_state.next_action.sleep if retry_state.next_action else 0.0
+        metrics.GEMINI_RETRIES_TOTAL.inc(reason=type(error).__name__)
+        metrics.GEMINI_RETRY_WAIT_SECONDS.observe(wait_seconds)
+        record_operation("gemini_retry_wait", wait_seconds)
+        logger.warning(
+            f"Gemini call failed ({type(error).__name__}: {str(error)}), "
+            f"retry {retry_state.attempt_number} in {wait_seconds:.1f}s"
+        )
+
+    def _retrying(self) -> Retrying:
+        return Retrying(
+            retry=retry_if_exception(is_transient),
+            wait=wait_random_exponential(multiplier=self.retry_initial_seconds, max=self.retry_max_seconds),
+            stop=stop_after_attempt(self.max_retries + 1),
+            before_sleep=self._before_retry,
+            reraise=True,
+        )
+
+    @staticmethod
+    def _record_usage(response: Any) -> None:
+        usage = getattr(response, "usage_metadata", None)
+        if usage is not None:
+            metrics.GEMINI_TOKENS_TOTAL.inc(getattr(usage, "prompt_token_count", 0) or 0, direction="prompt")
+            metrics.GEMINI_TOKENS_TOTAL.inc(getattr(usage, "candidates_token_count", 0) or 0, direction="response")
+
+    def _cached(self, key: Optional[str]) -> Optional[str]:
+        if key is None or _refreshing.get():
+            return None
+        text = self.response_cache.get(key)
+        metrics.GEMINI_RESPONSE_CACHE_TOTAL.inc(result="miss" if text is None else "hit")
+        return text
+
+    def remember(self, model_name: str, prompt: str, text: str) -> None:
+        """Cache a reply the caller has parsed and found valid, so the same prompt is answered locally.
+
+        Replies are never cached on arrival: one that fails validation must be asked for again.
+        """
+        if self.response_cache is not None and text:
+            self.response_cache.put(self.response_cache.key(model_name, prompt), text)
+
+    def generate(self, model_name: str, prompt: str) -> Any:
+        """Send one prompt, retrying transient failures with jittered exponential backoff.
+
+        A prompt whose reply was remember()ed is served from the response cache without a call.
+        Raises the last error once retries are exhausted, or at once for errors that are not transient.
+        """
+        key = self.response_cache.key(model_name, prompt) if self.response_cache else None
+        cached = self._cached(key)
+        if cached is not None:
+            return CachedResponse(cached)
+
+        metrics.GEMINI_CHARS_TOTAL.inc(len(prompt), direction="prompt")
+        try:
+            response = self._retrying()(self._attempt, model_name, prompt)
+        except Exception:
+            metrics.GEMINI_CALLS_TOTAL.inc(outcome="error")
+            raise
+
+        metrics.GEMINI_CALLS_TOTAL.inc(outcome="ok")
+        self._record_usage(response)
+        text = response_text(response)
+        metrics.GEMINI_CHARS_TOTAL.inc(len(text), direction="response")
+        return response
+
+    def _open_stream(self, model_name: str, prompt: str) -> Tuple[Iterator[Any], Any, float]:
+        """Start a streamed call and read its first chunk, keeping the call slot on success."""
+        record_operation("gemini_rate_limit_wait", self._rate_limiter.acquire())
+        waiting_since = time.perf_counter()
+        self._call_slots.acquire()
+        opened_at = time.perf_counter()
+        record_operation("gemini_wait", opened_at - waiting_since)
+        try:
+            chunks = iter(self.model(model_name).generate_content(prompt, stream=True))
+            return chunks, next(chunks, None), opened_at
+        except BaseException:
+            self._call_slots.release()
+            raise
+
+    def stream(self, model_name: str, prompt: str) -> Iterator[str]:
+        """Yield the reply text as it arrives.
+
+        Failures before the first chunk are retried like generate(); a failure part-way through
+        is raised to the caller, which keeps whatever it already consumed. A cached reply is yielded whole.
+        """
+        key = self.response_cache.key(model_name, prompt) if self.response_cache else None
+        cached = self._cached(key)
+        if cached is not None:
+            yield cached
+            return
+
+        metrics.GEMINI_CHARS_TOTAL.inc(len(prompt), direction="prompt")
+        try:
+            chunks, first, opened_at = self._retrying()(self._open_stream, model_name, prompt)
+        except Exception:
+            metrics.GEMINI_CALLS_TOTAL.inc(outcome="error")
+            raise
+
+        outcome = "error"
+        last = first
+        try:
+            for chunk in itertools.chain([first] if first is not None else [], chunks):
+                last = chunk
+                text = response_text(chunk)
+                metrics.GEMINI_CHARS_TOTAL.inc(len(text), direction="response")
+                if text:
+                    yield text
+            outcome = "ok"
+        finally:
+            self._call_slots.release()
+            record_operation("gemini_call", time.perf_counter() - opened_at)
+            metrics.GEMINI_CALLS_TOTAL.inc(outcome=outcome)
+            # Streamed replies report usage for the whole call on the last chunk.
+            self._record_usage(last)
+
+
+gemini_client = GeminiClient(response_cache=ResponseCache() if GEMINI_RESPONSE_CACHE_ENABLED else None)
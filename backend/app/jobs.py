@@ -0,0 +1,311 @@
+"""
+Background job queue for lecture processing
+"""
+import os
+import time
+import uuid
+import logging
+import importlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+USE_CELERY = os.getenv("USE_CELERY", "false").lower() == "true"
+JOB_BACKEND = os.getenv("JOB_BACKEND", "celery" if USE_CELERY else "thread")
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_MAX_PENDING = int(os.getenv("JOB_MAX_PENDING", "50"))
+JOB_RESULT_TTL = int(os.getenv("JOB_RESULT_TTL", "3600"))
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
+
+EventCallback = Callable[[str, dict], None]
+# Handlers take the job payload and, when running in this process, a callback for progress events.
+JobHandler = Callable[[dict, Optional[EventCallback]], dict]
+
+
+class JobQueueError(Exception):
+    """Base exception for job queue errors."""
+    pass
+
+
+class JobNotFoundError(JobQueueError):
+    """Raised when a job id is unknown or has expired."""
+    pass
+
+
+class JobQueueFullError(JobQueueError):
+    """Raised when too many jobs are already waiting to run."""
+    pass
+
+
+class Job:
+    """State of one queued lecture processing run."""
+
+    QUEUED_STATUS = "queued"
+    RUNNING_STATUS = "running"
+    COMPLETED_STATUS = "completed"
+    FAILED_STATUS = "failed"
+    FINISHED_STATUSES = (COMPLETED_STATUS, FAILED_STATUS)
+
+    def __init__(self, job_id: str, lecture_id: str, title: str, payload: dict):
+        self.job_id = job_id
+        self.lecture_id = lecture_id
+        self.title = title
+        self.payload = payload
+        self.status = Job.QUEUED_STATUS
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.result: Optional[dict] = None
+        self.error: Optional[str] = None
+        self.events: List[dict] = []
+        self._events_lock = threading.Lock()
+
+    def add_event(self, event_type: str, data: dict) -> None:
+        """Append a progress event; readers follow the list by index."""
+        with self._events_lock:
+            self.events.append({"id": len(self.events), "event": event_type, "data": data})
+
+    def events_since(self, index: int) -> List[dict]:
+        with self._events_lock:
+            return self.events[index:]
+
+    @property
+    def finished(self) -> bool:
+        return self.status in Job.FINISHED_STATUSES
+
+    def mark_running(self) -> None:
+        self.status = Job.RUNNING_STATUS
+        self.started_at = time.time()
+        self.add_event("status", {"status": self.status})
+
+    def mark_completed(self, result: dict) -> None:
+        self.result = result
+        self.finished_at = time.time()
+        self.status = Job.COMPLETED_STATUS
+        self.add_event("status", {"status": self.status})
+
+    def mark_failed(self, error: str) -> None:
+        self.error = error
+        self.finished_at = time.time()
+        self.status = Job.FAILED_STATUS
+        self.add_event("status", {"status": self.status, "error": error})
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.job_id,
+            "lecture_id": self.lecture_id,
+            "title": self.title,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+        }
+
+
+def _run_job(job: Job, handler: JobHandler) -> None:
+    """Run a handler and record its outcome on the job."""
+    job.mark_running()
+    logger.info(f"Job started | Job: {job.job_id} | Lecture: {job.lecture_id}")
+    try:
+        job.mark_completed(handler(job.payload, job.add_event))
+        logger.info(f"Job finished | Job: {job.job_id}")
+    except Exception as e:
+        logger.error(f"Job failed | Job: {job.job_id} | Error: {str(e)}")
+        job.mark_failed(str(e))
+
+
+class JobBackend:
+    """Executes jobs; subclasses decide where the work runs."""
+
+    # Jobs run inside the API process, so a restart loses every queued and running one.
+    in_process = True
+
+    def submit(self, job: Job, handler: JobHandler) -> None:
+        raise NotImplementedError
+
+    def refresh(self, job: Job) -> None:
+        """Update job state from the backend when it is tracked elsewhere."""
+        pass
+
+    def lookup(self, job_id: str) -> Optional[Job]:
+        """Recover a job this process did not submit."""
+        return None
+
+    def shutdown(self) -> None:
+        pass
+
+
+class ThreadPoolJobBackend(JobBackend):
+    """Run jobs on a bounded in-process thread pool."""
+
+    def __init__(self, max_workers: int = JOB_WORKERS):
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="lecture-job")
+
+    def submit(self, job: Job, handler: JobHandler) -> None:
+        self._executor.submit(_run_job, job, handler)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class InMemoryJobBackend(JobBackend):
+    """Run jobs synchronously at submit time; a deterministic stand-in for tests."""
+
+    def submit(self, job: Job, handler: JobHandler) -> None:
+        _run_job(job, handler)
+
+
+def _handler_path(handler: JobHandler) -> str:
+    return f"{handler.__module__}:{handler.__qualname__}"
+
+
+def _resolve_handler(path: str) -> JobHandler:
+    module_name, _, attribute = path.partition(":")
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+def _create_celery_app():
+    """Build the Celery app used by both the API process and the workers."""
+    from celery import Celery
+
+    celery = Celery("lectureiq", broker=REDIS_URL, backend=REDIS_URL)
+    celery.conf.update(
+        task_track_started=True,
+        task_acks_late=True,
+        worker_prefetch_multiplier=1,
+        result_expires=JOB_RESULT_TTL,
+    )
+
+    @celery.task(name="lectureiq.process_lecture")
+    def process_lecture_task(handler_path: str, payload: dict) -> dict:
+        return _resolve_handler(handler_path)(payload, None)
+
+    return celery
+
+
+celery_app = _create_celery_app() if JOB_BACKEND == "celery" else None
+
+
+class CeleryJobBackend(JobBackend):
+    """Send jobs to Celery workers through Redis; uploads must be on shared storage.
+
+    Progress events are not relayed from workers, so event streams only see status changes.
+    """
+
+    _STATE_TO_STATUS = {
+        "PENDING": Job.QUEUED_STATUS,
+        "RECEIVED": Job.QUEUED_STATUS,
+        "RETRY": Job.QUEUED_STATUS,
+        "STARTED": Job.RUNNING_STATUS,
+        "SUCCESS": Job.COMPLETED_STATUS,
+        "FAILURE": Job.FAILED_STATUS,
+        "REVOKED": Job.FAILED_STATUS,
+    }
+
+    in_process = False
+
+    def __init__(self):
+        self._app = celery_app or _create_celery_app()
+
+    def submit(self, job: Job, handler: JobHandler) -> None:
+        self._app.send_task(
+            "lectureiq.process_lecture",
+            args=[_handler_path(handler), job.payload],
+            task_id=job.job_id,
+        )
+
+    def refresh(self, job: Job) -> None:
+        if job.finished:
+            return
+        async_result = self._app.AsyncResult(job.job_id)
+        status = self._STATE_TO_STATUS.get(async_result.state, Job.QUEUED_STATUS)
+        if status == Job.RUNNING_STATUS and job.status == Job.QUEUED_STATUS:
+            job.mark_running()
+        elif status == Job.COMPLETED_STATUS:
+            job.mark_completed(async_result.result)
+        elif status == Job.FAILED_STATUS:
+            job.mark_failed(str(async_result.result))
+
+    def lookup(self, job_id: str) -> Optional[Job]:
+        async_result = self._app.AsyncResult(job_id)
+        if async_result.state == "PENDING":
+            return None
+        job = Job(job_id, lecture_id="", title="", payload={})
+        self.refresh(job)
+        return job
+
+
+def create_job_backend(name: str = JOB_BACKEND) -> JobBackend:
+    """Build the job backend selected by configuration."""
+    if name == "celery":
+        return CeleryJobBackend()
+    if name == "memory":
+        return InMemoryJobBackend()
+    if name == "thread":
+        return ThreadPoolJobBackend()
+    raise ValueError(f"Unknown job backend: {name}")
+
+
+class JobQueue:
+    """Accepts lecture jobs, tracks their state and hands back results."""
+
+    def __init__(
+        self,
+        handler: JobHandler,
+        backend: Optional[JobBackend] = None,
+        max_pending: int = JOB_MAX_PENDING,
+        result_ttl: int = JOB_RESULT_TTL,
+    ):
+        self.handler = handler
+        self.backend = backend or create_job_backend()
+        self.max_pending = max_pending
+        self.result_ttl = result_ttl
+        self._jobs: dict = {}
+        self._lock = threading.Lock()
+
+    def _prune_locked(self) -> None:
+        cutoff = time.time() - self.result_ttl
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished and job.finished_at and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def pending_count(self) -> int:
+        """Number of jobs queued or running in this process."""
+        with self._lock:
+            jobs = list(self._jobs.values())
+        for job in jobs:
+            self.backend.refresh(job)
+        return sum(1 for job in jobs if not job.finished)
+
+    def submit(self, lecture_id: str, title: str, payload: dict) -> Job:
+        """Queue a job and return immediately."""
+        if self.pending_count() >= self.max_pending:
+            raise JobQueueFullError(f"Too many lectures in progress (limit {self.max_pending})")
+
+        job = Job(str(uuid.uuid4()), lecture_id, title, payload)
+        with self._lock:
+            self._prune_locked()
+            self._jobs[job.job_id] = job
+        self.backend.submit(job, self.handler)
+        logger.info(f"Job queued | Job: {job.job_id} | Lecture: {lecture_id}")
+        return job
+
+    def get(self, job_id: str) -> Job:
+        """Return the current state of a job."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            job = self.backend.lookup(job_id)
+            if job is None:
+                raise JobNotFoundError(f"Job not found: {job_id}")
+        self.backend.refresh(job)
+        return job
+
+    def shutdown(self) -> None:
+        self.backend.shutdown()
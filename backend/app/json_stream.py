@@ -0,0 +1,86 @@
+"""
+Incremental extraction of JSON objects from streamed model replies
+"""
+import json
+import logging
+from typing import List
+
+logger = logging.getLogger(__name__)
+
+# An object still open after this many characters is treated as runaway output and dropped.
+MAX_OBJECT_CHARS = 20000
+
+
+class JsonObjectStream:
+    """Pull complete top-level JSON objects out of text that arrives in pieces.
+
+    Anything outside the objects, such as markdown fences, the enclosing array brackets or
+    prose around them, is ignored. An object that fails to parse is skipped and counted in
+    malformed, so one bad item does not cost the rest of the array.
+    """
+
+    def __init__(self, max_object_chars: int = MAX_OBJECT_CHARS):
+        self.max_object_chars = max_object_chars
+        self.malformed = 0
+        self._buffer: List[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    def _reset(self) -> None:
+        self._buffer = []
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, text: str) -> List[dict]:
+        """Consume the next piece of the reply; returns the objects it completed."""
+        completed = []
+        for char in text:
+            if self._depth == 0:
+                if char == "{":
+                    self._buffer = [char]
+                    self._depth = 1
+                continue
+
+            self._buffer.append(char)
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char == "{":
+                self._depth += 1
+            elif char == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._finish(completed)
+                    continue
+
+            if len(self._buffer) > self.max_object_chars:
+                logger.warning(f"Dropping JSON object longer than {self.max_object_chars} characters")
+                self.malformed += 1
+                self._reset()
+        return completed
+
+    def _finish(self, completed: List[dict]) -> None:
+        raw = "".join(self._buffer)
+        self._reset()
+        try:
+            value = json.loads(raw)
+        except json.JSONDecodeError as e:
+            self.malformed += 1
+            logger.warning(f"Skipping malformed JSON object: {str(e)}")
+            return
+        completed.append(value)
+
+    def close(self) -> None:
+        """Count an object left open at the end of the reply as malformed."""
+        if self._depth:
+            self.malformed += 1
+            logger.warning("Reply ended inside an unfinished JSON object")
+        self._reset()
@@ -1,13 +1,64 @@
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 import os
+import json
 import uuid
+import asyncio
+import hashlib
+import time
 import shutil
 import logging
+import threading
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Optional
-from .services import LectureProcessor
+from typing import Callable, List, Optional
+
+from . import config  # noqa: F401  (loads .env before the modules below read their settings)
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+from .services import (  # noqa: E402
+    ARTIFACT_NAMES,
+    FLASHCARD_COUNT,
+    QUIZ_QUESTION_COUNT,
+    PRELOAD_ON_STARTUP,
+    LectureProcessor,
+    WHISPER_PRELOAD,
+    dependency_preloader,
+    generation_stats,
+    whisper_tier_policy,
+)
+from .whisper_pool import model_registry
+from .gemini_client import gemini_client
+from .parallel_transcription import parallel_transcriber
+from .jobs import Job, JobQueue, JobNotFoundError, JobQueueFullError
+from .batches import (
+    BatchManifest,
+    BatchNotFoundError,
+    BatchPartiallyQueuedError,
+    BatchRegistry,
+    InvalidManifestPathError,
+    resolve_manifest_path,
+)
+from .cache import ResultCache, RESULT_CACHE_ENABLED
+from .search import SEARCH_PAGE_SIZE, SEARCHABLE_STAGES, InvalidSearchQueryError
+from .store import (
+    COMPLETED_STATUS,
+    FAILED_STATUS,
+    LECTURE_DB_URL,
+    LECTURE_STORE_ENABLED,
+    PROCESSING_STATUS,
+    QUEUED_STATUS,
+    LectureNotFoundError,
+    LectureStore,
+)
+from . import metrics
 
 logger = logging.getLogger(__name__)
 
@@ -17,6 +68,11 @@ class UploadValidationError(Exception):
     pass
 
 
+class UploadTooLargeError(UploadValidationError):
+    """Raised when an upload exceeds the configured size limit."""
+    pass
+
+
 def create_error_response(lecture_id: str, error: Exception, status_code: int = 400) -> dict:
     """Build a standardized error response."""
     return {
@@ -25,6 +81,9 @@ def create_error_response(lecture_id: str, error: Exception, status_code: int =
         "message": "Processing failed",
         "error": str(error),
         "transcript": None,
+        "segments": None,
+        "transcription": None,
+        "timings": None,
         "notes": None,
         "flashcards": None,
         "quiz": None,
@@ -33,13 +92,23 @@ def create_error_response(lecture_id: str, error: Exception, status_code: int =
 
 app = FastAPI(title="LectureIQ API", version="1.0.0")
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger.info("LectureIQ API Initialized")
 
+
+@app.middleware("http")
+async def reject_oversized_uploads(request: Request, call_next):
+    """Refuse uploads whose declared size is over the limit before the body is read."""
+    limit = _upload_body_limit(request) if request.method == "POST" else None
+    if limit is not None:
+        content_length = request.headers.get("content-length")
+        if content_length and content_length.isdigit() and int(content_length) > limit:
+            return JSONResponse(
+                status_code=HTTP_PAYLOAD_TOO_LARGE_STATUS,
+                content={"detail": f"Upload exceeds the {limit // (1024 * 1024)} MB limit"},
+            )
+    return await call_next(request)
+
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -50,16 +119,46 @@ app.add_middleware(
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint to wake up sleeping server."""
-    return {"status": "ok", "message": "Server is awake"}
+    """Health check endpoint to wake up sleeping server; answers before the ML libraries are loaded."""
+    return {"status": "ok", "message": "Server is awake", "dependencies": dependency_preloader.status}
 
 STORAGE_DIR = Path(__file__).parent.parent / "storage"
 UPLOAD_DIR = STORAGE_DIR / "uploads"
 UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+CACHE_DIR = STORAGE_DIR / "cache"
+
+result_cache = ResultCache(CACHE_DIR) if RESULT_CACHE_ENABLED else None
+lecture_store = LectureStore(LECTURE_DB_URL or f"sqlite:///{STORAGE_DIR / 'lectureiq.db'}") if LECTURE_STORE_ENABLED else None
 
 QUIZ_OPTION_LETTER_TO_INDEX = {'A': 0, 'B': 1, 'C': 2, 'D': 3}
 QUIZ_OPTION_LETTERS = ['A', 'B', 'C', 'D']
 HTTP_SUCCESS_STATUS = 200
+HTTP_ACCEPTED_STATUS = 202
+HTTP_PAYLOAD_TOO_LARGE_STATUS = 413
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+MAX_UPLOAD_SIZE = int(os.getenv("MAX_UPLOAD_SIZE_MB", "500")) * 1024 * 1024
+UPLOAD_FORM_OVERHEAD = 1024 * 1024
+SSE_POLL_INTERVAL = 0.5
+SSE_KEEPALIVE_SECONDS = float(os.getenv("SSE_KEEPALIVE_SECONDS", "15"))
+SSE_RETRY_MS = 3000
+# Largest num_cards or num_questions accepted when regenerating an artifact.
+REGENERATE_MAX_ITEMS = int(os.getenv("REGENERATE_MAX_ITEMS", "50"))
+# Uploads of a failed lecture are kept this long for a resume, then deleted.
+FAILED_UPLOAD_RETENTION_HOURS = float(os.getenv("FAILED_UPLOAD_RETENTION_HOURS", "24"))
+UPLOAD_SWEEP_INTERVAL_SECONDS = 3600
+# Failures a resume cannot fix, so their uploads are deleted at once.
+NON_RETRYABLE_STATUSES = (LectureProcessor.AUDIO_EXTRACTION_FAILED_STATUS,)
+INTERRUPTED_ERROR = "Interrupted by a server restart; resume the lecture to continue"
+
+
+def _upload_body_limit(request: Request) -> Optional[int]:
+    """Largest request body accepted on an upload route: a video and slides per lecture."""
+    path = request.url.path
+    if path.startswith("/api/upload"):
+        return MAX_UPLOAD_SIZE * 2 + UPLOAD_FORM_OVERHEAD
+    if path == "/api/batches":
+        return (MAX_UPLOAD_SIZE * 2 + UPLOAD_FORM_OVERHEAD) * batch_registry.max_lectures
+    return None
 
 
 def _transform_quiz_format(quiz_data: list) -> list:
@@ -82,11 +181,35 @@ def _transform_quiz_format(quiz_data: list) -> list:
     return transformed_quiz
 
 
-async def _save_upload_file(upload_file: UploadFile, destination_path: Path) -> None:
-    """Persist an uploaded file to disk."""
-    content = await upload_file.read()
-    with open(destination_path, "wb") as f:
-        f.write(content)
+async def _save_upload_file(
+    upload_file: UploadFile,
+    destination_path: Path,
+    max_size: int = MAX_UPLOAD_SIZE,
+) -> tuple:
+    """Stream an uploaded file to disk in chunks, returning its size and SHA-256 digest."""
+    if upload_file.size is not None and upload_file.size > max_size:
+        raise UploadTooLargeError(f"{upload_file.filename} exceeds the {max_size // (1024 * 1024)} MB upload limit")
+    
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with open(destination_path, "wb") as f:
+            while True:
+                chunk = await upload_file.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_size:
+                    raise UploadTooLargeError(
+                        f"{upload_file.filename} exceeds the {max_size // (1024 * 1024)} MB upload limit"
+                    )
+                digest.update(chunk)
+                await run_in_threadpool(f.write, chunk)
+    except Exception:
+        destination_path.unlink(missing_ok=True)
+        raise
+    
+    return size, digest.hexdigest()
 
 
 def _create_success_response(lecture_id: str, processed_lecture: dict) -> dict:
@@ -107,6 +230,9 @@ def _create_success_response(lecture_id: str, processed_lecture: dict) -> dict:
         "status": frontend_status,
         "message": "Lecture processed successfully" if frontend_status == "completed" else "Processing completed with errors",
         "transcript": processed_lecture.get("transcript"),
+        "segments": processed_lecture.get("segments"),
+        "transcription": processed_lecture.get("transcription"),
+        "timings": processed_lecture.get("timings"),
         "notes": processed_lecture.get("notes"),
         "flashcards": processed_lecture.get("flashcards"),
         "quiz": transformed_quiz,
@@ -128,68 +254,652 @@ async def health_check():
         "service": "LectureIQ API",
         "version": "1.0.0",
         "processing_pipeline": "active",
-        "storage": "frontend (IndexedDB)"
+        "storage": "frontend (IndexedDB), server (SQLite)" if lecture_store else "frontend (IndexedDB)"
     }
 
 
-@app.post("/api/upload")
-async def upload_lecture(
-    title: str = Form(...),
-    video: UploadFile = File(...),
-    slides: Optional[UploadFile] = File(None),
-):
-    """Process a lecture video and generate study materials."""
+@app.on_event("startup")
+async def preload_dependencies():
+    """Optionally import the ML libraries and load Whisper models before the first upload arrives.
+    
+    Runs in a background thread rather than being awaited, so startup finishes, the port is bound and
+    /health answers while the libraries load.
+    """
+    if PRELOAD_ON_STARTUP or WHISPER_PRELOAD:
+        logger.info("Preloading dependencies in the background...")
+        dependency_preloader.start(import_modules=PRELOAD_ON_STARTUP, warm_up_whisper=WHISPER_PRELOAD)
+    _fail_interrupted_lectures()
+    threading.Thread(target=_sweep_failed_uploads, args=(True,), name="upload-sweep", daemon=True).start()
+
+
+@app.get("/api/models")
+async def model_stats():
+    """Report loaded Whisper models with warm-up and load timings."""
+    return model_registry.stats()
+
+
+def _artifact_event_forwarder(emit: Callable[[str, dict], None]) -> Callable[[str, dict], None]:
+    """Pass pipeline events on, reshaping quiz artifacts the way the final response does."""
+    def forward(event_type: str, data: dict) -> None:
+        if event_type == "artifact" and data.get("name") == "quiz":
+            data = {"name": "quiz", "data": _transform_quiz_format(data.get("data") or [])}
+        emit(event_type, data)
+    return forward
+
+
+def _record_status(lecture_id: str, status: str, error: Optional[str] = None) -> None:
+    """Mirror a lecture's state into the store; the store being unavailable never fails a lecture."""
+    if lecture_store is None:
+        return
+    try:
+        lecture_store.set_status(lecture_id, status, error)
+    except Exception as e:
+        logger.error(f"Failed to record lecture status | ID: {lecture_id} | Error: {str(e)}")
+
+
+def _inputs_checkpointed(lecture_id: str, payload: dict) -> bool:
+    """Whether the uploaded files are no longer needed to resume the lecture."""
+    if lecture_store is None:
+        return True
+    try:
+        saved = lecture_store.get_lecture(lecture_id)["checkpoints"]
+    except Exception:
+        return False
+    return "transcript" in saved and (not payload.get("slides_path") or "slides" in saved)
+
+
+_upload_sweep_lock = threading.Lock()
+_last_upload_sweep = 0.0
+
+
+def _fail_interrupted_lectures() -> None:
+    """Mark lectures a restart cut short as failed, so they can be resumed and their uploads expire.
+    
+    Only in-process job backends lose their jobs on a restart; Celery workers carry on with theirs.
+    """
+    if lecture_store is None or not job_queue.backend.in_process:
+        return
+    try:
+        interrupted = lecture_store.fail_unfinished(INTERRUPTED_ERROR)
+    except Exception as e:
+        logger.error(f"Failed to mark interrupted lectures | Error: {str(e)}")
+        return
+    if interrupted:
+        logger.warning(f"Marked {len(interrupted)} lectures interrupted by a restart as failed; they can be resumed")
+
+
+def _sweep_failed_uploads(force: bool = False) -> int:
+    """Delete upload folders of lectures that failed over FAILED_UPLOAD_RETENTION_HOURS ago.
+    
+    Folders of queued, running or recently failed lectures are kept, and so are folders written
+    within the retention period. Runs at most once per UPLOAD_SWEEP_INTERVAL_SECONDS unless forced.
+    """
+    global _last_upload_sweep
+    with _upload_sweep_lock:
+        if not force and time.time() - _last_upload_sweep < UPLOAD_SWEEP_INTERVAL_SECONDS:
+            return 0
+        _last_upload_sweep = time.time()
+    
+    retention_seconds = FAILED_UPLOAD_RETENTION_HOURS * 3600
+    cutoff = time.time() - retention_seconds
+    removed = 0
+    try:
+        stale = [path for path in UPLOAD_DIR.iterdir() if path.is_dir() and path.stat().st_mtime < cutoff]
+        names = [path.name for path in stale]
+        if lecture_store is not None:
+            names = lecture_store.expired_failures(names, datetime.now(timezone.utc) - timedelta(seconds=retention_seconds))
+        for name in names:
+            shutil.rmtree(UPLOAD_DIR / name, ignore_errors=True)
+            removed += 1
+    except Exception as e:
+        logger.error(f"Failed to sweep old uploads: {str(e)}")
+    if removed:
+        logger.info(f"Deleted uploads of {removed} lectures that failed over {FAILED_UPLOAD_RETENTION_HOURS:g}h ago")
+    return removed
+
+
+def run_lecture_job(payload: dict, emit: Optional[Callable[[str, dict], None]] = None) -> dict:
+    """Process a saved upload and build its API response; runs on a job worker."""
+    lecture_id = payload["lecture_id"]
+    lecture_dir = Path(payload["lecture_dir"])
+    response = None
+    backend_status = None
+    queue_wait = max(0.0, time.time() - payload["queued_at"]) if payload.get("queued_at") else None
+    if queue_wait is not None:
+        metrics.JOB_QUEUE_WAIT_SECONDS.observe(queue_wait)
+    _record_status(lecture_id, PROCESSING_STATUS)
     try:
-        if not title or not title.strip():
-            raise HTTPException(status_code=400, detail="Title is required")
-        
-        if not video:
-            raise HTTPException(status_code=400, detail="Video file is required")
-        
-        lecture_id = str(uuid.uuid4())
-        logger.info(f"New upload request - Lecture: '{title}' | ID: {lecture_id}")
-        
-        lecture_dir = UPLOAD_DIR / lecture_id
-        lecture_dir.mkdir(parents=True, exist_ok=True)
-        
-        video_path = lecture_dir / f"video_{video.filename}"
-        await _save_upload_file(video, video_path)
-        logger.info(f"Video file saved: {video.filename} ({video.size or 0} bytes)")
-        
-        slides_path = None
-        if slides:
-            slides_path = lecture_dir / f"slides_{slides.filename}"
-            await _save_upload_file(slides, slides_path)
-            logger.info(f"Slides file saved: {slides.filename} ({slides.size or 0} bytes)")
-        
         processor = LectureProcessor()
         processed_lecture = processor.process_lecture(
-            video_path=str(video_path),
-            slides_path=str(slides_path) if slides_path else None,
-            lecture_dir=lecture_dir
+            video_path=payload["video_path"],
+            slides_path=payload.get("slides_path"),
+            lecture_dir=lecture_dir,
+            video_sha256=payload.get("video_sha256"),
+            slides_sha256=payload.get("slides_sha256"),
+            cache=result_cache,
+            on_event=_artifact_event_forwarder(emit) if emit else None,
+            queue_depth=max(0, job_queue.pending_count() - 1),
+            checkpoints=lecture_store.checkpoints_for(lecture_id) if lecture_store else None,
+            whisper_tier=payload.get("whisper_tier")
         )
+        backend_status = processed_lecture.get("status")
         
         response = _create_success_response(lecture_id, processed_lecture)
+        if response["timings"] is not None:
+            response["timings"]["upload_seconds"] = payload.get("upload_seconds")
+            response["timings"]["queue_wait_seconds"] = round(queue_wait, 3) if queue_wait is not None else None
         
         if response["status"] == "completed":
             logger.info(f"Lecture processing successful | ID: {lecture_id}")
         else:
             logger.warning(f"Lecture processing completed with issues | Status: {response['status']} | ID: {lecture_id}")
         
-        return JSONResponse(content=response)
+        return response
         
     except Exception as e:
-        lecture_id = lecture_id if 'lecture_id' in locals() else str(uuid.uuid4())
         logger.error(f"Error processing lecture | ID: {lecture_id} | Error: {str(e)}")
-        error_response = create_error_response(lecture_id, e)
-        return JSONResponse(status_code=HTTP_SUCCESS_STATUS, content=error_response)
+        response = create_error_response(lecture_id, e)
+        return response
     finally:
+        completed = response is not None and response["status"] == "completed"
+        _record_status(lecture_id, COMPLETED_STATUS if completed else FAILED_STATUS, None if completed else response and response["error"])
         try:
-            if 'lecture_dir' in locals() and lecture_dir.exists():
+            # A failed lecture keeps its uploads until the stages that read them are checkpointed,
+            # unless it failed in a way a resume cannot fix; the sweep removes them after the retention period.
+            if lecture_dir.exists() and (
+                completed or backend_status in NON_RETRYABLE_STATUSES or _inputs_checkpointed(lecture_id, payload)
+            ):
                 shutil.rmtree(lecture_dir)
                 logger.debug(f"Cleaned up temporary files for lecture: {lecture_id}")
         except Exception:
             pass
+        _sweep_failed_uploads()
+
+
+job_queue = JobQueue(handler=run_lecture_job)
+metrics.JOB_QUEUE_DEPTH.set_function(job_queue.pending_count)
+batch_registry = BatchRegistry(job_queue)
+
+
+@app.on_event("shutdown")
+async def stop_job_queue():
+    """Stop accepting work from the job backend and the Whisper worker processes."""
+    job_queue.shutdown()
+    parallel_transcriber.shutdown()
+
+
+@app.get("/api/cache")
+async def cache_stats():
+    """Report result cache and Gemini response cache size and hit/miss counters."""
+    responses = gemini_client.response_cache.stats() if gemini_client.response_cache else None
+    if result_cache is None:
+        return {"enabled": False, "gemini_responses": responses}
+    return {"enabled": True, **result_cache.stats(), "gemini_responses": responses}
+
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Expose pipeline timings, throughput and queue depth for Prometheus to scrape."""
+    return Response(metrics.registry.render(), media_type=metrics.registry.CONTENT_TYPE)
+
+
+@app.get("/api/generation")
+async def generation_mode_stats():
+    """Compare prompt size and latency of the separate and combined generation modes."""
+    return generation_stats.stats()
+
+
+async def _save_lecture_upload(
+    lecture_id: str,
+    lecture_dir: Path,
+    video: UploadFile,
+    slides: Optional[UploadFile] = None,
+) -> dict:
+    """Save one lecture's files into lecture_dir and return its job payload."""
+    upload_started = time.perf_counter()
+    video_path = lecture_dir / f"video_{Path(video.filename).name}"
+    video_size, video_sha256 = await _save_upload_file(video, video_path)
+    logger.info(f"Video file saved: {video.filename} ({video_size} bytes)")
+    
+    slides_path = None
+    slides_sha256 = None
+    if slides:
+        slides_path = lecture_dir / f"slides_{Path(slides.filename).name}"
+        slides_size, slides_sha256 = await _save_upload_file(slides, slides_path)
+        logger.info(f"Slides file saved: {slides.filename} ({slides_size} bytes)")
+    upload_seconds = time.perf_counter() - upload_started
+    metrics.OPERATION_SECONDS.observe(upload_seconds, operation="upload_save")
+    
+    return {
+        "lecture_id": lecture_id,
+        "lecture_dir": str(lecture_dir),
+        "video_path": str(video_path),
+        "video_sha256": video_sha256,
+        "slides_path": str(slides_path) if slides_path else None,
+        "slides_sha256": slides_sha256,
+        "upload_seconds": round(upload_seconds, 3),
+        "queued_at": time.time(),
+    }
+
+
+@app.post("/api/upload", status_code=HTTP_ACCEPTED_STATUS)
+async def upload_lecture(
+    title: str = Form(...),
+    video: UploadFile = File(...),
+    slides: Optional[UploadFile] = File(None),
+):
+    """Save a lecture upload and queue it for processing."""
+    if not title or not title.strip():
+        raise HTTPException(status_code=400, detail="Title is required")
+    
+    if not video:
+        raise HTTPException(status_code=400, detail="Video file is required")
+    
+    lecture_id = str(uuid.uuid4())
+    logger.info(f"New upload request - Lecture: '{title}' | ID: {lecture_id}")
+    
+    lecture_dir = UPLOAD_DIR / lecture_id
+    lecture_dir.mkdir(parents=True, exist_ok=True)
+    
+    try:
+        payload = await _save_lecture_upload(lecture_id, lecture_dir, video, slides)
+        if lecture_store is not None:
+            lecture_store.create_lecture(lecture_id, title, payload)
+        job = job_queue.submit(lecture_id, title, payload)
+    except UploadTooLargeError as e:
+        shutil.rmtree(lecture_dir, ignore_errors=True)
+        logger.warning(f"Rejected oversized upload | ID: {lecture_id} | {str(e)}")
+        raise HTTPException(status_code=HTTP_PAYLOAD_TOO_LARGE_STATUS, detail=str(e))
+    except JobQueueFullError as e:
+        shutil.rmtree(lecture_dir, ignore_errors=True)
+        _record_status(lecture_id, FAILED_STATUS, str(e))
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        shutil.rmtree(lecture_dir, ignore_errors=True)
+        logger.error(f"Error saving lecture upload | ID: {lecture_id} | Error: {str(e)}")
+        return JSONResponse(status_code=HTTP_SUCCESS_STATUS, content=create_error_response(lecture_id, e))
+    
+    return {
+        "job_id": job.job_id,
+        "lecture_id": lecture_id,
+        "status": job.status,
+        "message": "Lecture queued for processing",
+    }
+
+
+def _batch_capacity_check(count: int) -> None:
+    try:
+        batch_registry.check_capacity(count)
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+
+def _batch_whisper_tier(name: Optional[str], lectures: int) -> str:
+    try:
+        return whisper_tier_policy.tier(name).name if name else whisper_tier_policy.batch_tier(lectures).name
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _submit_batch(lectures: list, whisper_tier: str) -> dict:
+    """Record and queue a batch's lectures; on failure the saved uploads are removed."""
+    # Stored with the tier so a resumed lecture is transcribed the way the rest of its batch was.
+    lectures = [(lecture_id, title, {**payload, "whisper_tier": whisper_tier}) for lecture_id, title, payload in lectures]
+    try:
+        if lecture_store is not None:
+            for lecture_id, title, payload in lectures:
+                lecture_store.create_lecture(lecture_id, title, payload)
+        batch = batch_registry.submit(lectures, whisper_tier)
+    except Exception as e:
+        # Lectures that made it into the queue keep their uploads and run as usual.
+        queued = len(e.batch.jobs) if isinstance(e, BatchPartiallyQueuedError) else 0
+        error = e.error if isinstance(e, BatchPartiallyQueuedError) else e
+        for lecture_id, title, payload in lectures[queued:]:
+            shutil.rmtree(payload["lecture_dir"], ignore_errors=True)
+            _record_status(lecture_id, FAILED_STATUS, str(error))
+        if isinstance(e, BatchPartiallyQueuedError):
+            raise HTTPException(
+                status_code=503,
+                detail=f"{str(error)}; batch {e.batch.batch_id} kept the first {queued} of {len(lectures)} lectures",
+            )
+        if isinstance(e, JobQueueFullError):
+            raise HTTPException(status_code=503, detail=str(e))
+        raise
+    return {
+        "batch_id": batch.batch_id,
+        "whisper_tier": whisper_tier,
+        "lectures": [
+            {"job_id": job.job_id, "lecture_id": job.lecture_id, "title": job.title, "status": job.status}
+            for job in batch.jobs
+        ],
+        "message": f"{len(batch.jobs)} lectures queued for processing",
+    }
+
+
+@app.post("/api/batches", status_code=HTTP_ACCEPTED_STATUS)
+async def upload_batch(
+    videos: List[UploadFile] = File(...),
+    slides: Optional[List[UploadFile]] = File(None),
+    titles: Optional[List[str]] = Form(None),
+    whisper_tier: Optional[str] = Form(None),
+):
+    """Save many lecture uploads and queue them as one batch.
+    
+    Slides are matched to videos by file name without the extension, so those names must be
+    unique among the slides and among the videos that have slides; titles, if given, follow
+    the order of the videos and default to the video file names. Every lecture in the batch is
+    transcribed with the same Whisper tier so they all reuse one loaded model.
+    """
+    if titles and len(titles) != len(videos):
+        raise HTTPException(status_code=400, detail="Give one title per video, or none")
+    _batch_capacity_check(len(videos))
+    tier = _batch_whisper_tier(whisper_tier, len(videos))
+    slides_by_stem = {}
+    for file in slides or []:
+        stem = Path(file.filename).stem
+        if stem in slides_by_stem:
+            raise HTTPException(status_code=400, detail=f"Two slide files are named {stem}; slide names must be unique")
+        slides_by_stem[stem] = file
+    video_stems = [Path(video.filename).stem for video in videos]
+    shared = sorted({stem for stem in video_stems if video_stems.count(stem) > 1 and stem in slides_by_stem})
+    if shared:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Several videos are named {', '.join(shared)}, so their slides cannot be matched; rename them",
+        )
+    
+    lectures = []
+    lecture_dirs = []
+    try:
+        for index, video in enumerate(videos):
+            lecture_id = str(uuid.uuid4())
+            lecture_dir = UPLOAD_DIR / lecture_id
+            lecture_dir.mkdir(parents=True, exist_ok=True)
+            lecture_dirs.append(lecture_dir)
+            stem = Path(video.filename).stem
+            payload = await _save_lecture_upload(lecture_id, lecture_dir, video, slides_by_stem.get(stem))
+            lectures.append((lecture_id, (titles[index] if titles else "").strip() or stem, payload))
+    except Exception as e:
+        for lecture_dir in lecture_dirs:
+            shutil.rmtree(lecture_dir, ignore_errors=True)
+        if isinstance(e, UploadTooLargeError):
+            raise HTTPException(status_code=HTTP_PAYLOAD_TOO_LARGE_STATUS, detail=str(e))
+        logger.error(f"Error saving batch upload | Error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error saving batch upload: {str(e)}")
+    
+    return _submit_batch(lectures, tier)
+
+
+@app.post("/api/batches/manifest", status_code=HTTP_ACCEPTED_STATUS)
+async def submit_batch_manifest(manifest: BatchManifest):
+    """Queue lectures whose files are already on the server, under BATCH_MANIFEST_ROOT.
+    
+    The files are read in place and are not removed after processing.
+    """
+    if not manifest.lectures:
+        raise HTTPException(status_code=400, detail="Manifest lists no lectures")
+    _batch_capacity_check(len(manifest.lectures))
+    tier = _batch_whisper_tier(manifest.whisper_tier, len(manifest.lectures))
+    
+    lectures = []
+    try:
+        for entry in manifest.lectures:
+            video_path = resolve_manifest_path(entry.video_path)
+            slides_path = resolve_manifest_path(entry.slides_path) if entry.slides_path else None
+            lecture_id = str(uuid.uuid4())
+            lectures.append((lecture_id, entry.title, {
+                "lecture_id": lecture_id,
+                # Holds only temporary files; the manifest's own files stay where they are.
+                "lecture_dir": str(UPLOAD_DIR / lecture_id),
+                "video_path": str(video_path),
+                "video_sha256": None,
+                "slides_path": str(slides_path) if slides_path else None,
+                "slides_sha256": None,
+                "upload_seconds": 0.0,
+                "queued_at": time.time(),
+            }))
+    except InvalidManifestPathError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    for lecture_id, title, payload in lectures:
+        Path(payload["lecture_dir"]).mkdir(parents=True, exist_ok=True)
+    return _submit_batch(lectures, tier)
+
+
+@app.get("/api/batches/{batch_id}")
+async def get_batch(batch_id: str):
+    """Report each lecture of a batch and the batch's throughput in audio-hours per hour."""
+    try:
+        batch = batch_registry.get(batch_id)
+    except BatchNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return batch.to_dict()
+
+
+def _stored_lecture(lecture_id: str) -> dict:
+    if lecture_store is None:
+        raise HTTPException(status_code=404, detail="Server-side lecture store is disabled")
+    try:
+        return lecture_store.get_lecture(lecture_id)
+    except LectureNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@app.get("/api/lectures/{lecture_id}")
+async def get_stored_lecture(lecture_id: str):
+    """Return a stored lecture's state and whatever stages it has finished."""
+    lecture = _stored_lecture(lecture_id)
+    saved = lecture_store.load_checkpoints(lecture_id)
+    transcript = saved.get("transcript") or {}
+    return {
+        "lecture_id": lecture_id,
+        "title": lecture["title"],
+        "status": lecture["status"],
+        "error": lecture["error"],
+        "created_at": lecture["created_at"],
+        "updated_at": lecture["updated_at"],
+        "checkpoints": lecture["checkpoints"],
+        "transcript": transcript.get("text"),
+        "segments": transcript.get("segments"),
+        "notes": saved.get("notes"),
+        "flashcards": saved.get("flashcards"),
+        "quiz": _transform_quiz_format(saved.get("quiz") or []),
+    }
+
+
+@app.post("/api/lectures/{lecture_id}/resume", status_code=HTTP_ACCEPTED_STATUS)
+async def resume_lecture(lecture_id: str):
+    """Queue a failed or interrupted lecture again; stages it already finished are not repeated."""
+    lecture = _stored_lecture(lecture_id)
+    if lecture["status"] in (QUEUED_STATUS, PROCESSING_STATUS, COMPLETED_STATUS):
+        raise HTTPException(status_code=409, detail=f"Lecture is {lecture['status']}")
+    
+    payload = lecture["payload"]
+    if "transcript" not in lecture["checkpoints"] and not Path(payload["video_path"]).exists():
+        raise HTTPException(status_code=409, detail="The upload is gone and no transcript was saved; upload it again")
+    
+    _record_status(lecture_id, QUEUED_STATUS)
+    try:
+        job = job_queue.submit(lecture_id, lecture["title"], {**payload, "queued_at": time.time(), "upload_seconds": None})
+    except JobQueueFullError as e:
+        _record_status(lecture_id, lecture["status"], lecture["error"])
+        raise HTTPException(status_code=503, detail=str(e))
+    logger.info(f"Lecture resumed | ID: {lecture_id} | Checkpoints: {', '.join(lecture['checkpoints']) or 'none'}")
+    return {
+        "job_id": job.job_id,
+        "lecture_id": lecture_id,
+        "status": job.status,
+        "checkpoints": lecture["checkpoints"],
+        "message": "Lecture queued to resume from its last finished stage",
+    }
+
+
+@app.post("/api/lectures/{lecture_id}/artifacts/{artifact}")
+async def regenerate_artifact(
+    lecture_id: str,
+    artifact: str,
+    num_cards: Optional[int] = Query(None, ge=1, le=REGENERATE_MAX_ITEMS),
+    num_questions: Optional[int] = Query(None, ge=1, le=REGENERATE_MAX_ITEMS),
+    refresh: bool = False,
+):
+    """Generate one of notes, flashcards or quiz again from the lecture's stored transcript.
+    
+    num_cards sets the number of flashcards and num_questions the number of quiz questions.
+    Repeating a request is answered from the Gemini response cache without a call; refresh
+    asks Gemini again for a new variation. Lectures still queued or processing are refused.
+    """
+    if artifact not in ARTIFACT_NAMES:
+        raise HTTPException(status_code=400, detail=f"Unknown artifact: {artifact}; expected one of {', '.join(ARTIFACT_NAMES)}")
+    if num_cards is not None and artifact != "flashcards":
+        raise HTTPException(status_code=400, detail="num_cards only applies to flashcards")
+    if num_questions is not None and artifact != "quiz":
+        raise HTTPException(status_code=400, detail="num_questions only applies to quiz")
+    lecture = _stored_lecture(lecture_id)
+    # A running pipeline writes the same checkpoints and record; let it finish first.
+    if lecture["status"] in (QUEUED_STATUS, PROCESSING_STATUS):
+        raise HTTPException(status_code=409, detail=f"Lecture is {lecture['status']}")
+    saved = lecture_store.load_checkpoints(lecture_id, ["transcript", "slides"])
+    if "transcript" not in saved:
+        raise HTTPException(status_code=409, detail="Lecture has no stored transcript yet")
+    
+    value = await run_in_threadpool(
+        LectureProcessor.regenerate_artifact, artifact, saved["transcript"], saved.get("slides"),
+        num_cards or FLASHCARD_COUNT, num_questions or QUIZ_QUESTION_COUNT, refresh
+    )
+    if not value:
+        raise HTTPException(status_code=502, detail=f"Generating {artifact} failed")
+    
+    lecture_store.save_checkpoint(lecture_id, artifact, value)
+    lecture = lecture_store.get_lecture(lecture_id)
+    if lecture["status"] != COMPLETED_STATUS and all(name in lecture["checkpoints"] for name in ARTIFACT_NAMES):
+        _record_status(lecture_id, COMPLETED_STATUS)
+    logger.info(f"Artifact regenerated | ID: {lecture_id} | Artifact: {artifact}")
+    return {
+        "lecture_id": lecture_id,
+        "artifact": artifact,
+        "data": _transform_quiz_format(value) if artifact == "quiz" else value,
+    }
+
+
+@app.get("/api/search")
+async def search_lectures(
+    q: str,
+    page: int = 1,
+    page_size: int = SEARCH_PAGE_SIZE,
+    kind: Optional[List[str]] = Query(None),
+    lecture_id: Optional[str] = None,
+):
+    """Search every stored lecture's transcript, notes and slides, best matches first.
+    
+    Transcript hits carry the segment's start and end in seconds; kind filters to
+    transcript, notes or slides and may be repeated.
+    """
+    if lecture_store is None or lecture_store.search_index is None:
+        raise HTTPException(status_code=503, detail="Server-side search is not available")
+    unknown = [name for name in kind or [] if name not in SEARCHABLE_STAGES]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown kind: {', '.join(unknown)}; expected one of {', '.join(SEARCHABLE_STAGES)}")
+    
+    try:
+        results = await run_in_threadpool(lecture_store.search_index.search, q, page, page_size, kind, lecture_id)
+    except InvalidSearchQueryError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    metrics.SEARCH_SECONDS.observe(results["took_ms"] / 1000)
+    return results
+
+
+@app.get("/api/jobs/{job_id}")
+async def get_job_status(job_id: str):
+    """Report the state of a processing job."""
+    try:
+        return job_queue.get(job_id).to_dict()
+    except JobNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+def _job_response(job: Job) -> dict:
+    """Final API response of a finished job."""
+    if job.status == Job.FAILED_STATUS:
+        return create_error_response(job.lecture_id, Exception(job.error or "Processing failed"))
+    return job.result
+
+
+@app.get("/api/jobs/{job_id}/result")
+async def get_job_result(job_id: str):
+    """Return the study pack of a finished job, or its state while it is still running."""
+    try:
+        job = job_queue.get(job_id)
+    except JobNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    
+    if not job.finished:
+        return JSONResponse(status_code=HTTP_ACCEPTED_STATUS, content=job.to_dict())
+    
+    return JSONResponse(status_code=HTTP_SUCCESS_STATUS, content=_job_response(job))
+
+
+def _format_sse(event_type: str, data, event_id: Optional[int] = None) -> str:
+    lines = [f"id: {event_id}"] if event_id is not None else []
+    lines.append(f"event: {event_type}")
+    lines.append(f"data: {json.dumps(data)}")
+    return "\n".join(lines) + "\n\n"
+
+
+async def _stream_job_events(job_id: str, start_index: int):
+    """Yield job events as Server-Sent Events until the job finishes.
+    
+    A status event goes out first, so clients can tell a working stream from one that never delivers.
+    """
+    next_index = start_index
+    idle_seconds = 0.0
+    yield f"retry: {SSE_RETRY_MS}\n\n"
+    try:
+        yield _format_sse("status", {"status": job_queue.get(job_id).status})
+    except JobNotFoundError:
+        yield _format_sse("error", {"detail": f"Job not found: {job_id}"})
+        return
+    while True:
+        try:
+            job = job_queue.get(job_id)
+        except JobNotFoundError:
+            yield _format_sse("error", {"detail": f"Job not found: {job_id}"})
+            return
+        
+        events = job.events_since(next_index)
+        for event in events:
+            yield _format_sse(event["event"], event["data"], event["id"])
+        next_index += len(events)
+        
+        if job.finished and not job.events_since(next_index):
+            yield _format_sse("result", _job_response(job))
+            yield _format_sse("done", {"status": job.status})
+            return
+        
+        if events:
+            idle_seconds = 0.0
+        else:
+            idle_seconds += SSE_POLL_INTERVAL
+            if idle_seconds >= SSE_KEEPALIVE_SECONDS:
+                idle_seconds = 0.0
+                yield ": keepalive\n\n"
+        await asyncio.sleep(SSE_POLL_INTERVAL)
+
+
+@app.get("/api/jobs/{job_id}/events")
+async def stream_job_events(job_id: str, request: Request):
+    """Stream stage progress, transcription progress and finished artifacts of a job."""
+    try:
+        job_queue.get(job_id)
+    except JobNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    
+    last_event_id = request.headers.get("last-event-id")
+    start_index = int(last_event_id) + 1 if last_event_id and last_event_id.isdigit() else 0
+    return StreamingResponse(
+        _stream_job_events(job_id, start_index),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,288 @@
+"""
+Process-wide metrics in the Prometheus text format, plus per-request timing breakdowns
+"""
+import time
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+LabelValues = Tuple[str, ...]
+
+DEFAULT_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+RATIO_BUCKETS = (0.5, 1, 2, 5, 10, 20, 50, 100, 200)
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class _Metric:
+    """Base for a named metric family with a fixed set of label names."""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _label_values(self, labels: dict) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _label_text(self, values: LabelValues, extra: Sequence[Tuple[str, str]] = ()) -> str:
+        pairs = list(zip(self.labelnames, values)) + list(extra)
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        header = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        return "\n".join(header + self.samples())
+
+
+class Counter(_Metric):
+    """Monotonically increasing total."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            return [f"{self.name}{self._label_text(key)} {_format_value(value)}" for key, value in sorted(self._values.items())]
+
+
+class Gauge(_Metric):
+    """Value that can go up and down, or is read from a callback at scrape time."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._callback: Optional[Callable[[], float]] = None
+
+    def set(self, value: float, **labels) -> None:
+        key = self._label_values(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def set_function(self, callback: Callable[[], float]) -> None:
+        """Read an unlabelled gauge from callback whenever metrics are rendered."""
+        self._callback = callback
+
+    def samples(self) -> List[str]:
+        if self._callback is not None:
+            try:
+                self.set(self._callback())
+            except Exception:
+                pass
+        with self._lock:
+            return [f"{self.name}{self._label_text(key)} {_format_value(value)}" for key, value in sorted(self._values.items())]
+
+
+class Histogram(_Metric):
+    """Distribution of observations in cumulative buckets."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._counts: Dict[LabelValues, List[int]] = {}
+        self._sums: Dict[LabelValues, float] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._label_values(labels)
+        with self._lock:
+            counts = self._counts.setdefault(key, [0] * len(self.buckets))
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+            self._sums[key] = self._sums.get(key, 0.0) + value
+
+    def samples(self) -> List[str]:
+        lines = []
+        with self._lock:
+            for key in sorted(self._counts):
+                for bound, count in zip(self.buckets, self._counts[key]):
+                    lines.append(f"{self.name}_bucket{self._label_text(key, [('le', _format_value(bound))])} {count}")
+                lines.append(f"{self.name}_sum{self._label_text(key)} {_format_value(self._sums[key])}")
+                lines.append(f"{self.name}_count{self._label_text(key)} {self._counts[key][-1]}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds metric families and renders them for a /metrics scrape."""
+
+    CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric already registered: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+registry = MetricsRegistry()
+
+OPERATION_SECONDS = registry.register(Histogram(
+    "lectureiq_operation_seconds",
+    "Duration of individual processing operations such as audio extraction, model load and Gemini calls.",
+    ["operation"],
+))
+PIPELINE_STAGE_SECONDS = registry.register(Histogram(
+    "lectureiq_pipeline_stage_seconds", "Duration of lecture pipeline stages.", ["stage"],
+))
+LECTURE_SECONDS = registry.register(Histogram(
+    "lectureiq_lecture_seconds", "End-to-end lecture processing time.", ["status"],
+))
+LECTURES_TOTAL = registry.register(Counter(
+    "lectureiq_lectures_total", "Lectures processed, by final status.", ["status"],
+))
+JOB_QUEUE_WAIT_SECONDS = registry.register(Histogram(
+    "lectureiq_job_queue_wait_seconds", "Time lecture jobs spent queued before a worker picked them up.",
+))
+JOB_QUEUE_DEPTH = registry.register(Gauge(
+    "lectureiq_job_queue_depth", "Lecture jobs queued or running in this process.",
+))
+AUDIO_SECONDS_TOTAL = registry.register(Counter(
+    "lectureiq_audio_seconds_total", "Seconds of lecture audio transcribed.",
+))
+TRANSCRIPTION_SECONDS_TOTAL = registry.register(Counter(
+    "lectureiq_transcription_seconds_total", "Wall seconds spent decoding audio with Whisper.",
+))
+TRANSCRIPTION_SPEED = registry.register(Histogram(
+    "lectureiq_transcription_speed_ratio", "Audio seconds transcribed per wall-clock second, per lecture.",
+    buckets=RATIO_BUCKETS,
+))
+TRANSCRIPT_CHARS_TOTAL = registry.register(Counter(
+    "lectureiq_transcript_chars_total", "Characters of transcript produced.",
+))
+SLIDES_CHARS_TOTAL = registry.register(Counter(
+    "lectureiq_slides_chars_total", "Characters of slide text extracted.",
+))
+GEMINI_CALLS_TOTAL = registry.register(Counter(
+    "lectureiq_gemini_calls_total", "Gemini generate_content calls, by outcome.", ["outcome"],
+))
+GEMINI_CHARS_TOTAL = registry.register(Counter(
+    "lectureiq_gemini_chars_total", "Characters sent to and received from Gemini.", ["direction"],
+))
+GEMINI_TOKENS_TOTAL = registry.register(Counter(
+    "lectureiq_gemini_tokens_total", "Gemini tokens reported in usage metadata.", ["direction"],
+))
+GEMINI_RETRIES_TOTAL = registry.register(Counter(
+    "lectureiq_gemini_retries_total", "Gemini calls retried after a transient error, by error type.", ["reason"],
+))
+GEMINI_RETRY_WAIT_SECONDS = registry.register(Histogram(
+    "lectureiq_gemini_retry_wait_seconds", "Backoff slept before each Gemini retry.",
+))
+GEMINI_RESPONSE_CACHE_TOTAL = registry.register(Counter(
+    "lectureiq_gemini_response_cache_total", "Gemini prompts looked up in the response cache, by result.", ["result"],
+))
+GENERATED_ITEMS_DROPPED_TOTAL = registry.register(Counter(
+    "lectureiq_generated_items_dropped_total", "Flashcards and quiz questions dropped as malformed or invalid.", ["artifact"],
+))
+SEARCH_SECONDS = registry.register(Histogram(
+    "lectureiq_search_seconds", "Time to answer a full-text search query.",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1),
+))
+
+
+class RequestTimings:
+    """Count, total and slowest duration of each operation within one request."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._operations: Dict[str, dict] = {}
+
+    def add(self, operation: str, seconds: float) -> None:
+        with self._lock:
+            entry = self._operations.setdefault(operation, {"count": 0, "seconds": 0.0, "max_seconds": 0.0})
+            entry["count"] += 1
+            entry["seconds"] += seconds
+            entry["max_seconds"] = max(entry["max_seconds"], seconds)
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                operation: {
+                    "count": entry["count"],
+                    "seconds": round(entry["seconds"], 3),
+                    "max_seconds": round(entry["max_seconds"], 3),
+                }
+                for operation, entry in self._operations.items()
+            }
+
+
+_current_timings: contextvars.ContextVar = contextvars.ContextVar("request_timings", default=None)
+
+
+@contextmanager
+def track_request(timings: RequestTimings) -> Iterator[RequestTimings]:
+    """Collect operations recorded in this context, and in work handed on with in_context, into timings."""
+    token = _current_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _current_timings.reset(token)
+
+
+def in_context(func: Callable) -> Callable:
+    """Bind func to the caller's context so pool threads report into the same request."""
+    context = contextvars.copy_context()
+    # A context can only be entered by one thread at a time, so every call runs in its own copy.
+    return lambda *args, **kwargs: context.copy().run(func, *args, **kwargs)
+
+
+def record_operation(operation: str, seconds: float) -> None:
+    OPERATION_SECONDS.observe(seconds, operation=operation)
+    timings = _current_timings.get()
+    if timings is not None:
+        timings.add(operation, seconds)
+
+
+@contextmanager
+def timed(operation: str) -> Iterator[None]:
+    """Record how long the block takes, whether or not it raises."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_operation(operation, time.perf_counter() - started)
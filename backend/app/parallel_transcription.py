@@ -0,0 +1,177 @@
+"""
+Multi-process Whisper transcription over silence-bounded audio windows
+"""
+import os
+import logging
+import threading
+import multiprocessing
+from collections import OrderedDict, deque
+from typing import TYPE_CHECKING, Any, Iterator, List, Optional, Tuple
+
+from .whisper_pool import WHISPER_MAX_LOADED_MODELS
+
+if TYPE_CHECKING:
+    from .audio_io import AudioData
+
+logger = logging.getLogger(__name__)
+
+# 0 turns parallel transcription off.
+WHISPER_PARALLEL_WORKERS = int(os.getenv("WHISPER_PARALLEL_WORKERS", "0"))
+WHISPER_THREADS_PER_WORKER = int(os.getenv("WHISPER_THREADS_PER_WORKER", "2"))
+WHISPER_PARALLEL_MIN_SECONDS = float(os.getenv("WHISPER_PARALLEL_MIN_SECONDS", "300"))
+WHISPER_WINDOW_SECONDS = float(os.getenv("WHISPER_WINDOW_SECONDS", "120"))
+
+PoolKey = Tuple[str, int, int]
+
+# Per worker process: device and thread count from _init_worker, models loaded on first use.
+_worker_settings: dict = {}
+_worker_models: "OrderedDict[Tuple[str, str], Any]" = OrderedDict()
+
+
+def _init_worker(device: str, cpu_threads: int) -> None:
+    _worker_settings.update({"device": device, "cpu_threads": cpu_threads})
+
+
+def _worker_model(model_size: str, compute_type: str) -> Any:
+    """Return a model loaded in this worker, dropping the least recently used beyond the limit."""
+    key = (model_size, compute_type)
+    if key in _worker_models:
+        _worker_models.move_to_end(key)
+        return _worker_models[key]
+    from faster_whisper import WhisperModel
+    while len(_worker_models) >= max(1, WHISPER_MAX_LOADED_MODELS):
+        _worker_models.popitem(last=False)
+    _worker_models[key] = WhisperModel(
+        model_size, device=_worker_settings["device"], compute_type=compute_type,
+        cpu_threads=_worker_settings["cpu_threads"], num_workers=1,
+    )
+    return _worker_models[key]
+
+
+def _transcribe_window(task: dict) -> Tuple[List[dict], float]:
+    """Transcribe one window in a worker, shifting its segments onto the lecture timeline.
+
+    Returns the segments and the seconds of audio left after Whisper's own VAD filter, if used.
+    """
+    model = _worker_model(task["model_size"], task["compute_type"])
+    offset_seconds = task["offset_seconds"]
+    segments, info = model.transcribe(
+        task["audio"], language=task["language"], beam_size=task["beam_size"], vad_filter=task["vad_filter"]
+    )
+    results = []
+    for segment in segments:
+        text = segment.text.strip()
+        if text:
+            results.append({
+                "start": round(offset_seconds + segment.start, 2),
+                "end": round(offset_seconds + segment.end, 2),
+                "text": text,
+            })
+    return results, getattr(info, "duration_after_vad", None) or info.duration
+
+
+class ParallelTranscriber:
+    """Keeps one process pool of Whisper workers warm and fans lecture windows out across it."""
+
+    def __init__(
+        self,
+        workers: int = WHISPER_PARALLEL_WORKERS,
+        threads_per_worker: int = WHISPER_THREADS_PER_WORKER,
+        window_seconds: float = WHISPER_WINDOW_SECONDS,
+        min_seconds: float = WHISPER_PARALLEL_MIN_SECONDS,
+    ):
+        self.workers = workers
+        self.threads_per_worker = max(1, threads_per_worker)
+        self.window_seconds = window_seconds
+        self.min_seconds = min_seconds
+        self._pool = None
+        self._pool_key: Optional[PoolKey] = None
+        self._lock = threading.Lock()
+
+    def enabled_for(self, num_samples: int, sample_rate: int) -> bool:
+        return self.workers > 1 and num_samples / sample_rate >= self.min_seconds
+
+    def _get_pool(self, device: str):
+        key = (device, self.workers, self.threads_per_worker)
+        with self._lock:
+            if self._pool is not None and self._pool_key != key:
+                self._pool.terminate()
+                self._pool = None
+            if self._pool is None:
+                logger.info(
+                    f"Starting {self.workers} Whisper worker processes ({self.threads_per_worker} threads each)"
+                )
+                # Spawned workers do not inherit the API process's threads or loaded models.
+                context = multiprocessing.get_context("spawn")
+                self._pool = context.Pool(
+                    self.workers,
+                    initializer=_init_worker,
+                    initargs=(device, self.threads_per_worker),
+                )
+                self._pool_key = key
+            return self._pool
+
+    def warm_up(self, model_size: str, device: str, compute_type: str) -> None:
+        """Start the worker processes and push a short window through each so model loading is done."""
+        import numpy as np
+
+        pool = self._get_pool(device)
+        task = {
+            "audio": np.zeros(1600, dtype=np.float32), "offset_seconds": 0.0, "language": None,
+            "model_size": model_size, "compute_type": compute_type, "beam_size": 1, "vad_filter": False,
+        }
+        pool.map(_transcribe_window, [task] * self.workers, chunksize=1)
+
+    def stream(
+        self,
+        audio: "AudioData",
+        sample_rate: int,
+        model_size: str,
+        device: str,
+        compute_type: str,
+        language: Optional[str] = None,
+        vad_filter: bool = False,
+        beam_size: int = 5,
+    ) -> Iterator[Tuple[List[dict], float, float]]:
+        """Yield (segments, window end, speech seconds) per window in lecture order while later windows run.
+
+        A window's audio is read only when it is sent to a worker, and at most two windows per
+        worker are in flight, so memory use is bounded by the window size, not the lecture length.
+        """
+        from .vad import split_on_silence
+
+        windows = split_on_silence(audio, sample_rate, self.window_seconds)
+        logger.info(f"Transcribing {len(windows)} windows across {self.workers} processes")
+        pool = self._get_pool(device)
+        upcoming = iter(windows)
+        in_flight = deque()
+
+        def submit_next() -> None:
+            window = next(upcoming, None)
+            if window is None:
+                return
+            start, end = window
+            task = {
+                "audio": audio[start:end], "offset_seconds": start / sample_rate, "language": language,
+                "model_size": model_size, "compute_type": compute_type, "beam_size": beam_size,
+                "vad_filter": vad_filter,
+            }
+            in_flight.append((end, pool.apply_async(_transcribe_window, (task,))))
+
+        for _ in range(self.workers * 2):
+            submit_next()
+        while in_flight:
+            end, result = in_flight.popleft()
+            segments, speech_seconds = result.get()
+            submit_next()
+            yield segments, end / sample_rate, speech_seconds
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool.terminate()
+                self._pool = None
+                self._pool_key = None
+
+
+parallel_transcriber = ParallelTranscriber()
@@ -0,0 +1,114 @@
+"""
+Dependency-ordered stage runner for the lecture processing pipeline
+"""
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from .metrics import in_context
+
+logger = logging.getLogger(__name__)
+
+
+class StageFailedError(Exception):
+    """Raised by a stage to stop the pipeline with a specific status code."""
+
+    def __init__(self, status: str, message: str = ""):
+        super().__init__(message or status)
+        self.status = status
+
+
+class Stage:
+    """A named unit of work that runs once its dependencies have produced results."""
+
+    def __init__(self, name: str, func: Callable[[Dict[str, Any]], Any], depends_on: Sequence[str] = ()):
+        self.name = name
+        self.func = func
+        self.depends_on = tuple(depends_on)
+
+
+class PipelineResult:
+    """Outputs, timings and the first failure of a pipeline run."""
+
+    def __init__(self):
+        self.results: Dict[str, Any] = {}
+        self.timings: Dict[str, float] = {}
+        self.failed_stage: Optional[str] = None
+        self.error: Optional[Exception] = None
+        self.wall_seconds = 0.0
+
+    @property
+    def succeeded(self) -> bool:
+        return self.error is None
+
+
+def _timed(stage: Stage, inputs: Dict[str, Any]) -> tuple:
+    started = time.perf_counter()
+    try:
+        return stage.func(inputs), time.perf_counter() - started, None
+    except Exception as e:
+        return None, time.perf_counter() - started, e
+
+
+EventCallback = Callable[[str, dict], None]
+
+
+def run_stages(
+    stages: List[Stage],
+    initial_results: Optional[Dict[str, Any]] = None,
+    on_event: Optional[EventCallback] = None,
+) -> PipelineResult:
+    """Run stages concurrently as soon as their dependencies finish.
+
+    A failing stage stops new stages from starting; stages already running are allowed to
+    finish so that no work is left touching the lecture directory after the run returns.
+    on_event, if given, receives a "stage" event whenever a stage starts, finishes or fails.
+    """
+    emit = on_event or (lambda event_type, data: None)
+    outcome = PipelineResult()
+    outcome.results.update(initial_results or {})
+    pending = {stage.name: stage for stage in stages}
+    for stage in stages:
+        unknown = [dep for dep in stage.depends_on if dep not in pending and dep not in outcome.results]
+        if unknown:
+            raise ValueError(f"Stage {stage.name} depends on unknown stages: {', '.join(unknown)}")
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, len(stages)), thread_name_prefix="stage") as executor:
+        running = {}
+        while pending or running:
+            if outcome.error is None:
+                ready = [
+                    stage for stage in pending.values()
+                    if all(dep in outcome.results for dep in stage.depends_on)
+                ]
+                for stage in ready:
+                    del pending[stage.name]
+                    inputs = {dep: outcome.results[dep] for dep in stage.depends_on}
+                    emit("stage", {"stage": stage.name, "state": "started"})
+                    running[executor.submit(in_context(_timed), stage, inputs)] = stage
+            elif not running:
+                break
+
+            if not running:
+                raise RuntimeError(f"Pipeline stages can never run: {', '.join(pending)}")
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage = running.pop(future)
+                value, seconds, error = future.result()
+                outcome.timings[stage.name] = round(seconds, 3)
+                if error is not None:
+                    logger.error(f"Stage '{stage.name}' failed after {seconds:.2f}s: {str(error)}")
+                    emit("stage", {"stage": stage.name, "state": "failed", "seconds": round(seconds, 3), "error": str(error)})
+                    if outcome.error is None:
+                        outcome.error = error
+                        outcome.failed_stage = stage.name
+                else:
+                    logger.info(f"Stage '{stage.name}' finished in {seconds:.2f}s")
+                    outcome.results[stage.name] = value
+                    emit("stage", {"stage": stage.name, "state": "finished", "seconds": round(seconds, 3)})
+
+    outcome.wall_seconds = round(time.perf_counter() - started, 3)
+    return outcome
@@ -0,0 +1,147 @@
+"""
+Prompt templates for Gemini content generation
+"""
+from typing import List, Optional
+
+# Bump whenever a prompt changes so cached study packs are regenerated.
+PROMPT_VERSION = "4"
+
+FLASHCARD_JSON_EXAMPLE = """[
+    {"question": "What is...", "answer": "Definition and explanation...", "difficulty": "easy"},
+    {"question": "How does...", "answer": "...", "difficulty": "medium"},
+    ...
+]"""
+
+QUIZ_JSON_EXAMPLE = """[
+    {
+        "question": "Which of the following is...",
+        "options": {"A": "Option 1", "B": "Option 2", "C": "Option 3", "D": "Option 4"},
+        "correct_answer": "B",
+        "explanation": "The correct answer is B because..."
+    },
+    {
+        "question": "What is...",
+        "options": {"A": "Option 1", "B": "Option 2", "C": "Option 3", "D": "Option 4"},
+        "correct_answer": "A",
+        "explanation": "..."
+    }
+]"""
+
+
+def _slides_section(slides_content: Optional[str]) -> str:
+    return "Additional Materials (Slides/PDF):" + slides_content if slides_content else ""
+
+
+def notes_prompt(transcript: str, slides_content: Optional[str] = None) -> str:
+    """Prompt for markdown study notes."""
+    return f"""You are an expert study guide creator. Create comprehensive, well-organized study notes from the following lecture material.
+
+Format the notes with:
+- Clear section headings
+- Key concepts highlighted
+- Main points as bullet points
+- Important definitions and explanations
+
+Lecture Transcript:
+{transcript}
+
+{_slides_section(slides_content)}
+
+Generate clear, concise, and comprehensive study notes suitable for a student studying this lecture."""
+
+
+def flashcards_prompt(transcript: str, slides_content: Optional[str], num_cards: int) -> str:
+    """Prompt for a JSON array of flashcards."""
+    return f"""Create {num_cards} flashcards for studying this lecture material.
+
+Format your response as a JSON array with this structure:
+{FLASHCARD_JSON_EXAMPLE}
+
+Include a mix of difficulty levels (easy, medium, hard).
+Ensure questions test understanding, not just memorization.
+
+Lecture Transcript:
+{transcript}
+
+{_slides_section(slides_content)}
+
+Generate exactly {num_cards} flashcards as a valid JSON array only, no other text."""
+
+
+def quiz_prompt(transcript: str, slides_content: Optional[str], num_questions: int) -> str:
+    """Prompt for a JSON array of multiple-choice questions."""
+    return f"""Create {num_questions} multiple-choice quiz questions from this lecture material.
+
+Format your response ONLY as a valid JSON array, nothing else. No markdown, no explanation before or after.
+
+{QUIZ_JSON_EXAMPLE}
+
+Requirements:
+- Each question must have exactly 4 options with keys A, B, C, D
+- correct_answer must be a single letter: A, B, C, or D
+- Include clear explanations
+- Return ONLY the JSON array, no other text or formatting
+
+Lecture Transcript:
+{transcript}
+
+{_slides_section(slides_content)}"""
+
+
+def partial_notes_prompt(chunk: str, part: int, total_parts: Optional[int] = None) -> str:
+    """Map step: notes for one section of a long lecture.
+
+    total_parts is left out when notes are requested while the lecture is still being transcribed.
+    """
+    position = f"part {part} of {total_parts}" if total_parts else f"part {part}"
+    return f"""You are an expert study guide creator. The following is {position} of a long lecture transcript.
+
+Write well-organized study notes for this part only:
+- Clear section headings
+- Key concepts highlighted
+- Main points as bullet points
+- Important definitions and explanations
+
+Do not add an introduction or conclusion for the whole lecture; the parts will be merged afterwards.
+
+Lecture Transcript ({position}):
+{chunk}"""
+
+
+def merge_notes_prompt(partial_notes: List[str], slides_content: Optional[str] = None) -> str:
+    """Reduce step: merge per-part notes into one study guide."""
+    sections = "\n\n".join(
+        f"--- Notes for part {index} ---\n{notes}" for index, notes in enumerate(partial_notes, start=1)
+    )
+    return f"""You are an expert study guide creator. Below are study notes written separately for consecutive parts of one lecture.
+
+Merge them into a single set of comprehensive, well-organized study notes:
+- Keep the lecture's order
+- Combine repeated topics and remove duplicated points
+- Clear section headings, key concepts highlighted, main points as bullet points
+- Keep important definitions and explanations
+
+{sections}
+
+{_slides_section(slides_content)}
+
+Generate clear, concise, and comprehensive study notes suitable for a student studying this lecture."""
+
+
+def combined_prompt(transcript: str, slides_content: Optional[str], num_cards: int, num_questions: int) -> str:
+    """Prompt for notes, flashcards and quiz in a single JSON document."""
+    return f"""You are an expert study guide creator. From the following lecture material, create a complete study pack.
+
+Respond ONLY with one valid JSON object, no markdown fences and no text before or after, with exactly these keys:
+- "notes": comprehensive, well-organized study notes as a markdown string with clear section headings, key concepts highlighted, main points as bullet points, and important definitions and explanations
+- "flashcards": an array of exactly {num_cards} flashcards shaped like
+{FLASHCARD_JSON_EXAMPLE}
+  with a mix of difficulty levels (easy, medium, hard) that test understanding, not just memorization
+- "quiz": an array of exactly {num_questions} multiple-choice questions shaped like
+{QUIZ_JSON_EXAMPLE}
+  where each question has exactly 4 options with keys A, B, C, D, correct_answer is a single letter A, B, C or D, and every question has a clear explanation
+
+Lecture Transcript:
+{transcript}
+
+{_slides_section(slides_content)}"""
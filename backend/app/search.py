@@ -0,0 +1,226 @@
+"""
+Full-text search over stored transcripts, notes and slides, ranked with BM25 by SQLite FTS5
+"""
+import os
+import re
+import html
+import time
+import logging
+from typing import Any, Iterable, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+logger = logging.getLogger(__name__)
+
+SEARCH_PAGE_SIZE = int(os.getenv("SEARCH_PAGE_SIZE", "20"))
+SEARCH_MAX_PAGE_SIZE = int(os.getenv("SEARCH_MAX_PAGE_SIZE", "100"))
+SEARCH_SNIPPET_TOKENS = int(os.getenv("SEARCH_SNIPPET_TOKENS", "16"))
+
+# Checkpointed stages whose text is indexed; each becomes one kind of search hit.
+SEARCHABLE_STAGES = ("transcript", "notes", "slides")
+
+# FTS5 wraps matches in these control characters; the snippet is HTML-escaped before they become <mark> tags.
+_HIGHLIGHT_START = "\x02"
+_HIGHLIGHT_END = "\x03"
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+_SLIDES_PAGE = re.compile(r"^\[Page (\d+)\]$", re.MULTILINE)
+_NOTES_HEADING = re.compile(r"^#{1,6} ", re.MULTILINE)
+
+# Segment rows live in a normal table indexed by lecture, so re-indexing one stage never scans
+# the whole index; the FTS5 table holds only the text and follows the rows through triggers.
+_SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS search_segments (
+        id INTEGER PRIMARY KEY,
+        lecture_id VARCHAR(36) NOT NULL REFERENCES lectures(id) ON DELETE CASCADE,
+        kind VARCHAR(20) NOT NULL,
+        position INTEGER NOT NULL,
+        start FLOAT,
+        "end" FLOAT,
+        text TEXT NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS ix_search_segments_lecture ON search_segments (lecture_id, kind)",
+    """CREATE VIRTUAL TABLE IF NOT EXISTS search_fts USING fts5(
+        text, content='search_segments', content_rowid='id', tokenize='porter unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS search_segments_ai AFTER INSERT ON search_segments BEGIN
+        INSERT INTO search_fts(rowid, text) VALUES (new.id, new.text);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS search_segments_ad AFTER DELETE ON search_segments BEGIN
+        INSERT INTO search_fts(search_fts, rowid, text) VALUES ('delete', old.id, old.text);
+    END""",
+)
+
+
+class InvalidSearchQueryError(ValueError):
+    """Raised when a query has no searchable words."""
+    pass
+
+
+def match_query(query: str) -> str:
+    """Turn free text into an FTS5 query matching every word.
+
+    Words are quoted, so operators and punctuation typed by users cannot break the query syntax.
+    Prefix matching is left out on purpose: a short prefix expands to thousands of terms and
+    turns a millisecond lookup into a scan, while the Porter stemmer already matches word forms.
+    """
+    words = _WORD.findall(query)
+    if not words:
+        raise InvalidSearchQueryError("Search query has no words")
+    return " ".join(f'"{word}"' for word in words)
+
+
+def highlight_snippet(snippet: str) -> str:
+    """HTML-escape indexed text and mark the matched words; transcripts and slides are user content."""
+    return (
+        html.escape(snippet or "", quote=False)
+        .replace(_HIGHLIGHT_START, "<mark>")
+        .replace(_HIGHLIGHT_END, "</mark>")
+    )
+
+
+def _sections(content: str, boundary: re.Pattern) -> List[str]:
+    starts = [match.start() for match in boundary.finditer(content)]
+    if not starts or starts[0] != 0:
+        starts.insert(0, 0)
+    return [content[start:end].strip() for start, end in zip(starts, starts[1:] + [len(content)])]
+
+
+def search_documents(stage: str, data: Any) -> List[dict]:
+    """Split a stage's output into the rows to index: transcript segments, note sections or slide pages."""
+    documents = []
+    if stage == "transcript":
+        for position, segment in enumerate((data or {}).get("segments") or []):
+            documents.append({
+                "position": position,
+                "start": segment.get("start"),
+                "end": segment.get("end"),
+                "text": segment.get("text", ""),
+            })
+    elif stage == "notes":
+        for position, section in enumerate(_sections(data or "", _NOTES_HEADING)):
+            documents.append({"position": position, "start": None, "end": None, "text": section})
+    elif stage == "slides":
+        for section in _sections(data or "", _SLIDES_PAGE):
+            page = _SLIDES_PAGE.match(section)
+            documents.append({
+                "position": int(page.group(1)) if page else 0,
+                "start": None,
+                "end": None,
+                "text": section[page.end():].strip() if page else section,
+            })
+    return [document for document in documents if document["text"].strip()]
+
+
+class SearchIndex:
+    """BM25-ranked search across every stored lecture; needs a SQLite build with FTS5."""
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+
+    def create(self) -> None:
+        with self.engine.begin() as connection:
+            for statement in _SCHEMA:
+                connection.execute(text(statement))
+
+    def replace(self, connection: Connection, lecture_id: str, stage: str, data: Any) -> None:
+        """Re-index one stage of a lecture inside the caller's transaction."""
+        if stage not in SEARCHABLE_STAGES:
+            return
+        connection.execute(
+            text("DELETE FROM search_segments WHERE lecture_id = :lecture_id AND kind = :kind"),
+            {"lecture_id": lecture_id, "kind": stage},
+        )
+        documents = search_documents(stage, data)
+        if documents:
+            connection.execute(
+                text(
+                    'INSERT INTO search_segments (lecture_id, kind, position, start, "end", text) '
+                    "VALUES (:lecture_id, :kind, :position, :start, :end, :text)"
+                ),
+                [{"lecture_id": lecture_id, "kind": stage, **document} for document in documents],
+            )
+
+    def rebuild(self, checkpoints: Iterable[tuple]) -> int:
+        """Index (lecture_id, stage, data) checkpoints stored before search existed; returns how many."""
+        count = 0
+        with self.engine.begin() as connection:
+            for lecture_id, stage, data in checkpoints:
+                self.replace(connection, lecture_id, stage, data)
+                count += 1
+        return count
+
+    def is_empty(self) -> bool:
+        with self.engine.connect() as connection:
+            return connection.execute(text("SELECT 1 FROM search_segments LIMIT 1")).first() is None
+
+    def search(
+        self,
+        query: str,
+        page: int = 1,
+        page_size: int = SEARCH_PAGE_SIZE,
+        kinds: Optional[List[str]] = None,
+        lecture_id: Optional[str] = None,
+    ) -> dict:
+        """One page of hits, best first.
+
+        Fetches one row past the page to report has_more, instead of counting every match.
+        """
+        page = max(1, page)
+        page_size = max(1, min(page_size, SEARCH_MAX_PAGE_SIZE))
+        params = {
+            "match": match_query(query),
+            "limit": page_size + 1,
+            "offset": (page - 1) * page_size,
+            "snippet_tokens": SEARCH_SNIPPET_TOKENS,
+            "highlight_start": _HIGHLIGHT_START,
+            "highlight_end": _HIGHLIGHT_END,
+        }
+        filters = ""
+        if kinds:
+            filters += " AND s.kind IN (" + ", ".join(f":kind{i}" for i in range(len(kinds))) + ")"
+            params.update({f"kind{i}": kind for i, kind in enumerate(kinds)})
+        if lecture_id:
+            filters += " AND s.lecture_id = :lecture_id"
+            params["lecture_id"] = lecture_id
+
+        started = time.perf_counter()
+        with self.engine.connect() as connection:
+            rows = connection.execute(
+                text(
+                    "SELECT s.lecture_id, l.title, s.kind, s.position, s.start, s.\"end\", "
+                    "snippet(search_fts, 0, :highlight_start, :highlight_end, '…', :snippet_tokens) AS snippet, "
+                    "bm25(search_fts) AS score "
+                    "FROM search_fts "
+                    "JOIN search_segments s ON s.id = search_fts.rowid "
+                    "JOIN lectures l ON l.id = s.lecture_id "
+                    f"WHERE search_fts MATCH :match{filters} "
+                    "ORDER BY score LIMIT :limit OFFSET :offset"
+                ),
+                params,
+            ).all()
+        took_ms = (time.perf_counter() - started) * 1000
+
+        return {
+            "query": query,
+            "page": page,
+            "page_size": page_size,
+            "has_more": len(rows) > page_size,
+            "took_ms": round(took_ms, 2),
+            "results": [
+                {
+                    "lecture_id": row.lecture_id,
+                    "title": row.title,
+                    "kind": row.kind,
+                    # Transcript segment index, slide page number or notes section index.
+                    "position": row.position,
+                    "start": row.start,
+                    "end": row.end,
+                    "snippet": highlight_snippet(row.snippet),
+                    # bm25() is lower for better matches; negated so higher means more relevant.
+                    "score": round(-row.score, 4),
+                }
+                for row in rows[:page_size]
+            ],
+        }
@@ -2,14 +2,57 @@
 Service modules for audio processing, transcription, and content generation
 """
 import os
+import re
 import json
+import math
+import time
+import shutil
 import logging
+import tempfile
+import threading
+import contextlib
+import subprocess
+import importlib.util
+import multiprocessing
 from pathlib import Path
-from typing import Optional
-import google.generativeai as genai
-import PyPDF2
-from dotenv import load_dotenv
-import numpy as np
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import TYPE_CHECKING, Callable, Iterator, List, Optional, Union
+from . import config  # noqa: F401  (loads .env before the modules below read their settings)
+from .whisper_pool import TRANSCRIPTION_CONCURRENCY, model_registry
+from .gemini_client import (
+    GEMINI_API_KEY,
+    GEMINI_MAX_CONCURRENT_CALLS,
+    gemini_client,
+    refreshing_responses,
+    transient_errors,
+)
+from .json_stream import JsonObjectStream
+from .parallel_transcription import parallel_transcriber
+from .whisper_tiers import WhisperTier, WhisperTierPolicy, tier_identity
+from . import metrics
+from .metrics import RequestTimings, in_context, record_operation, timed, track_request
+from .cache import ResultCache, file_sha256, make_cache_key
+from . import prompts
+from .prompts import PROMPT_VERSION
+from .pipeline import Stage, StageFailedError, run_stages
+from .store import LectureCheckpoints
+from .chunking import (
+    TRANSCRIPT_CHUNK_CHARS,
+    TRANSCRIPT_CHUNK_OVERLAP_CHARS,
+    SLIDES_CHUNK_CHARS,
+    IncrementalChunker,
+    chunk_segments,
+    chunk_transcript,
+    distribute,
+    merge_unique,
+    needs_chunking,
+    slides_for_chunk,
+)
+
+# NumPy and the audio modules built on it load with the first lecture, not with the API.
+if TYPE_CHECKING:
+    import numpy as np
+    from .audio_io import AudioData
 
 logger = logging.getLogger(__name__)
 
@@ -39,45 +82,104 @@ class InvalidConfigurationError(LectureProcessingError):
     pass
 
 
-load_dotenv()
-
-# Configure logging for services
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
-
-try:
-    from faster_whisper import WhisperModel
-    WHISPER_AVAILABLE = True
-except ImportError:
-    WHISPER_AVAILABLE = False
-
-try:
-    import soundfile as sf
-    SOUNDFILE_AVAILABLE = True
-except ImportError:
-    SOUNDFILE_AVAILABLE = False
-
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-if GEMINI_API_KEY:
-    genai.configure(api_key=GEMINI_API_KEY)
+# Located without importing: faster_whisper, soundfile, PyPDF2 and the Gemini SDK are imported
+# where they are first used (or by preload_dependencies), so importing this module stays cheap.
+WHISPER_AVAILABLE = importlib.util.find_spec("faster_whisper") is not None
+SOUNDFILE_AVAILABLE = importlib.util.find_spec("soundfile") is not None
 
 GEMINI_MODEL = "gemini-2.5-flash"
+GENERATION_TIMEOUT_SECONDS = float(os.getenv("GENERATION_TIMEOUT_SECONDS", "180"))
+GEMINI_GENERATION_MODE = os.getenv("GEMINI_GENERATION_MODE", "separate")
+SEPARATE_GENERATION_MODE = "separate"
+COMBINED_GENERATION_MODE = "combined"
 WHISPER_MODEL_SIZE = "base"
+WHISPER_PRELOAD = os.getenv("WHISPER_PRELOAD", "false").lower() == "true"
+# Import the Gemini SDK, PDF and audio libraries in the background once the server is up.
+PRELOAD_ON_STARTUP = os.getenv("PRELOAD_ON_STARTUP", "true").lower() == "true"
+WHISPER_PRELOAD_MODELS = [
+    size.strip() for size in os.getenv("WHISPER_PRELOAD_MODELS", WHISPER_MODEL_SIZE).split(",") if size.strip()
+]
 WHISPER_DEVICE = "cpu"
 WHISPER_COMPUTE_TYPE = "int8"
+WHISPER_BEAM_SIZE = 5
 AUDIO_SAMPLE_RATE = 16000
+FFMPEG_BINARY = os.getenv("FFMPEG_BINARY", "ffmpeg")
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "500"))
+PDF_PAGE_TIMEOUT_SECONDS = float(os.getenv("PDF_PAGE_TIMEOUT_SECONDS", "5"))
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", str(min(4, os.cpu_count() or 1))))
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "40"))
+PDF_PAGES_PER_SHARD = 10
 AUDIO_LANGUAGE = "en"
 FLASHCARD_COUNT = 10
 QUIZ_QUESTION_COUNT = 10
-TRANSCRIPT_PREVIEW_LENGTH = 3000
-SLIDES_PREVIEW_LENGTH = 1000
+ARTIFACT_NAMES = ("notes", "flashcards", "quiz")
+QUIZ_OPTION_LETTERS = ("A", "B", "C", "D")
+# Follow-up requests for flashcards or quiz questions that were malformed or missing from a reply.
+GEMINI_ITEM_TOP_UP_ATTEMPTS = int(os.getenv("GEMINI_ITEM_TOP_UP_ATTEMPTS", "2"))
+_QUIZ_ANSWER = re.compile(r"\(?([A-D])[).:]?")
+
+whisper_tier_policy = WhisperTierPolicy(
+    fixed_tier=WhisperTier("fixed", WHISPER_MODEL_SIZE, WHISPER_COMPUTE_TYPE, WHISPER_BEAM_SIZE)
+)
+
+# Job workers beyond TRANSCRIPTION_CONCURRENCY wait here for their turn to transcribe.
+_transcription_slots = threading.BoundedSemaphore(max(1, TRANSCRIPTION_CONCURRENCY))
 
 
 class AudioProcessor:
     """Handle audio extraction from video files."""
     
+    @staticmethod
+    def ffmpeg_available() -> bool:
+        """Check whether the ffmpeg binary can be found on PATH."""
+        return shutil.which(FFMPEG_BINARY) is not None
+    
+    @staticmethod
+    def decode_audio(
+        media_path: str,
+        sample_rate: int = AUDIO_SAMPLE_RATE,
+        output_path: Optional[str] = None
+    ) -> Optional["AudioData"]:
+        """Decode the audio track straight to mono float32 PCM with ffmpeg.
+        
+        Without output_path the PCM comes back through a pipe as an array. With output_path ffmpeg
+        writes it to that file and a PcmFile is returned, so the recording is never held in memory.
+        """
+        import numpy as np
+        from .audio_io import PcmFile
+        
+        command = [
+            FFMPEG_BINARY, "-nostdin", "-loglevel", "error",
+            "-i", media_path,
+            "-vn", "-ac", "1", "-ar", str(sample_rate),
+            "-f", "f32le", "-acodec", "pcm_f32le",
+        ] + (["-y", output_path] if output_path else ["-"])
+        try:
+            logger.info(f"Decoding audio with ffmpeg: {media_path}")
+            with timed("audio_extraction"):
+                result = subprocess.run(
+                    command, stdout=subprocess.DEVNULL if output_path else subprocess.PIPE,
+                    stderr=subprocess.PIPE, check=False
+                )
+            if result.returncode != 0:
+                logger.error(f"ffmpeg failed to decode audio: {result.stderr.decode(errors='replace').strip()}")
+                return None
+            
+            if output_path:
+                audio_data = PcmFile(output_path, sample_rate)
+            else:
+                audio_data = np.frombuffer(result.stdout, dtype=np.float32)
+            if len(audio_data) == 0:
+                logger.error("No audio track found in video")
+                return None
+            
+            logger.info(f"Audio decoded ({len(audio_data) / sample_rate:.1f}s at {sample_rate}Hz)")
+            return audio_data
+        
+        except Exception as e:
+            logger.error(f"Failed to decode audio: {str(e)}")
+            return None
+    
     @staticmethod
     def extract_audio_from_video(video_path: str, output_audio_path: str) -> bool:
         """Extract audio from video file using moviepy."""
@@ -91,7 +193,8 @@ class AudioProcessor:
                 return False
             
             logger.debug("Writing audio file")
-            video.audio.write_audiofile(output_audio_path, codec='pcm_s16le', fps=16000, logger=None)
+            with timed("audio_extraction"):
+                video.audio.write_audiofile(output_audio_path, codec='pcm_s16le', fps=16000, logger=None)
             video.close()
             logger.info(f"Audio extracted successfully: {output_audio_path}")
             return True
@@ -105,76 +208,368 @@ class TranscriptionService:
     """Handle audio transcription using local Whisper."""
     
     @staticmethod
-    def transcribe_audio(audio_path: str, model_size: str = WHISPER_MODEL_SIZE) -> Optional[str]:
-        """Transcribe audio file using local Whisper model."""
-        if not WHISPER_AVAILABLE or not SOUNDFILE_AVAILABLE:
-            logger.error("Whisper or soundfile not available")
+    def warm_up(model_sizes: Optional[list] = None) -> Optional[float]:
+        """Load Whisper models into the shared registry before the first request."""
+        if not WHISPER_AVAILABLE:
+            logger.warning("Whisper not available - skipping model warm-up")
             return None
         
-        if not os.path.exists(audio_path):
-            logger.error(f"Audio file not found: {audio_path}")
+        try:
+            if parallel_transcriber.workers > 1:
+                parallel_transcriber.warm_up(WHISPER_MODEL_SIZE, WHISPER_DEVICE, WHISPER_COMPUTE_TYPE)
+            return model_registry.warm_up(model_sizes or WHISPER_PRELOAD_MODELS, WHISPER_DEVICE, WHISPER_COMPUTE_TYPE)
+        except Exception as e:
+            logger.error(f"Whisper warm-up failed: {str(e)}")
             return None
+    
+    @staticmethod
+    def load_audio_file(audio_path: str, output_path: Optional[str] = None) -> "AudioData":
+        """Read a WAV file as mono float32 PCM at the Whisper sample rate.
+        
+        With output_path the file is converted block by block into a PcmFile there; otherwise it
+        is read into memory. Either way it is read as float32 and resampled with a polyphase filter.
+        """
+        logger.info(f"Loading audio file: {audio_path}")
+        if output_path:
+            from .audio_io import convert_audio_file
+            with timed("audio_load"):
+                return convert_audio_file(audio_path, output_path, AUDIO_SAMPLE_RATE)
+        
+        import numpy as np
+        import soundfile as sf
+        
+        with timed("audio_load"):
+            audio_data, sample_rate = sf.read(audio_path, dtype="float32")
+        
+        if len(audio_data.shape) > 1:
+            audio_data = np.mean(audio_data, axis=1, dtype=np.float32)
+        
+        if sample_rate != AUDIO_SAMPLE_RATE:
+            logger.debug(f"Resampling audio from {sample_rate}Hz to {AUDIO_SAMPLE_RATE}Hz")
+            from scipy import signal
+            divisor = math.gcd(sample_rate, AUDIO_SAMPLE_RATE)
+            with timed("resample"):
+                audio_data = signal.resample_poly(
+                    audio_data, AUDIO_SAMPLE_RATE // divisor, sample_rate // divisor
+                ).astype(np.float32)
+        
+        return audio_data
+    
+    @staticmethod
+    def _decode(
+        audio_data: "AudioData",
+        model_size: str,
+        compute_type: str,
+        beam_size: int,
+        vad_filter: bool,
+        report: dict
+    ) -> Iterator[tuple]:
+        """Yield (segments, seconds decoded so far) from the worker pool or a single leased model.
+        
+        Audio longer than AUDIO_WINDOW_SECONDS goes to the leased model one silence-bounded window
+        at a time, so Whisper's features are never computed for the whole recording at once.
+        """
+        if parallel_transcriber.enabled_for(len(audio_data), AUDIO_SAMPLE_RATE):
+            windows = parallel_transcriber.stream(
+                audio_data, AUDIO_SAMPLE_RATE, model_size, WHISPER_DEVICE, compute_type,
+                AUDIO_LANGUAGE, vad_filter, beam_size
+            )
+            report["speech_seconds"] = 0.0
+            for segments, window_end, speech_seconds in windows:
+                report["speech_seconds"] += speech_seconds
+                yield segments, window_end
+            return
+        
+        logger.info(f"Acquiring Whisper model ({model_size}, {compute_type})...")
+        with model_registry.acquire(model_size, WHISPER_DEVICE, compute_type) as lease:
+            load_state = "cold load" if lease.cold else "reused"
+            logger.info(f"Whisper model ready in {lease.acquire_seconds:.2f}s ({load_state})")
+            record_operation("model_load" if lease.cold else "model_wait", lease.acquire_seconds)
+            logger.info("Transcribing audio (this may take a few minutes)...")
+            from .audio_io import AUDIO_WINDOW_SECONDS
+            from .vad import split_on_silence
+            windows = split_on_silence(audio_data, AUDIO_SAMPLE_RATE, AUDIO_WINDOW_SECONDS)
+            if len(windows) > 1:
+                logger.info(f"Transcribing {len(windows)} windows of up to {AUDIO_WINDOW_SECONDS * 1.5:.0f}s")
+            report["speech_seconds"] = 0.0
+            for start, end in windows:
+                offset = start / AUDIO_SAMPLE_RATE
+                segments, info = lease.model.transcribe(
+                    audio_data[start:end], language=AUDIO_LANGUAGE, beam_size=beam_size, vad_filter=vad_filter
+                )
+                for segment in segments:
+                    text = segment.text.strip()
+                    yield (
+                        [{"start": offset + segment.start, "end": offset + segment.end, "text": text}] if text else []
+                    ), offset + segment.end
+                report["speech_seconds"] += getattr(info, "duration_after_vad", None) or info.duration
+    
+    @staticmethod
+    def stream_segments(
+        audio: Union[str, "AudioData"],
+        model_size: str = WHISPER_MODEL_SIZE,
+        on_progress: Optional[Callable[[float, float], None]] = None,
+        report: Optional[dict] = None,
+        compute_type: str = WHISPER_COMPUTE_TYPE,
+        beam_size: int = WHISPER_BEAM_SIZE
+    ) -> Iterator[dict]:
+        """Yield {"start", "end", "text"} segments while Whisper is still decoding later audio.
+        
+        The Whisper model stays leased until the generator is exhausted or closed. Long audio is
+        split on silence and transcribed across worker processes when parallel mode is enabled.
+        With VAD trimming on, pauses are skipped and timestamps still refer to the original audio.
+        Audio files, and the trimmed speech of a PcmFile, are staged as PCM files on disk and
+        read a window at a time, so memory use does not grow with the length of the recording.
+        on_progress, if given, is called with (seconds transcribed, total seconds) after each segment.
+        report, if given, is filled with skipped audio and decode time once the generator finishes.
+        Raises TranscriptionError if Whisper or the audio is unavailable.
+        """
+        if not WHISPER_AVAILABLE:
+            raise TranscriptionError("Whisper not available")
+        
+        from .audio_io import PcmFile
+        from .vad import (
+            ENERGY_VAD_MODE,
+            VAD_TRIM_MIN_SILENCE_SECONDS,
+            VAD_TRIM_MODE,
+            VAD_TRIM_PAD_SECONDS,
+            WHISPER_VAD_MODE,
+            trim_silence,
+        )
+        
+        if isinstance(audio, str):
+            if not SOUNDFILE_AVAILABLE:
+                raise TranscriptionError("soundfile not available")
+            if not os.path.exists(audio):
+                raise TranscriptionError(f"Audio file not found: {audio}")
+        
+        scratch_paths = []
+        
+        def scratch_file(near: str) -> str:
+            descriptor, path = tempfile.mkstemp(suffix=".f32", dir=os.path.dirname(near) or None)
+            os.close(descriptor)
+            scratch_paths.append(path)
+            return path
         
         try:
-            logger.info(f"Loading audio file: {audio_path}")
-            audio_data, sample_rate = sf.read(audio_path)
-            audio_data = audio_data.astype(np.float32)
-            
-            if len(audio_data.shape) > 1:
-                audio_data = np.mean(audio_data, axis=1)
+            if isinstance(audio, str):
+                audio_data = TranscriptionService.load_audio_file(audio, output_path=scratch_file(audio))
+            else:
+                audio_data = audio
+            duration = len(audio_data) / AUDIO_SAMPLE_RATE
+            report = report if report is not None else {}
+            report.update({"vad_mode": VAD_TRIM_MODE, "audio_seconds": round(duration, 1)})
             
-            if sample_rate != AUDIO_SAMPLE_RATE:
-                logger.debug(f"Resampling audio from {sample_rate}Hz to {AUDIO_SAMPLE_RATE}Hz")
-                from scipy import signal
-                num_samples = int(len(audio_data) * AUDIO_SAMPLE_RATE / sample_rate)
-                audio_data = signal.resample(audio_data, num_samples).astype(np.float32)
+            trimmed = None
+            if VAD_TRIM_MODE == ENERGY_VAD_MODE:
+                with timed("vad_trim"):
+                    trimmed = trim_silence(
+                        audio_data, AUDIO_SAMPLE_RATE, VAD_TRIM_MIN_SILENCE_SECONDS, VAD_TRIM_PAD_SECONDS,
+                        output_path=scratch_file(audio_data.path) if isinstance(audio_data, PcmFile) else None
+                    )
+                logger.info(f"VAD trimmed {trimmed.skipped_seconds:.1f}s of silence from {duration:.1f}s of audio")
+                audio_data = trimmed.audio
             
-            logger.info(f"Loading Whisper model ({model_size})...")
-            model = WhisperModel(model_size, device=WHISPER_DEVICE, compute_type=WHISPER_COMPUTE_TYPE)
+            def to_original(seconds: float, is_end: bool = False) -> float:
+                return trimmed.to_original(seconds, is_end) if trimmed else seconds
             
-            import tempfile
-            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp_file:
-                tmp_audio_path = tmp_file.name
-                sf.write(tmp_audio_path, audio_data, AUDIO_SAMPLE_RATE)
+            started = time.perf_counter()
+            decoded = TranscriptionService._decode(
+                audio_data, model_size, compute_type, beam_size, VAD_TRIM_MODE == WHISPER_VAD_MODE, report
+            )
+            for segments, decoded_seconds in decoded:
+                for segment in segments:
+                    yield {
+                        "start": round(to_original(segment["start"]), 2),
+                        "end": round(to_original(segment["end"], is_end=True), 2),
+                        "text": segment["text"],
+                    }
+                if on_progress:
+                    on_progress(to_original(decoded_seconds, is_end=True), duration)
             
-            try:
-                logger.info("Transcribing audio (this may take a few minutes)...")
-                segments, info = model.transcribe(tmp_audio_path, language=AUDIO_LANGUAGE)
-                text = " ".join([segment.text for segment in segments]).strip()
-            finally:
-                if os.path.exists(tmp_audio_path):
-                    os.unlink(tmp_audio_path)
+            decode_seconds = time.perf_counter() - started
+            record_operation("transcription", decode_seconds)
+            metrics.AUDIO_SECONDS_TOTAL.inc(duration)
+            metrics.TRANSCRIPTION_SECONDS_TOTAL.inc(decode_seconds)
+            if decode_seconds > 0:
+                metrics.TRANSCRIPTION_SPEED.observe(duration / decode_seconds)
+            speech_seconds = trimmed.speech_seconds if trimmed else report.get("speech_seconds") or duration
+            skipped_seconds = max(0.0, duration - speech_seconds)
+            report.update({
+                "speech_seconds": round(speech_seconds, 1),
+                "skipped_seconds": round(skipped_seconds, 1),
+                "decode_seconds": round(decode_seconds, 2),
+                # Decode time scales with the audio Whisper sees, so skipped audio saves its share.
+                "decode_seconds_saved": round(decode_seconds * skipped_seconds / speech_seconds, 2) if speech_seconds else 0.0,
+            })
+            if skipped_seconds:
+                logger.info(
+                    f"VAD skipped {skipped_seconds:.1f}s of audio, saving about {report['decode_seconds_saved']:.1f}s of decoding"
+                )
+        finally:
+            for path in scratch_paths:
+                if os.path.exists(path):
+                    os.remove(path)
+    
+    @staticmethod
+    def audio_duration(audio: Union[str, "AudioData"]) -> float:
+        """Length in seconds of a PCM array, a PcmFile or an audio file."""
+        if isinstance(audio, str):
+            if not SOUNDFILE_AVAILABLE or not os.path.exists(audio):
+                return 0.0
+            import soundfile as sf
+            return sf.info(audio).duration
+        return len(audio) / AUDIO_SAMPLE_RATE
+    
+    @staticmethod
+    def segments_to_text(segments: List[dict]) -> str:
+        return " ".join(segment["text"] for segment in segments).strip()
+    
+    @staticmethod
+    def transcribe_segments(
+        audio: Union[str, "np.ndarray"],
+        model_size: str = WHISPER_MODEL_SIZE,
+        on_progress: Optional[Callable[[float, float], None]] = None,
+        on_segment: Optional[Callable[[dict], None]] = None,
+        report: Optional[dict] = None,
+        compute_type: str = WHISPER_COMPUTE_TYPE,
+        beam_size: int = WHISPER_BEAM_SIZE
+    ) -> Optional[List[dict]]:
+        """Transcribe to a list of timestamped segments, passing each to on_segment as it is decoded."""
+        try:
+            segments = []
+            stream = TranscriptionService.stream_segments(audio, model_size, on_progress, report, compute_type, beam_size)
+            for segment in stream:
+                segments.append(segment)
+                if on_segment:
+                    on_segment(segment)
             
-            if text:
-                logger.info(f"Transcription complete ({len(text)} characters)")
+            if segments:
+                logger.info(
+                    f"Transcription complete ({len(segments)} segments, "
+                    f"{len(TranscriptionService.segments_to_text(segments))} characters)"
+                )
             else:
                 logger.warning("Transcription returned empty text")
             
-            return text if text else None
+            return segments if segments else None
         
         except Exception as e:
             logger.error(f"Transcription failed: {str(e)}")
             return None
+    
+    @staticmethod
+    def transcribe_audio(
+        audio: Union[str, "np.ndarray"],
+        model_size: str = WHISPER_MODEL_SIZE,
+        on_progress: Optional[Callable[[float, float], None]] = None
+    ) -> Optional[str]:
+        """Transcribe a 16 kHz mono PCM array, or an audio file, using local Whisper.
+        
+        on_progress, if given, is called with (seconds transcribed, total seconds) as segments finish.
+        """
+        segments = TranscriptionService.transcribe_segments(audio, model_size, on_progress)
+        return TranscriptionService.segments_to_text(segments) if segments else None
+
+
+def _extract_page_range(pdf_path: str, start: int, end: int) -> list:
+    """Extract text for pages [start, end) in a worker process."""
+    import PyPDF2
+
+    pages = []
+    with open(pdf_path, "rb") as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        for page_number in range(start, end):
+            try:
+                pages.append((page_number, pdf_reader.pages[page_number].extract_text() or ""))
+            except Exception as e:
+                pages.append((page_number, ""))
+                logger.warning(f"Failed to extract page {page_number + 1}: {str(e)}")
+    return pages
 
 
 class PDFProcessor:
     """Handle PDF and slides extraction."""
     
+    # Changes whenever the extracted text format changes, invalidating cached slide text.
+    TEXT_FORMAT_VERSION = "pages-v1"
+    
+    @staticmethod
+    def _shards(num_pages: int) -> list:
+        """Split pages into contiguous ranges, one or more per worker."""
+        if num_pages < PDF_PARALLEL_MIN_PAGES or PDF_WORKERS <= 1:
+            return [(0, num_pages)]
+        shard_size = max(PDF_PAGES_PER_SHARD, math.ceil(num_pages / (PDF_WORKERS * 4)))
+        return [(start, min(start + shard_size, num_pages)) for start in range(0, num_pages, shard_size)]
+    
     @staticmethod
-    def extract_text_from_pdf(pdf_path: str) -> Optional[str]:
-        """Extract text from PDF file."""
+    def _extract_pages(pdf_path: str, num_pages: int) -> dict:
+        """Extract pages in worker processes; shards that overrun their time budget are dropped.
+        
+        Short decks are a single shard and are read in this process instead.
+        """
+        shards = PDFProcessor._shards(num_pages)
+        if len(shards) == 1:
+            return dict(_extract_page_range(pdf_path, 0, num_pages))
+        pages = {}
+        # Spawned workers do not inherit the API process's threads, locks or loaded models.
+        pool = multiprocessing.get_context("spawn").Pool(processes=min(PDF_WORKERS, len(shards)))
+        try:
+            pending = [
+                (start, end, pool.apply_async(_extract_page_range, (pdf_path, start, end)))
+                for start, end in shards
+            ]
+            # Shards run PDF_WORKERS at a time, so later shards get the budget of the ones queued before them.
+            deadline = time.monotonic() + PDF_PAGE_TIMEOUT_SECONDS * math.ceil(num_pages / max(1, min(PDF_WORKERS, len(shards))))
+            for start, end, async_result in pending:
+                try:
+                    pages.update(async_result.get(timeout=max(0.0, deadline - time.monotonic())))
+                except multiprocessing.TimeoutError:
+                    logger.warning(f"Slides pages {start + 1}-{end} timed out and were skipped")
+        finally:
+            pool.terminate()
+            pool.join()
+        return pages
+    
+    @staticmethod
+    def extract_text_from_pdf(
+        pdf_path: str,
+        cache: Optional[ResultCache] = None,
+        pdf_sha256: Optional[str] = None
+    ) -> Optional[str]:
+        """Extract text from PDF file, marking each page, with the result cached by file hash."""
+        cache_key = None
+        if cache is not None:
+            cache_key = make_cache_key(pdf_sha256 or file_sha256(pdf_path), PDFProcessor.TEXT_FORMAT_VERSION, PDF_MAX_PAGES)
+            cached_text = cache.get("slides", cache_key)
+            if cached_text:
+                logger.info("Slides text restored from cache")
+                return cached_text
+        
         try:
             logger.info(f"Extracting text from slides: {pdf_path}")
-            text = ""
+            import PyPDF2
             with open(pdf_path, "rb") as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                num_pages = len(pdf_reader.pages)
-                logger.debug(f"PDF has {num_pages} pages")
-                for page in pdf_reader.pages:
-                    text += page.extract_text()
+                num_pages = len(PyPDF2.PdfReader(file).pages)
+            logger.debug(f"PDF has {num_pages} pages")
+            
+            if num_pages > PDF_MAX_PAGES:
+                logger.warning(f"Slides have {num_pages} pages, only the first {PDF_MAX_PAGES} are extracted")
+                num_pages = PDF_MAX_PAGES
+            
+            with timed("pdf_extraction"):
+                pages = PDFProcessor._extract_pages(pdf_path, num_pages)
+            text = "\n\n".join(
+                f"[Page {page_number + 1}]\n{pages[page_number].strip()}"
+                for page_number in sorted(pages)
+                if pages[page_number].strip()
+            )
             
             if text:
-                logger.info(f"Slides extracted ({len(text)} characters)")
+                logger.info(f"Slides extracted ({len(text)} characters from {len(pages)}/{num_pages} pages)")
+                metrics.SLIDES_CHARS_TOTAL.inc(len(text))
+                if cache is not None:
+                    cache.put("slides", cache_key, text)
             else:
                 logger.warning("Slides extraction returned empty text")
             
@@ -185,92 +580,519 @@ class PDFProcessor:
             return None
 
 
+class GenerationStats:
+    """Counters comparing prompt size and latency of the generation modes."""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._modes: dict = {}
+    
+    def record(self, mode: str, calls: int, prompt_chars: int, seconds: float, fallbacks: int = 0) -> None:
+        with self._lock:
+            totals = self._modes.setdefault(mode, {"lectures": 0, "calls": 0, "prompt_chars": 0, "seconds": 0.0, "fallbacks": 0})
+            totals["lectures"] += 1
+            totals["calls"] += calls
+            totals["prompt_chars"] += prompt_chars
+            totals["seconds"] += seconds
+            totals["fallbacks"] += fallbacks
+    
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                mode: {
+                    **totals,
+                    "seconds": round(totals["seconds"], 3),
+                    "avg_prompt_chars": round(totals["prompt_chars"] / totals["lectures"]),
+                    "avg_seconds": round(totals["seconds"] / totals["lectures"], 3),
+                }
+                for mode, totals in self._modes.items()
+            }
+
+
+generation_stats = GenerationStats()
+
+
+class DependencyPreloader:
+    """Imports the heavy libraries off the request path, so the first lecture does not pay for them.
+    
+    The API answers /health while this runs; status moves from idle to loading to ready (or failed).
+    """
+    
+    MODULES = ("numpy", "app.audio_io", "app.vad", "PyPDF2", "soundfile", "scipy.signal", "faster_whisper")
+    
+    def __init__(self):
+        self.status = "idle"
+        self.seconds: Optional[float] = None
+        self.error: Optional[str] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+    
+    def start(self, import_modules: bool = True, warm_up_whisper: bool = False) -> None:
+        """Preload in a daemon thread; later calls while it runs or after it finished do nothing."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self.status = "loading"
+            self._thread = threading.Thread(
+                target=self.run, args=(import_modules, warm_up_whisper), name="dependency-preload", daemon=True
+            )
+            self._thread.start()
+    
+    def run(self, import_modules: bool = True, warm_up_whisper: bool = False) -> None:
+        started = time.perf_counter()
+        try:
+            if import_modules:
+                gemini_client.load()
+                transient_errors()
+                for name in self.MODULES:
+                    try:
+                        importlib.import_module(name)
+                    except ImportError:
+                        logger.debug(f"Preload skipped {name}: not installed")
+            if warm_up_whisper:
+                TranscriptionService.warm_up()
+            self.seconds = time.perf_counter() - started
+            self.status = "ready"
+            record_operation("dependency_preload", self.seconds)
+            logger.info(f"Dependencies preloaded in {self.seconds:.2f}s")
+        except Exception as e:
+            self.error = str(e)
+            self.status = "failed"
+            logger.error(f"Dependency preload failed: {str(e)}")
+    
+    def stats(self) -> dict:
+        return {
+            "status": self.status,
+            "seconds": round(self.seconds, 3) if self.seconds is not None else None,
+            "error": self.error,
+        }
+
+
+dependency_preloader = DependencyPreloader()
+
+
 class GeminiService:
     """Handle Gemini API integration for content generation"""
     
     @staticmethod
-    def generate_notes(transcript: str, slides_content: Optional[str] = None) -> Optional[str]:
-        """Generate study notes from transcript and optional slides."""
+    def _generate_content(prompt: str):
+        """Send one prompt through the shared client, which rate-limits and retries transient errors."""
+        return gemini_client.generate(GEMINI_MODEL, prompt)
+    
+    @staticmethod
+    def _run_concurrently(tasks: dict, timeout: float, on_result: Optional[Callable[[str, object], None]] = None) -> dict:
+        """Run named callables in parallel against one deadline; a task that fails or times out yields None.
+        
+        on_result, if given, is called with each task's name and value as soon as that task finishes.
+        """
+        executor = ThreadPoolExecutor(max_workers=len(tasks), thread_name_prefix="gemini")
+        try:
+            futures = {executor.submit(in_context(task)): name for name, task in tasks.items()}
+            deadline = time.monotonic() + timeout
+            results = {name: None for name in tasks}
+            pending = set(futures)
+            while pending:
+                done, pending = wait(pending, timeout=max(0.0, deadline - time.monotonic()), return_when=FIRST_COMPLETED)
+                if not done:
+                    for future in pending:
+                        logger.error(f"Generating {futures[future]} timed out after {timeout:.0f}s")
+                    break
+                for future in done:
+                    name = futures[future]
+                    try:
+                        results[name] = future.result()
+                    except Exception as e:
+                        logger.error(f"Generating {name} failed: {str(e)}")
+                    if on_result and results[name]:
+                        on_result(name, results[name])
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        return results
+    
+    @staticmethod
+    def generate_study_materials(
+        transcript: str,
+        slides_content: Optional[str] = None,
+        timeout: float = GENERATION_TIMEOUT_SECONDS,
+        mode: str = GEMINI_GENERATION_MODE,
+        on_artifact: Optional[Callable[[str, object], None]] = None,
+        chunks: Optional[List[str]] = None,
+        early_notes: Optional["EarlyNotesMapper"] = None,
+        artifacts: Optional[List[str]] = None,
+        num_cards: int = FLASHCARD_COUNT,
+        num_questions: int = QUIZ_QUESTION_COUNT
+    ) -> tuple:
+        """Generate notes, flashcards and quiz, in one combined call or three concurrent ones.
+        
+        on_artifact, if given, is called with each artifact's name and value as soon as it is ready.
+        chunks overrides how a long transcript is split; early_notes carries per-chunk notes
+        already requested during transcription. artifacts limits generation to those names,
+        leaving the others None; a combined call is only used when all three are wanted.
+        """
+        artifacts = list(artifacts or ARTIFACT_NAMES)
+        started = time.perf_counter()
+        results = {}
+        prompt_chars = 0
+        calls = 0
+        chunked = needs_chunking(transcript)
+        if chunked:
+            chunks = chunks or chunk_transcript(transcript)
+            # Every artifact fans out over all chunks, plus the notes reduce step.
+            timeout = GeminiService._batched_timeout(3 * len(chunks), timeout) + timeout
+        else:
+            chunks = None
+        
+        combined = mode == COMBINED_GENERATION_MODE and not chunked and len(artifacts) == len(ARTIFACT_NAMES)
+        if combined:
+            prompt_chars += len(prompts.combined_prompt(transcript, slides_content, num_cards, num_questions))
+            calls += 1
+            results = GeminiService._run_concurrently(
+                {"study pack": lambda: GeminiService.generate_combined(transcript, slides_content, num_cards, num_questions)},
+                timeout
+            )["study pack"] or {}
+            if on_artifact:
+                for name, value in results.items():
+                    on_artifact(name, value)
+        
+        separate_tasks = {
+            "notes": lambda: GeminiService.generate_notes(transcript, slides_content, chunks=chunks, early_notes=early_notes),
+            "flashcards": lambda: GeminiService.generate_flashcards(transcript, slides_content, num_cards, chunks=chunks),
+            "quiz": lambda: GeminiService.generate_quiz(transcript, slides_content, num_questions, chunks=chunks),
+        }
+        missing = [name for name in artifacts if not results.get(name)]
+        if missing:
+            if combined:
+                logger.warning(f"Combined generation incomplete, falling back for: {', '.join(missing)}")
+            for name in missing:
+                artifact_calls, artifact_chars = GeminiService._prompt_size(
+                    name, transcript, slides_content, chunks, num_cards, num_questions
+                )
+                calls += artifact_calls
+                prompt_chars += artifact_chars
+            results.update(GeminiService._run_concurrently(
+                {name: separate_tasks[name] for name in missing}, timeout, on_result=on_artifact
+            ))
+        
+        generation_stats.record(
+            "chunked" if chunked else mode, calls, prompt_chars, time.perf_counter() - started,
+            fallbacks=len(missing) if combined else 0
+        )
+        return results.get("notes"), results.get("flashcards"), results.get("quiz")
+    
+    @staticmethod
+    def _prompt_size(
+        name: str,
+        transcript: str,
+        slides_content: Optional[str],
+        chunks: Optional[List[str]] = None,
+        num_cards: int = FLASHCARD_COUNT,
+        num_questions: int = QUIZ_QUESTION_COUNT
+    ) -> tuple:
+        """Number of calls and prompt characters needed to generate one artifact."""
+        builders = {
+            "notes": lambda text: prompts.notes_prompt(text, slides_content),
+            "flashcards": lambda text: prompts.flashcards_prompt(text, slides_content, num_cards),
+            "quiz": lambda text: prompts.quiz_prompt(text, slides_content, num_questions),
+        }
+        if not needs_chunking(transcript):
+            return 1, len(builders[name](transcript))
+        
+        chunks = chunks or chunk_transcript(transcript)
+        if name == "notes":
+            # Map calls per chunk plus one reduce call whose size depends on the partial notes.
+            return len(chunks) + 1, sum(len(prompts.partial_notes_prompt(chunk, 1, len(chunks))) for chunk in chunks)
+        return len(chunks), sum(len(builders[name](chunk)) for chunk in chunks)
+    
+    @staticmethod
+    def generate_combined(
+        transcript: str,
+        slides_content: Optional[str] = None,
+        num_cards: int = FLASHCARD_COUNT,
+        num_questions: int = QUIZ_QUESTION_COUNT
+    ) -> dict:
+        """Ask for notes, flashcards and quiz in one JSON document; return only the parts that validate."""
         if not GEMINI_API_KEY:
             logger.error("GEMINI_API_KEY not configured")
-            return None
+            return {}
         
         try:
-            logger.info("Generating study notes...")
-            model = genai.GenerativeModel(GEMINI_MODEL)
+            logger.info("Generating combined study pack...")
+            prompt = prompts.combined_prompt(transcript, slides_content, num_cards, num_questions)
+            response = GeminiService._generate_content(prompt)
+            response_text = (response.text or "").strip()
             
-            prompt = f"""You are an expert study guide creator. Create comprehensive, well-organized study notes from the following lecture material.
-
-Format the notes with:
-- Clear section headings
-- Key concepts highlighted
-- Main points as bullet points
-- Important definitions and explanations
-
-Lecture Transcript:
-{transcript}
-
-{"Additional Materials (Slides/PDF):" + slides_content if slides_content else ""}
-
-Generate clear, concise, and comprehensive study notes suitable for a student studying this lecture."""
+            start_idx = response_text.find('{')
+            end_idx = response_text.rfind('}')
+            if start_idx == -1 or end_idx == -1 or start_idx >= end_idx:
+                logger.warning("No valid JSON object found in combined response")
+                return {}
+            
+            study_pack = json.loads(response_text[start_idx:end_idx + 1])
+            if not isinstance(study_pack, dict):
+                logger.warning("Combined response is not an object")
+                return {}
+        
+        except Exception as e:
+            logger.error(f"Failed to generate combined study pack: {str(e)}")
+            return {}
+        
+        cleaners = {
+            "notes": lambda notes: notes.strip() if GeminiService.is_valid_notes(notes) else None,
+            "flashcards": lambda cards: GeminiService._clean_items(cards, GeminiService.clean_flashcard, "flashcards"),
+            "quiz": lambda questions: GeminiService._clean_items(questions, GeminiService.clean_quiz_question, "quiz questions"),
+        }
+        valid_parts = {}
+        for name, clean in cleaners.items():
+            value = clean(study_pack.get(name))
+            if value:
+                valid_parts[name] = value
+            else:
+                logger.warning(f"Combined response has no valid {name}")
+        
+        if valid_parts:
+            gemini_client.remember(GEMINI_MODEL, prompt, response_text)
+        logger.info(f"Combined study pack generated ({', '.join(valid_parts) or 'nothing valid'})")
+        return valid_parts
+    
+    @staticmethod
+    def is_valid_notes(notes) -> bool:
+        return isinstance(notes, str) and bool(notes.strip())
+    
+    @staticmethod
+    def clean_flashcard(card) -> Optional[dict]:
+        """The card with its text trimmed, or None if it has no question or answer."""
+        if not isinstance(card, dict):
+            return None
+        question, answer = card.get("question"), card.get("answer")
+        if not isinstance(question, str) or not question.strip() or not isinstance(answer, str) or not answer.strip():
+            return None
+        return {**card, "question": question.strip(), "answer": answer.strip()}
+    
+    @staticmethod
+    def clean_quiz_question(question) -> Optional[dict]:
+        """The question with exactly four options keyed A-D and a single-letter answer, or None.
+        
+        Options given as a list of four and answers written like "b" or "B)" are normalized.
+        """
+        if not isinstance(question, dict):
+            return None
+        text, options = question.get("question"), question.get("options")
+        if not isinstance(text, str) or not text.strip():
+            return None
+        if isinstance(options, list) and len(options) == len(QUIZ_OPTION_LETTERS):
+            options = dict(zip(QUIZ_OPTION_LETTERS, options))
+        if not isinstance(options, dict):
+            return None
+        options = {str(letter).strip().upper(): value for letter, value in options.items()}
+        if set(options) != set(QUIZ_OPTION_LETTERS) or not all(
+            isinstance(value, str) and value.strip() for value in options.values()
+        ):
+            return None
+        answer = _QUIZ_ANSWER.fullmatch(str(question.get("correct_answer", "")).strip().upper())
+        if not answer:
+            return None
+        return {
+            **question,
+            "question": text.strip(),
+            "options": {letter: options[letter].strip() for letter in QUIZ_OPTION_LETTERS},
+            "correct_answer": answer.group(1),
+        }
+    
+    @staticmethod
+    def _clean_items(items, clean_item, label: str) -> Optional[list]:
+        """Keep the items of a parsed array that pass clean_item; None if none do."""
+        if not isinstance(items, list):
+            return None
+        cleaned = [item for item in (clean_item(value) for value in items) if item is not None]
+        if len(cleaned) < len(items):
+            logger.warning(f"Dropped {len(items) - len(cleaned)} invalid {label}")
+            metrics.GENERATED_ITEMS_DROPPED_TOTAL.inc(len(items) - len(cleaned), artifact=label)
+        return cleaned or None
+    
+    @staticmethod
+    def is_valid_flashcards(flashcards) -> bool:
+        return isinstance(flashcards, list) and bool(flashcards) and all(
+            GeminiService.clean_flashcard(card) is not None for card in flashcards
+        )
+    
+    @staticmethod
+    def is_valid_quiz(quiz) -> bool:
+        return isinstance(quiz, list) and bool(quiz) and all(
+            GeminiService.clean_quiz_question(question) is not None for question in quiz
+        )
+    
+    @staticmethod
+    def _request_notes(prompt: str) -> Optional[str]:
+        """Send a notes prompt and return the stripped markdown; only non-empty notes are cached."""
+        response = GeminiService._generate_content(prompt)
+        notes = (response.text or "").strip()
+        if not notes:
+            return None
+        gemini_client.remember(GEMINI_MODEL, prompt, notes)
+        return notes
+    
+    @staticmethod
+    def _request_items(build_prompt: Callable[[int], str], count: int, clean_item, label: str) -> Optional[list]:
+        """Stream a JSON array reply, keeping each valid item as soon as it is complete.
+        
+        Malformed and invalid items are skipped rather than failing the whole array, and only
+        the shortfall is asked for again, up to GEMINI_ITEM_TOP_UP_ATTEMPTS more times.
+        build_prompt takes the number of items wanted. A reply is cached only when it was read
+        to the end and gave at least one valid item.
+        """
+        items: list = []
+        for attempt in range(GEMINI_ITEM_TOP_UP_ATTEMPTS + 1):
+            wanted = count - len(items)
+            if wanted <= 0:
+                break
+            if attempt:
+                logger.info(f"Requesting {wanted} more {label} to replace invalid or missing ones")
+            
+            parser = JsonObjectStream()
+            prompt = build_prompt(wanted)
+            reply = []
+            received = []
+            rejected = 0
+            try:
+                for text in gemini_client.stream(GEMINI_MODEL, prompt):
+                    reply.append(text)
+                    for value in parser.feed(text):
+                        item = clean_item(value)
+                        if item is None:
+                            rejected += 1
+                        else:
+                            received.append(item)
+                parser.close()
+                if received:
+                    gemini_client.remember(GEMINI_MODEL, prompt, "".join(reply))
+            except Exception as e:
+                if not items and not received:
+                    raise
+                logger.warning(f"{label.capitalize()} reply failed part-way, keeping {len(items) + len(received)}: {str(e)}")
             
-            response = model.generate_content(prompt)
-            notes = (response.text or "").strip()
+            dropped = parser.malformed + rejected
+            if dropped:
+                logger.warning(f"Dropped {dropped} malformed or invalid {label}")
+                metrics.GENERATED_ITEMS_DROPPED_TOTAL.inc(dropped, artifact=label)
+            items = merge_unique([items, received], count)
+            if not received:
+                break
+        
+        if not items:
+            logger.warning(f"No valid {label} in the reply")
+        return items or None
+    
+    @staticmethod
+    def _batched_timeout(num_calls: int, timeout: float = GENERATION_TIMEOUT_SECONDS) -> float:
+        """Deadline for calls that queue behind the shared outbound call limit."""
+        return timeout * math.ceil(max(1, num_calls) / GEMINI_MAX_CONCURRENT_CALLS)
+    
+    @staticmethod
+    def _map_chunks(chunks: list, build_task) -> list:
+        """Run one generation task per chunk in parallel, keeping chunk order."""
+        results = GeminiService._run_concurrently(
+            {f"chunk {index + 1}/{len(chunks)}": build_task(index, chunk) for index, chunk in enumerate(chunks)},
+            GeminiService._batched_timeout(len(chunks)),
+        )
+        return list(results.values())
+    
+    @staticmethod
+    def generate_notes(
+        transcript: str,
+        slides_content: Optional[str] = None,
+        chunks: Optional[List[str]] = None,
+        early_notes: Optional["EarlyNotesMapper"] = None
+    ) -> Optional[str]:
+        """Generate study notes from transcript and optional slides, map-reducing long transcripts."""
+        if not GEMINI_API_KEY:
+            logger.error("GEMINI_API_KEY not configured")
+            return None
+        
+        try:
+            if needs_chunking(transcript):
+                chunks = chunks or chunk_transcript(transcript)
+                started_early = early_notes.take(chunks) if early_notes else []
+                logger.info(
+                    f"Generating study notes for {len(chunks)} transcript chunks "
+                    f"({len(started_early)} started during transcription)..."
+                )
+                
+                def build_task(index: int, chunk: str):
+                    if index < len(started_early):
+                        return started_early[index].result
+                    # Keep the wording of the early prompts, which could not know the part count.
+                    total_parts = None if started_early else len(chunks)
+                    return lambda: GeminiService._request_notes(prompts.partial_notes_prompt(chunk, index + 1, total_parts))
+                
+                partial_notes = [notes for notes in GeminiService._map_chunks(chunks, build_task) if notes]
+                if len(partial_notes) <= 1:
+                    notes = partial_notes[0] if partial_notes else None
+                else:
+                    logger.info(f"Merging notes from {len(partial_notes)} chunks...")
+                    notes = GeminiService._request_notes(prompts.merge_notes_prompt(partial_notes, slides_content))
+                    if not notes:
+                        logger.warning("Notes merge failed, joining per-chunk notes")
+                        notes = "\n\n".join(partial_notes)
+            else:
+                logger.info("Generating study notes...")
+                notes = GeminiService._request_notes(prompts.notes_prompt(transcript, slides_content))
             
             if notes:
                 logger.info(f"Study notes generated ({len(notes)} characters)")
             else:
                 logger.warning("Notes generation returned empty")
             
-            return notes if notes else None
+            return notes
         
         except Exception as e:
             logger.error(f"Failed to generate notes: {str(e)}")
             return None
     
     @staticmethod
-    def generate_flashcards(transcript: str, slides_content: Optional[str] = None, num_cards: int = FLASHCARD_COUNT) -> Optional[list]:
-        """Generate flashcards from transcript and optional slides."""
+    def _generate_items_chunked(
+        chunks: List[str], slides_content: Optional[str], count: int, build_prompt, clean_item, label: str
+    ) -> list:
+        """Ask each chunk for its share of items, then merge round-robin without near-duplicates.
+        
+        Each chunk is sent only the slide pages that match it, not the whole deck.
+        """
+        shares = distribute(count, len(chunks))
+        groups = GeminiService._map_chunks(
+            chunks,
+            lambda index, chunk: lambda: GeminiService._request_items(
+                lambda wanted: build_prompt(chunk, slides_for_chunk(slides_content, chunk), wanted),
+                max(1, shares[index]), clean_item, label
+            ),
+        )
+        return merge_unique([group for group in groups if isinstance(group, list)], count)
+    
+    @staticmethod
+    def generate_flashcards(
+        transcript: str,
+        slides_content: Optional[str] = None,
+        num_cards: int = FLASHCARD_COUNT,
+        chunks: Optional[List[str]] = None
+    ) -> Optional[list]:
+        """Generate flashcards from transcript and optional slides, spread across long transcripts."""
         if not GEMINI_API_KEY:
             logger.error("GEMINI_API_KEY not configured")
             return None
         
         try:
             logger.info(f"Generating {num_cards} flashcards...")
-            model = genai.GenerativeModel(GEMINI_MODEL)
-            
-            prompt = f"""Create {num_cards} flashcards for studying this lecture material.
-
-Format your response as a JSON array with this structure:
-[
-    {{"question": "What is...", "answer": "Definition and explanation...", "difficulty": "easy"}},
-    {{"question": "How does...", "answer": "...", "difficulty": "medium"}},
-    ...
-]
-
-Include a mix of difficulty levels (easy, medium, hard).
-Ensure questions test understanding, not just memorization.
-
-Lecture Transcript:
-{transcript}
-
-{"Additional Materials (Slides/PDF):" + slides_content if slides_content else ""}
-
-Generate exactly {num_cards} flashcards as a valid JSON array only, no other text."""
-            
-            response = model.generate_content(prompt)
-            response_text = (response.text or "").strip()
+            if needs_chunking(transcript):
+                flashcards = GeminiService._generate_items_chunked(
+                    chunks or chunk_transcript(transcript), slides_content, num_cards,
+                    prompts.flashcards_prompt, GeminiService.clean_flashcard, "flashcards"
+                )
+            else:
+                flashcards = GeminiService._request_items(
+                    lambda wanted: prompts.flashcards_prompt(transcript, slides_content, wanted),
+                    num_cards, GeminiService.clean_flashcard, "flashcards"
+                )
             
-            if not response_text:
-                logger.warning("Flashcards generation returned empty response")
+            if not flashcards:
                 return None
-            
-            if "```json" in response_text:
-                response_text = response_text.split("```json")[1].split("```")[0].strip()
-            elif "```" in response_text:
-                response_text = response_text.split("```")[1].split("```")[0].strip()
-            
-            flashcards = json.loads(response_text)
             logger.info(f"Generated {len(flashcards)} flashcards")
             return flashcards
         
@@ -279,82 +1101,75 @@ Generate exactly {num_cards} flashcards as a valid JSON array only, no other tex
             return None
     
     @staticmethod
-    def generate_quiz(transcript: str, slides_content: Optional[str] = None, num_questions: int = QUIZ_QUESTION_COUNT) -> Optional[list]:
-        """Generate quiz questions from transcript and optional slides."""
+    def generate_quiz(
+        transcript: str,
+        slides_content: Optional[str] = None,
+        num_questions: int = QUIZ_QUESTION_COUNT,
+        chunks: Optional[List[str]] = None
+    ) -> Optional[list]:
+        """Generate quiz questions covering the whole transcript and optional slides."""
         if not GEMINI_API_KEY:
             logger.error("GEMINI_API_KEY not configured")
             return None
         
         try:
             logger.info(f"Generating {num_questions} quiz questions...")
-            model = genai.GenerativeModel(GEMINI_MODEL)
-            
-            prompt = f"""Create {num_questions} multiple-choice quiz questions from this lecture material.
-
-Format your response ONLY as a valid JSON array, nothing else. No markdown, no explanation before or after.
-
-[
-    {{
-        "question": "Which of the following is...",
-        "options": {{"A": "Option 1", "B": "Option 2", "C": "Option 3", "D": "Option 4"}},
-        "correct_answer": "B",
-        "explanation": "The correct answer is B because..."
-    }},
-    {{
-        "question": "What is...",
-        "options": {{"A": "Option 1", "B": "Option 2", "C": "Option 3", "D": "Option 4"}},
-        "correct_answer": "A",
-        "explanation": "..."
-    }}
-]
-
-Requirements:
-- Each question must have exactly 4 options with keys A, B, C, D
-- correct_answer must be a single letter: A, B, C, or D
-- Include clear explanations
-- Return ONLY the JSON array, no other text or formatting
-
-Lecture Transcript:
-{transcript[:TRANSCRIPT_PREVIEW_LENGTH]}
-
-{"Slides:" + slides_content[:SLIDES_PREVIEW_LENGTH] if slides_content else ""}"""
-            
-            response = model.generate_content(prompt)
-            response_text = (response.text or "").strip()
-            
-            if not response_text:
-                logger.warning("Quiz generation returned empty response")
-                return None
-            
-            if response_text.startswith("```"):
-                response_text = response_text.split("```")[1]
-                if response_text.startswith("json"):
-                    response_text = response_text[4:]
-                response_text = response_text.split("```")[0]
-                response_text = response_text.strip()
-            
-            start_idx = response_text.find('[')
-            end_idx = response_text.rfind(']')
-            
-            if start_idx == -1 or end_idx == -1 or start_idx >= end_idx:
-                logger.warning("No valid JSON array found in quiz response")
-                return None
-            
-            response_text = response_text[start_idx:end_idx + 1]
-            quiz_questions = json.loads(response_text)
-            
-            if isinstance(quiz_questions, list):
-                logger.info(f"Generated {len(quiz_questions)} quiz questions")
-                return quiz_questions
+            if needs_chunking(transcript):
+                quiz_questions = GeminiService._generate_items_chunked(
+                    chunks or chunk_transcript(transcript), slides_content, num_questions,
+                    prompts.quiz_prompt, GeminiService.clean_quiz_question, "quiz questions"
+                )
             else:
-                logger.warning("Quiz response is not a list")
+                quiz_questions = GeminiService._request_items(
+                    lambda wanted: prompts.quiz_prompt(transcript, slides_content, wanted),
+                    num_questions, GeminiService.clean_quiz_question, "quiz questions"
+                )
+            
+            if not quiz_questions:
                 return None
+            logger.info(f"Generated {len(quiz_questions)} quiz questions")
+            return quiz_questions
         
         except (json.JSONDecodeError, Exception) as e:
             logger.error(f"Failed to generate quiz: {str(e)}")
             return None
 
 
+class EarlyNotesMapper:
+    """Request notes for each transcript chunk as soon as transcription has produced it.
+    
+    Segments are packed with the same chunker generation uses afterwards, so every chunk closed
+    here is identical to the corresponding chunk of the finished transcript.
+    """
+    
+    def __init__(self):
+        self._chunker = IncrementalChunker()
+        self._chunks: List[str] = []
+        self._futures: list = []
+        self._executor = ThreadPoolExecutor(max_workers=GEMINI_MAX_CONCURRENT_CALLS, thread_name_prefix="early-notes")
+    
+    def add_segment(self, segment: dict) -> None:
+        for chunk in self._chunker.add(segment["text"]):
+            part = len(self._chunks) + 1
+            logger.info(f"Transcript chunk {part} ready, requesting its notes early")
+            self._chunks.append(chunk)
+            self._futures.append(self._executor.submit(
+                in_context(GeminiService._request_notes), prompts.partial_notes_prompt(chunk, part)
+            ))
+    
+    def take(self, chunks: List[str]) -> list:
+        """Futures for the leading chunks that match what was requested early."""
+        matched = 0
+        while matched < min(len(chunks), len(self._chunks)) and chunks[matched] == self._chunks[matched]:
+            matched += 1
+        for future in self._futures[matched:]:
+            future.cancel()
+        return self._futures[:matched]
+    
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
 class LectureProcessor:
     """Orchestrates the lecture processing pipeline."""
     
@@ -365,60 +1180,364 @@ class LectureProcessor:
     GEMINI_KEY_MISSING_STATUS = "gemini_api_key_missing"
     GENERATION_FAILED_STATUS = "generation_failed"
     
+    # Changes whenever the cached transcript format changes.
+    TRANSCRIPT_FORMAT_VERSION = "segments-v1"
+    
+    @staticmethod
+    def transcript_cache_key(video_sha256: str, tier_identity: str) -> str:
+        """Key a transcript by the video content and the Whisper settings that produced it."""
+        from .vad import VAD_TRIM_MODE
+        return make_cache_key(
+            "transcript", video_sha256, tier_identity, AUDIO_LANGUAGE,
+            LectureProcessor.TRANSCRIPT_FORMAT_VERSION, VAD_TRIM_MODE,
+        )
+    
+    @staticmethod
+    def stored_transcript_key(video_sha256: str, transcript: dict) -> Optional[str]:
+        """Cache key of a checkpointed transcript, from the tier recorded in its report."""
+        tier = (transcript.get("report") or {}).get("tier")
+        if not tier:
+            return None
+        return LectureProcessor.transcript_cache_key(video_sha256, tier_identity(tier))
+    
+    @staticmethod
+    def cached_transcript(cache: ResultCache, video_sha256: str, tiers: List[WhisperTier], checked: set) -> tuple:
+        """The (key, transcript) of the first tier with a cached transcript, or (None, None).
+        
+        Keys already in checked are skipped, and every key looked up is added to it.
+        """
+        for tier in tiers:
+            key = LectureProcessor.transcript_cache_key(video_sha256, tier.cache_identity)
+            if key in checked:
+                continue
+            checked.add(key)
+            transcript = cache.get("transcript", key)
+            if transcript:
+                return key, transcript
+        return None, None
+    
+    @staticmethod
+    def generation_cache_key(transcript_key: str, slides_sha256: Optional[str]) -> str:
+        """Key generated study materials by their inputs and the prompt/model versions."""
+        return make_cache_key(
+            "generation", transcript_key, slides_sha256, GEMINI_MODEL, PROMPT_VERSION,
+            GEMINI_GENERATION_MODE, FLASHCARD_COUNT, QUIZ_QUESTION_COUNT,
+            TRANSCRIPT_CHUNK_CHARS, TRANSCRIPT_CHUNK_OVERLAP_CHARS, SLIDES_CHUNK_CHARS,
+        )
+    
+    @staticmethod
+    def regenerate_artifact(
+        name: str,
+        transcript: dict,
+        slides_content: Optional[str] = None,
+        num_cards: int = FLASHCARD_COUNT,
+        num_questions: int = QUIZ_QUESTION_COUNT,
+        refresh: bool = False
+    ):
+        """Generate one study artifact again from a stored transcript ({"text", "segments"}) and slides text.
+        
+        Prompts are built the same way for the same inputs, so repeating a request is answered from
+        the Gemini response cache; refresh asks Gemini again and replaces the cached replies.
+        """
+        chunks = chunk_segments(transcript["segments"]) if needs_chunking(transcript["text"]) else None
+        with refreshing_responses() if refresh else contextlib.nullcontext():
+            generated = GeminiService.generate_study_materials(
+                transcript["text"], slides_content, chunks=chunks, artifacts=[name],
+                num_cards=num_cards, num_questions=num_questions
+            )
+        return dict(zip(ARTIFACT_NAMES, generated))[name]
+    
     @staticmethod
     def process_lecture(
         video_path: str,
         slides_path: Optional[str] = None,
-        lecture_dir: Path = None
+        lecture_dir: Path = None,
+        video_sha256: Optional[str] = None,
+        slides_sha256: Optional[str] = None,
+        cache: Optional[ResultCache] = None,
+        on_event: Optional[Callable[[str, dict], None]] = None,
+        queue_depth: int = 0,
+        checkpoints: Optional[LectureCheckpoints] = None,
+        whisper_tier: Optional[str] = None
+    ) -> dict:
+        """Process lecture: extract audio, transcribe, and generate content.
+        
+        on_event, if given, receives progress events as (event type, data): stage transitions,
+        transcription progress, and each study artifact as soon as it is ready.
+        queue_depth is the number of other lectures waiting or running, used to pick the Whisper tier.
+        checkpoints, if given, stores each finished stage's output, and stages already stored
+        are skipped, so a failed lecture resumes where it stopped.
+        whisper_tier, if given, names the tier to use instead of the tier policy's choice.
+        The result carries a timing breakdown of pipeline stages and of the operations inside them.
+        """
+        request_timings = RequestTimings()
+        started = time.perf_counter()
+        with track_request(request_timings):
+            processed_lecture = LectureProcessor._run_pipeline(
+                video_path, slides_path, lecture_dir, video_sha256, slides_sha256, cache, on_event, queue_depth,
+                checkpoints, whisper_tier
+            )
+        
+        total_seconds = time.perf_counter() - started
+        processed_lecture["timings"] = {
+            "total": round(total_seconds, 3),
+            "stages": processed_lecture["timings"].get("stages", {}),
+            "operations": request_timings.to_dict(),
+        }
+        status = processed_lecture["status"] if not processed_lecture["status"].startswith("error") else "error"
+        metrics.LECTURES_TOTAL.inc(status=status)
+        metrics.LECTURE_SECONDS.observe(total_seconds, status=status)
+        for stage, seconds in processed_lecture["timings"]["stages"].items():
+            metrics.PIPELINE_STAGE_SECONDS.observe(seconds, stage=stage)
+        metrics.TRANSCRIPT_CHARS_TOTAL.inc(len(processed_lecture["transcript"] or ""))
+        return processed_lecture
+    
+    @staticmethod
+    def _run_pipeline(
+        video_path: str,
+        slides_path: Optional[str] = None,
+        lecture_dir: Path = None,
+        video_sha256: Optional[str] = None,
+        slides_sha256: Optional[str] = None,
+        cache: Optional[ResultCache] = None,
+        on_event: Optional[Callable[[str, dict], None]] = None,
+        queue_depth: int = 0,
+        checkpoints: Optional[LectureCheckpoints] = None,
+        whisper_tier: Optional[str] = None
     ) -> dict:
-        """Process lecture: extract audio, transcribe, and generate content."""
+        """Run the lecture pipeline stages; see process_lecture."""
         logger.info("=" * 60)
         logger.info("Starting lecture processing pipeline")
         logger.info("=" * 60)
         
         processed_lecture = {
             "transcript": "",
+            "segments": [],
+            "transcription": None,
             "slides_content": "",
             "notes": "",
             "flashcards": [],
             "quiz": [],
             "status": LectureProcessor.PROCESSING_STATUS,
-            "error": None
+            "error": None,
+            "timings": {}
         }
         
+        emit = on_event or (lambda event_type, data: None)
+        early_notes = None
+        save_checkpoint = checkpoints.save if checkpoints is not None else (lambda stage, data: None)
+        
         try:
-            audio_path = str(lecture_dir / "audio.wav") if lecture_dir else "temp_audio.wav"
+            pinned_tier = whisper_tier_policy.tier(whisper_tier) if whisper_tier else None
+            saved = checkpoints.load() if checkpoints is not None else {}
+            if saved:
+                logger.info(f"Resuming from checkpoints: {', '.join(sorted(saved))}")
             
-            logger.info("[STEP 1/4] Extracting audio from video...")
-            if not AudioProcessor.extract_audio_from_video(video_path, audio_path):
-                logger.error("Audio extraction failed")
-                processed_lecture["status"] = LectureProcessor.AUDIO_EXTRACTION_FAILED_STATUS
-                return processed_lecture
+            # Cache keys follow the Whisper tier that made the transcript, which an adaptive policy
+            # only picks once the audio length is known, so they are filled in as they become known.
+            cache_state = {"transcript_key": None, "generation_key": None, "materials": None, "checked": set()}
+            video_digest = None
+            initial_results = {}
+            if "transcript" in saved:
+                logger.info("[STEP 1-2/4] Transcript restored from checkpoint")
+                initial_results["transcript"] = saved["transcript"]
+            if cache is not None:
+                video_digest = video_sha256 or file_sha256(video_path)
+                if "transcript" in saved:
+                    cache_state["transcript_key"] = LectureProcessor.stored_transcript_key(video_digest, saved["transcript"])
+                else:
+                    transcript_key, cached_transcript = LectureProcessor.cached_transcript(
+                        cache, video_digest, whisper_tier_policy.reusable_tiers(pinned_tier), cache_state["checked"]
+                    )
+                    if cached_transcript:
+                        logger.info("[STEP 1-2/4] Transcript restored from cache")
+                        cache_state["transcript_key"] = transcript_key
+                        initial_results["transcript"] = cached_transcript
+                        save_checkpoint("transcript", cached_transcript)
             
-            logger.info("[STEP 2/4] Transcribing audio...")
-            transcript = TranscriptionService.transcribe_audio(audio_path)
-            if not transcript:
-                logger.error("Transcription failed")
-                processed_lecture["status"] = LectureProcessor.TRANSCRIPTION_FAILED_STATUS
-                return processed_lecture
+            has_slides = bool(slides_path and (os.path.exists(slides_path) or "slides" in saved))
+            if not has_slides:
+                slides_sha256 = None
+                initial_results["slides"] = None
+            else:
+                if "slides" in saved:
+                    initial_results["slides"] = saved["slides"]
+                if cache is not None and not slides_sha256 and os.path.exists(slides_path):
+                    slides_sha256 = file_sha256(slides_path)
+            
+            def load_cached_materials() -> Optional[dict]:
+                """Generated materials cached for this transcript and slides, looked up once the transcript key is known."""
+                if cache is not None and cache_state["transcript_key"] and cache_state["generation_key"] is None:
+                    cache_state["generation_key"] = LectureProcessor.generation_cache_key(cache_state["transcript_key"], slides_sha256)
+                    cache_state["materials"] = cache.get("generation", cache_state["generation_key"])
+                return cache_state["materials"]
+            
+            cached_materials = load_cached_materials()
+            saved_materials = {name: saved[name] for name in ARTIFACT_NAMES if saved.get(name)}
+            
+            # Long lectures get their per-chunk notes requested while later audio is still transcribing.
+            notes_known = (cached_materials and cached_materials.get("notes")) or "notes" in saved_materials
+            if GEMINI_API_KEY and not notes_known and "transcript" not in initial_results:
+                early_notes = EarlyNotesMapper()
+            
+            def extract_audio(inputs: dict):
+                logger.info("[STEP 1/4] Extracting audio from video...")
+                if AudioProcessor.ffmpeg_available():
+                    # Decoded to a file in the lecture directory and read back a window at a time.
+                    audio = AudioProcessor.decode_audio(
+                        video_path, output_path=str(lecture_dir / "audio.f32") if lecture_dir else None
+                    )
+                else:
+                    audio = str(lecture_dir / "audio.wav") if lecture_dir else "temp_audio.wav"
+                    if not AudioProcessor.extract_audio_from_video(video_path, audio):
+                        audio = None
+                if audio is None:
+                    raise StageFailedError(LectureProcessor.AUDIO_EXTRACTION_FAILED_STATUS, "Audio extraction failed")
+                return audio
             
-            processed_lecture["transcript"] = transcript
+            last_reported = {"percent": -1}
             
-            slides_content = None
-            if slides_path and os.path.exists(slides_path):
+            def report_transcription(processed_seconds: float, total_seconds: float) -> None:
+                percent = int(100 * processed_seconds / total_seconds) if total_seconds else 0
+                if percent > last_reported["percent"]:
+                    last_reported["percent"] = percent
+                    emit("transcription", {
+                        "processed_seconds": round(processed_seconds, 1),
+                        "total_seconds": round(total_seconds, 1),
+                        "percent": min(percent, 100),
+                    })
+            
+            def on_segment(segment: dict) -> None:
+                emit("segment", segment)
+                if early_notes is not None:
+                    early_notes.add_segment(segment)
+            
+            def transcribe(inputs: dict) -> dict:
+                logger.info("[STEP 2/4] Transcribing audio...")
+                audio = inputs["audio"]
+                audio_seconds = TranscriptionService.audio_duration(audio)
+                speedup = parallel_transcriber.workers if parallel_transcriber.enabled_for(
+                    int(audio_seconds * AUDIO_SAMPLE_RATE), AUDIO_SAMPLE_RATE
+                ) else 1
+                if pinned_tier is not None:
+                    tier = whisper_tier_policy.pinned(pinned_tier, audio_seconds, queue_depth, speedup)
+                else:
+                    tier = whisper_tier_policy.choose(audio_seconds, queue_depth, speedup)
+                emit("tier", tier.to_dict())
+                if cache is not None:
+                    # A transcript cached by this tier, or by a more accurate one, is as good as a new one.
+                    transcript_key, cached_transcript = LectureProcessor.cached_transcript(
+                        cache, video_digest, whisper_tier_policy.reusable_tiers(tier.tier), cache_state["checked"]
+                    )
+                    if cached_transcript:
+                        logger.info("[STEP 2/4] Transcript restored from cache")
+                        cache_state["transcript_key"] = transcript_key
+                        save_checkpoint("transcript", cached_transcript)
+                        emit("artifact", {"name": "transcript", "data": cached_transcript["text"]})
+                        return cached_transcript
+                report = {"tier": tier.to_dict()}
+                waiting_since = time.perf_counter()
+                with _transcription_slots:
+                    record_operation("transcription_slot_wait", time.perf_counter() - waiting_since)
+                    segments = TranscriptionService.transcribe_segments(
+                        audio, tier.tier.model_size, on_progress=report_transcription, on_segment=on_segment,
+                        report=report, compute_type=tier.tier.compute_type, beam_size=tier.tier.beam_size
+                    )
+                if not segments:
+                    raise StageFailedError(LectureProcessor.TRANSCRIPTION_FAILED_STATUS, "Transcription failed")
+                transcript = {
+                    "text": TranscriptionService.segments_to_text(segments),
+                    "segments": segments,
+                    "report": report,
+                }
+                if cache is not None:
+                    cache_state["transcript_key"] = LectureProcessor.transcript_cache_key(video_digest, tier.tier.cache_identity)
+                    cache.put("transcript", cache_state["transcript_key"], transcript)
+                save_checkpoint("transcript", transcript)
+                emit("artifact", {"name": "transcript", "data": transcript["text"]})
+                return transcript
+            
+            def extract_slides(inputs: dict) -> Optional[str]:
                 logger.info("[STEP 2.5/4] Extracting slides content...")
-                slides_content = PDFProcessor.extract_text_from_pdf(slides_path)
-                processed_lecture["slides_content"] = slides_content
+                slides_text = PDFProcessor.extract_text_from_pdf(slides_path, cache=cache, pdf_sha256=slides_sha256)
+                if slides_text is not None:
+                    save_checkpoint("slides", slides_text)
+                return slides_text
+            
+            def generate(inputs: dict) -> dict:
+                restored = {name: value for name, value in (load_cached_materials() or {}).items() if value}
+                for name, value in restored.items():
+                    if name not in saved_materials:
+                        save_checkpoint(name, value)
+                restored.update(saved_materials)
+                missing = [name for name in ARTIFACT_NAMES if name not in restored]
+                for name, value in restored.items():
+                    emit("artifact", {"name": name, "data": value})
+                if not missing:
+                    logger.info("[STEP 3/4] Study materials restored from cache and checkpoints")
+                    return restored
+                if restored:
+                    # Only the artifacts that failed last time are generated again.
+                    logger.info(f"[STEP 3/4] {', '.join(restored)} restored from cache and checkpoints")
+                
+                if not GEMINI_API_KEY:
+                    raise StageFailedError(
+                        LectureProcessor.GEMINI_KEY_MISSING_STATUS,
+                        "GEMINI_API_KEY not configured - cannot generate content"
+                    )
+                
+                logger.info(f"[STEP 3/4] Generating {', '.join(missing)}...")
+                transcript = inputs["transcript"]
+                
+                def on_artifact(name: str, value) -> None:
+                    save_checkpoint(name, value)
+                    emit("artifact", {"name": name, "data": value})
+                
+                generated = GeminiService.generate_study_materials(
+                    transcript["text"], inputs["slides"],
+                    on_artifact=on_artifact,
+                    chunks=chunk_segments(transcript["segments"]) if needs_chunking(transcript["text"]) else None,
+                    early_notes=early_notes,
+                    artifacts=missing
+                )
+                materials = {**dict(zip(ARTIFACT_NAMES, generated)), **restored}
+                # Artifacts that did succeed are kept, so a retry of the lecture only asks for the rest.
+                if cache_state["generation_key"] and any(materials[name] for name in missing):
+                    cache.put("generation", cache_state["generation_key"], {name: value for name, value in materials.items() if value})
+                return materials
+            
+            # Audio -> transcript and slides run side by side; generation waits for both.
+            stages = [Stage("generation", generate, depends_on=("transcript", "slides"))]
+            if "transcript" not in initial_results:
+                stages.append(Stage("audio", extract_audio))
+                stages.append(Stage("transcript", transcribe, depends_on=("audio",)))
+            if has_slides and "slides" not in initial_results:
+                stages.append(Stage("slides", extract_slides))
+            
+            if "transcript" in initial_results:
+                emit("artifact", {"name": "transcript", "data": initial_results["transcript"]["text"]})
+            
+            run = run_stages(stages, initial_results, on_event=emit)
+            transcript_result = run.results.get("transcript") or {}
+            processed_lecture["timings"] = {"stages": run.timings}
+            processed_lecture["transcript"] = transcript_result.get("text") or ""
+            processed_lecture["segments"] = transcript_result.get("segments") or []
+            processed_lecture["transcription"] = transcript_result.get("report")
+            processed_lecture["slides_content"] = run.results.get("slides") or ""
             
-            if not GEMINI_API_KEY:
-                logger.error("GEMINI_API_KEY not configured - cannot generate content")
-                processed_lecture["status"] = LectureProcessor.GEMINI_KEY_MISSING_STATUS
+            if not run.succeeded:
+                if isinstance(run.error, StageFailedError):
+                    processed_lecture["status"] = run.error.status
+                else:
+                    logger.error(f"Pipeline error: {str(run.error)}")
+                    processed_lecture["status"] = f"error: {str(run.error)}"
                 return processed_lecture
             
-            logger.info("[STEP 3/4] Generating study materials...")
-            notes = GeminiService.generate_notes(transcript, slides_content)
-            flashcards = GeminiService.generate_flashcards(transcript, slides_content)
-            quiz = GeminiService.generate_quiz(transcript, slides_content)
+            transcript = processed_lecture["transcript"]
+            materials = run.results["generation"]
+            notes = materials.get("notes")
+            flashcards = materials.get("flashcards")
+            quiz = materials.get("quiz")
             
             processed_lecture["notes"] = notes
             processed_lecture["flashcards"] = flashcards
@@ -442,11 +1561,15 @@ class LectureProcessor:
                 logger.info(f"  • Notes: {len(notes) if notes else 0} characters")
                 logger.info(f"  • Flashcards: {len(flashcards) if flashcards else 0} cards")
                 logger.info(f"  • Quiz: {len(quiz) if quiz else 0} questions")
+                logger.info(f"  • Stage timings: {processed_lecture['timings']['stages']}")
                 logger.info("=" * 60)
                 processed_lecture["status"] = LectureProcessor.COMPLETED_STATUS
             
         except Exception as e:
             logger.error(f"Pipeline error: {str(e)}")
             processed_lecture["status"] = f"error: {str(e)}"
+        finally:
+            if early_notes is not None:
+                early_notes.shutdown()
         
         return processed_lecture
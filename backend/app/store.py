@@ -0,0 +1,202 @@
+"""
+Server-side lecture store: lecture records and per-stage checkpoints in SQLite
+"""
+import os
+import json
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import ForeignKey, String, Text, create_engine, event, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, sessionmaker
+
+from .search import SEARCHABLE_STAGES, SearchIndex
+
+logger = logging.getLogger(__name__)
+
+LECTURE_STORE_ENABLED = os.getenv("LECTURE_STORE_ENABLED", "true").lower() == "true"
+# Empty means a SQLite file under the storage directory.
+LECTURE_DB_URL = os.getenv("LECTURE_DB_URL", "")
+
+QUEUED_STATUS = "queued"
+PROCESSING_STATUS = "processing"
+COMPLETED_STATUS = "completed"
+FAILED_STATUS = "failed"
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _utc(value: datetime) -> datetime:
+    """SQLite hands timestamps back without a zone; they were written in UTC."""
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class LectureRecord(Base):
+    __tablename__ = "lectures"
+
+    id: Mapped[str] = mapped_column(String(36), primary_key=True)
+    title: Mapped[str] = mapped_column(String(500))
+    status: Mapped[str] = mapped_column(String(50), default=QUEUED_STATUS)
+    error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    # The job payload, kept so a failed lecture can be queued again with the same inputs.
+    payload: Mapped[str] = mapped_column(Text, default="{}")
+    created_at: Mapped[datetime] = mapped_column(default=_now)
+    updated_at: Mapped[datetime] = mapped_column(default=_now, onupdate=_now)
+
+
+class CheckpointRecord(Base):
+    __tablename__ = "checkpoints"
+
+    lecture_id: Mapped[str] = mapped_column(ForeignKey("lectures.id", ondelete="CASCADE"), primary_key=True)
+    stage: Mapped[str] = mapped_column(String(50), primary_key=True)
+    data: Mapped[str] = mapped_column(Text)
+    created_at: Mapped[datetime] = mapped_column(default=_now, onupdate=_now)
+
+
+class LectureNotFoundError(Exception):
+    """Raised when a lecture id is not in the store."""
+    pass
+
+
+class LectureStore:
+    """Lecture records and the output of each finished pipeline stage, shared by all workers."""
+
+    def __init__(self, url: str):
+        connect_args = {"check_same_thread": False} if url.startswith("sqlite") else {}
+        self.engine = create_engine(url, connect_args=connect_args)
+        if url.startswith("sqlite"):
+            event.listen(self.engine, "connect", self._configure_sqlite)
+        Base.metadata.create_all(self.engine)
+        self._sessions = sessionmaker(self.engine, expire_on_commit=False)
+        self.search_index = self._create_search_index() if url.startswith("sqlite") else None
+
+    def _create_search_index(self) -> Optional[SearchIndex]:
+        index = SearchIndex(self.engine)
+        try:
+            index.create()
+        except OperationalError as e:
+            logger.warning(f"Search disabled, SQLite has no FTS5 support: {str(e)}")
+            return None
+        if index.is_empty():
+            indexed = index.rebuild(self._all_checkpoints())
+            if indexed:
+                logger.info(f"Search index built from {indexed} stored checkpoints")
+        return index
+
+    def _all_checkpoints(self):
+        with self._sessions() as session:
+            query = select(CheckpointRecord).where(CheckpointRecord.stage.in_(SEARCHABLE_STAGES))
+            for record in session.scalars(query):
+                yield record.lecture_id, record.stage, json.loads(record.data)
+
+    @staticmethod
+    def _configure_sqlite(connection, _record) -> None:
+        cursor = connection.cursor()
+        # WAL lets readers carry on while a job writes a checkpoint.
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.execute("PRAGMA busy_timeout=5000")
+        cursor.close()
+
+    def create_lecture(self, lecture_id: str, title: str, payload: dict) -> None:
+        with self._sessions.begin() as session:
+            session.add(LectureRecord(id=lecture_id, title=title, payload=json.dumps(payload)))
+
+    def set_status(self, lecture_id: str, status: str, error: Optional[str] = None) -> None:
+        with self._sessions.begin() as session:
+            lecture = session.get(LectureRecord, lecture_id)
+            if lecture is None:
+                logger.warning(f"Status update for unknown lecture: {lecture_id}")
+                return
+            lecture.status = status
+            lecture.error = error
+
+    def get_lecture(self, lecture_id: str) -> dict:
+        """The lecture record with the names of its checkpointed stages."""
+        with self._sessions() as session:
+            lecture = session.get(LectureRecord, lecture_id)
+            if lecture is None:
+                raise LectureNotFoundError(f"Lecture not found: {lecture_id}")
+            stages = session.scalars(
+                select(CheckpointRecord.stage).where(CheckpointRecord.lecture_id == lecture_id)
+            ).all()
+            return {
+                "lecture_id": lecture.id,
+                "title": lecture.title,
+                "status": lecture.status,
+                "error": lecture.error,
+                "payload": json.loads(lecture.payload),
+                "created_at": lecture.created_at.isoformat(),
+                "updated_at": lecture.updated_at.isoformat(),
+                "checkpoints": sorted(stages),
+            }
+
+    def fail_unfinished(self, error: str) -> List[str]:
+        """Mark every queued or processing lecture as failed with error; returns their ids."""
+        with self._sessions.begin() as session:
+            lectures = session.scalars(
+                select(LectureRecord).where(LectureRecord.status.in_([QUEUED_STATUS, PROCESSING_STATUS]))
+            ).all()
+            for lecture in lectures:
+                lecture.status = FAILED_STATUS
+                lecture.error = error
+            return [lecture.id for lecture in lectures]
+
+    def expired_failures(self, lecture_ids: List[str], failed_before: datetime) -> List[str]:
+        """Of lecture_ids, those that failed before failed_before or are not in the store at all."""
+        if not lecture_ids:
+            return []
+        with self._sessions() as session:
+            rows = session.execute(
+                select(LectureRecord.id, LectureRecord.status, LectureRecord.updated_at)
+                .where(LectureRecord.id.in_(lecture_ids))
+            ).all()
+        known = {row.id: row for row in rows}
+        cutoff = _utc(failed_before)
+        return [
+            lecture_id for lecture_id in lecture_ids
+            if lecture_id not in known
+            or (known[lecture_id].status == FAILED_STATUS and _utc(known[lecture_id].updated_at) < cutoff)
+        ]
+
+    def save_checkpoint(self, lecture_id: str, stage: str, data: Any) -> None:
+        with self._sessions.begin() as session:
+            session.merge(CheckpointRecord(lecture_id=lecture_id, stage=stage, data=json.dumps(data), created_at=_now()))
+            if self.search_index is not None:
+                self.search_index.replace(session.connection(), lecture_id, stage, data)
+        logger.info(f"Checkpoint saved: {lecture_id} / {stage}")
+
+    def load_checkpoints(self, lecture_id: str, stages: Optional[List[str]] = None) -> Dict[str, Any]:
+        with self._sessions() as session:
+            query = select(CheckpointRecord).where(CheckpointRecord.lecture_id == lecture_id)
+            if stages:
+                query = query.where(CheckpointRecord.stage.in_(stages))
+            return {record.stage: json.loads(record.data) for record in session.scalars(query)}
+
+    def checkpoints_for(self, lecture_id: str) -> "LectureCheckpoints":
+        return LectureCheckpoints(self, lecture_id)
+
+
+class LectureCheckpoints:
+    """Checkpoint access for one lecture, handed to the pipeline."""
+
+    def __init__(self, store: LectureStore, lecture_id: str):
+        self.store = store
+        self.lecture_id = lecture_id
+
+    def load(self) -> Dict[str, Any]:
+        return self.store.load_checkpoints(self.lecture_id)
+
+    def save(self, stage: str, data: Any) -> None:
+        """Record a finished stage; a failure to write is logged and does not fail the lecture."""
+        try:
+            self.store.save_checkpoint(self.lecture_id, stage, data)
+        except Exception as e:
+            logger.error(f"Failed to save checkpoint {self.lecture_id} / {stage}: {str(e)}")
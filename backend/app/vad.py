@@ -0,0 +1,210 @@
+"""
+Energy-based voice activity detection on 16 kHz mono PCM
+"""
+import os
+import logging
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from .audio_io import AUDIO_BLOCK_SECONDS, AudioData, PcmWriter, iter_blocks
+
+logger = logging.getLogger(__name__)
+
+VAD_FRAME_SECONDS = 0.03
+VAD_THRESHOLD_DB = float(os.getenv("VAD_THRESHOLD_DB", "12"))
+VAD_MIN_SILENCE_SECONDS = float(os.getenv("VAD_MIN_SILENCE_SECONDS", "0.5"))
+# Frames quieter than this are always silence, however quiet the recording is overall.
+VAD_ABSOLUTE_FLOOR_DB = -60.0
+OFF_VAD_MODE = "off"
+ENERGY_VAD_MODE = "energy"
+# faster-whisper's built-in Silero VAD filter.
+WHISPER_VAD_MODE = "whisper"
+VAD_TRIM_MODE = os.getenv("VAD_TRIM_MODE", OFF_VAD_MODE)
+VAD_TRIM_MIN_SILENCE_SECONDS = float(os.getenv("VAD_TRIM_MIN_SILENCE_SECONDS", "1.0"))
+VAD_TRIM_PAD_SECONDS = float(os.getenv("VAD_TRIM_PAD_SECONDS", "0.2"))
+# Trimming that would drop more than this share of a recording is taken as a misreading, and the
+# recording is kept whole.
+VAD_TRIM_MAX_SKIPPED_FRACTION = float(os.getenv("VAD_TRIM_MAX_SKIPPED_FRACTION", "0.5"))
+NOISE_FLOOR_PERCENTILE = 10
+
+SampleRange = Tuple[int, int]
+
+
+def frame_energy_db(audio: AudioData, frame_length: int, block_frames: int = 1024) -> np.ndarray:
+    """RMS energy of consecutive non-overlapping frames, in dBFS; a trailing partial frame counts as one.
+
+    Frames are measured block_frames at a time, so only one block of samples is held besides the result.
+    """
+    energies = []
+    for _, block in iter_blocks(audio, block_frames * frame_length):
+        num_frames = -(-len(block) // frame_length)
+        padded = np.zeros(num_frames * frame_length, dtype=np.float32)
+        padded[:len(block)] = block
+        frames = padded.reshape(num_frames, frame_length)
+        energies.append(np.sqrt(np.mean(np.square(frames, dtype=np.float32), axis=1)))
+    rms = np.concatenate(energies) if energies else np.zeros(0, dtype=np.float32)
+    return 20 * np.log10(np.maximum(rms, 1e-10))
+
+
+def speech_mask(
+    audio: AudioData,
+    sample_rate: int,
+    frame_seconds: float = VAD_FRAME_SECONDS,
+    threshold_db: float = VAD_THRESHOLD_DB,
+) -> Tuple[np.ndarray, int]:
+    """Mark frames louder than the recording's noise floor by threshold_db; returns (mask, frame length).
+
+    The noise floor is the quietest decile of frames, capped so that only frames at least threshold_db
+    below the median can count as silence; recordings without pauses (a constant level, continuous
+    speech) then stay speech instead of losing their quieter half.
+    """
+    frame_length = max(1, int(sample_rate * frame_seconds))
+    if len(audio) == 0:
+        return np.zeros(0, dtype=bool), frame_length
+    energy = frame_energy_db(audio, frame_length)
+    noise_floor = min(np.percentile(energy, NOISE_FLOOR_PERCENTILE), np.median(energy) - 2 * threshold_db)
+    return (energy > noise_floor + threshold_db) & (energy > VAD_ABSOLUTE_FLOOR_DB), frame_length
+
+
+def silence_runs(mask: np.ndarray, min_frames: int) -> List[Tuple[int, int]]:
+    """Frame ranges [start, end) of at least min_frames consecutive non-speech frames."""
+    edges = np.diff(np.concatenate(([0], (~mask).astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    keep = ends - starts >= max(1, min_frames)
+    return list(zip(starts[keep].tolist(), ends[keep].tolist()))
+
+
+def split_on_silence(
+    audio: AudioData,
+    sample_rate: int,
+    target_seconds: float,
+    min_silence_seconds: float = VAD_MIN_SILENCE_SECONDS,
+) -> List[SampleRange]:
+    """Cut audio into windows of roughly target_seconds, cutting in the middle of pauses.
+
+    Each cut goes to the pause nearest the target length within half to one and a half times it;
+    with no pause in range the window is cut hard at the upper bound. Windows cover the audio
+    end to end, so their sample offsets give global timestamps.
+    """
+    total = len(audio)
+    target = max(1, int(target_seconds * sample_rate))
+    if total <= target * 1.5:
+        return [(0, total)] if total else []
+
+    mask, frame_length = speech_mask(audio, sample_rate)
+    min_frames = int(round(min_silence_seconds * sample_rate / frame_length))
+    cut_points = np.array(
+        [(start + end) // 2 * frame_length for start, end in silence_runs(mask, min_frames)], dtype=np.int64
+    )
+
+    windows = []
+    start = 0
+    while total - start > target * 1.5:
+        lower, upper = start + target // 2, start + target * 3 // 2
+        candidates = cut_points[(cut_points > lower) & (cut_points < upper)]
+        if len(candidates):
+            cut = int(candidates[np.argmin(np.abs(candidates - (start + target)))])
+        else:
+            cut = upper
+        windows.append((start, cut))
+        start = cut
+    windows.append((start, total))
+    return windows
+
+
+def speech_regions(
+    audio: AudioData,
+    sample_rate: int,
+    min_silence_seconds: float,
+    pad_seconds: float,
+) -> List[SampleRange]:
+    """Sample ranges left after removing pauses of at least min_silence_seconds, keeping pad_seconds of each."""
+    mask, frame_length = speech_mask(audio, sample_rate)
+    min_frames = int(round(min_silence_seconds * sample_rate / frame_length))
+    pad_frames = int(round(pad_seconds * sample_rate / frame_length))
+
+    regions = []
+    speech_start = 0
+    for silence_start, silence_end in silence_runs(mask, min_frames):
+        # Leading and trailing silence keep padding only on their speech side.
+        cut_start = silence_start + pad_frames if silence_start > 0 else 0
+        cut_end = silence_end - pad_frames if silence_end < len(mask) else len(mask)
+        if cut_end <= cut_start:
+            continue
+        if cut_start > speech_start:
+            regions.append((speech_start * frame_length, min(cut_start * frame_length, len(audio))))
+        speech_start = cut_end
+    if speech_start < len(mask):
+        regions.append((speech_start * frame_length, len(audio)))
+    return regions
+
+
+class TrimmedAudio:
+    """Speech-only audio plus the mapping from its timeline back to the original recording.
+
+    With output_path, the speech is copied block by block into a PCM file there instead of
+    being concatenated in memory.
+    """
+
+    def __init__(self, audio: AudioData, sample_rate: int, regions: List[SampleRange], output_path: Optional[str] = None):
+        self.sample_rate = sample_rate
+        self.regions = regions
+        self.original_seconds = len(audio) / sample_rate
+        if output_path is not None:
+            with PcmWriter(output_path, sample_rate) as writer:
+                for start, end in regions:
+                    for _, block in iter_blocks(audio, int(AUDIO_BLOCK_SECONDS * sample_rate), start, end):
+                        writer.write(block)
+                self.audio = writer.close()
+        else:
+            self.audio = np.concatenate([audio[start:end] for start, end in regions]) if regions else audio[:0]
+        lengths = np.array([end - start for start, end in regions], dtype=np.int64)
+        self._trimmed_starts = np.concatenate(([0], np.cumsum(lengths)[:-1])) / sample_rate
+        self._original_starts = np.array([start for start, _ in regions], dtype=np.int64) / sample_rate
+        self._lengths = lengths / sample_rate
+
+    @property
+    def speech_seconds(self) -> float:
+        return len(self.audio) / self.sample_rate
+
+    @property
+    def skipped_seconds(self) -> float:
+        return self.original_seconds - self.speech_seconds
+
+    def to_original(self, seconds: float, is_end: bool = False) -> float:
+        """Map a time on the trimmed timeline to the original recording.
+
+        An end time that falls exactly on a region boundary stays at the end of the earlier region
+        rather than jumping over the removed pause.
+        """
+        if not self.regions:
+            return seconds
+        side = "left" if is_end else "right"
+        index = max(0, int(np.searchsorted(self._trimmed_starts, seconds, side=side)) - 1)
+        offset = min(max(0.0, seconds - self._trimmed_starts[index]), self._lengths[index])
+        return float(self._original_starts[index] + offset)
+
+
+def trim_silence(
+    audio: AudioData,
+    sample_rate: int,
+    min_silence_seconds: float,
+    pad_seconds: float,
+    output_path: Optional[str] = None,
+) -> TrimmedAudio:
+    """Drop long pauses from audio, keeping a timestamp mapping to the original.
+
+    If trimming would leave no speech, or skip more than VAD_TRIM_MAX_SKIPPED_FRACTION of the
+    recording, the whole recording is kept as one region.
+    """
+    regions = speech_regions(audio, sample_rate, min_silence_seconds, pad_seconds)
+    kept = sum(end - start for start, end in regions)
+    if len(audio) and kept < len(audio) * (1 - VAD_TRIM_MAX_SKIPPED_FRACTION):
+        logger.info(
+            f"Silence trimming kept {kept / sample_rate:.1f}s of {len(audio) / sample_rate:.1f}s; "
+            f"transcribing the untrimmed audio"
+        )
+        regions = [(0, len(audio))]
+    return TrimmedAudio(audio, sample_rate, regions, output_path)
@@ -0,0 +1,243 @@
+"""
+Process-wide registry of loaded Whisper models
+"""
+import os
+import time
+import queue
+import logging
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+WHISPER_POOL_SIZE = int(os.getenv("WHISPER_POOL_SIZE", "1"))
+WHISPER_MAX_LOADED_MODELS = int(os.getenv("WHISPER_MAX_LOADED_MODELS", "2"))
+WHISPER_ACQUIRE_TIMEOUT = float(os.getenv("WHISPER_ACQUIRE_TIMEOUT", "900"))
+# Lectures transcribing at once across all jobs. Transcription is CPU-bound, so job workers beyond
+# this wait while other lectures use the time for I/O-bound work such as Gemini generation.
+TRANSCRIPTION_CONCURRENCY = int(os.getenv("TRANSCRIPTION_CONCURRENCY", str(WHISPER_POOL_SIZE)))
+
+ModelKey = Tuple[str, str, str]
+
+
+class ModelPoolTimeoutError(Exception):
+    """Raised when no pooled model instance becomes free in time."""
+    pass
+
+
+def _load_whisper_model(model_size: str, device: str, compute_type: str) -> Any:
+    """Load a faster-whisper model from disk or the model hub."""
+    from faster_whisper import WhisperModel
+    return WhisperModel(model_size, device=device, compute_type=compute_type)
+
+
+class ModelLease:
+    """A model instance borrowed from the registry for one request."""
+
+    def __init__(self, model: Any, cold: bool, acquire_seconds: float):
+        self.model = model
+        self.cold = cold
+        self.acquire_seconds = acquire_seconds
+
+
+class _ModelPool:
+    """Bounded pool of interchangeable model instances for a single key."""
+
+    def __init__(self, key: ModelKey, loader: Callable[..., Any], max_size: int):
+        self.key = key
+        self.max_size = max(1, max_size)
+        self._loader = loader
+        self._idle: "queue.LifoQueue[Any]" = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self.created = 0
+        self.in_use = 0
+        # Callers holding, loading or waiting for an instance; the pool is not evicted while any remain.
+        self.leases = 0
+        self.load_count = 0
+        self.load_seconds_total = 0.0
+        self.last_load_seconds = 0.0
+        self.acquisitions = 0
+        self.reuses = 0
+
+    def _reserve_slot(self) -> bool:
+        with self._lock:
+            if self.created < self.max_size:
+                self.created += 1
+                return True
+            return False
+
+    def _load(self) -> Any:
+        started = time.perf_counter()
+        try:
+            instance = self._loader(*self.key)
+        except Exception:
+            with self._lock:
+                self.created -= 1
+            raise
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.load_count += 1
+            self.load_seconds_total += elapsed
+            self.last_load_seconds = elapsed
+        logger.info(f"Loaded Whisper model {self.key[0]} ({self.key[1]}/{self.key[2]}) in {elapsed:.2f}s")
+        return instance
+
+    def take(self, timeout: float) -> Tuple[Any, bool]:
+        """Return an instance and whether it was loaded for this call."""
+        try:
+            instance, cold = self._idle.get_nowait(), False
+        except queue.Empty:
+            if self._reserve_slot():
+                instance, cold = self._load(), True
+            else:
+                try:
+                    instance, cold = self._idle.get(timeout=timeout), False
+                except queue.Empty:
+                    raise ModelPoolTimeoutError(
+                        f"No Whisper model instance for {self.key[0]} became free within {timeout:.0f}s"
+                    )
+        with self._lock:
+            self.in_use += 1
+            self.acquisitions += 1
+            if not cold:
+                self.reuses += 1
+        return instance, cold
+
+    def add_lease(self) -> None:
+        with self._lock:
+            self.leases += 1
+
+    def release_lease(self) -> None:
+        with self._lock:
+            self.leases -= 1
+
+    def give_back(self, instance: Any) -> None:
+        with self._lock:
+            self.in_use -= 1
+        self._idle.put(instance)
+
+    def preload(self) -> None:
+        """Load one instance if the pool is still empty."""
+        with self._lock:
+            if self.created:
+                return
+            self.created += 1
+        self._idle.put(self._load())
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "model_size": self.key[0],
+                "device": self.key[1],
+                "compute_type": self.key[2],
+                "instances": self.created,
+                "in_use": self.in_use,
+                "leases": self.leases,
+                "max_instances": self.max_size,
+                "loads": self.load_count,
+                "load_seconds_total": round(self.load_seconds_total, 3),
+                "last_load_seconds": round(self.last_load_seconds, 3),
+                "acquisitions": self.acquisitions,
+                "reuses": self.reuses,
+            }
+
+
+class WhisperModelRegistry:
+    """Load each (size, device, compute_type) once and share it across requests."""
+
+    def __init__(
+        self,
+        loader: Callable[..., Any] = _load_whisper_model,
+        pool_size: int = WHISPER_POOL_SIZE,
+        max_loaded_models: int = WHISPER_MAX_LOADED_MODELS,
+        acquire_timeout: float = WHISPER_ACQUIRE_TIMEOUT,
+    ):
+        self._loader = loader
+        self.pool_size = pool_size
+        self.max_loaded_models = max(1, max_loaded_models)
+        self.acquire_timeout = acquire_timeout
+        self._pools: "OrderedDict[ModelKey, _ModelPool]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.warmup_seconds: Optional[float] = None
+        self.last_acquire_seconds: Optional[float] = None
+        self.last_acquire_cold: Optional[bool] = None
+
+    def _pool_for(self, key: ModelKey) -> _ModelPool:
+        """The pool for key, with a lease taken out that the caller must release."""
+        with self._lock:
+            pool = self._pools.get(key)
+            if pool is None:
+                pool = _ModelPool(key, self._loader, self.pool_size)
+                self._pools[key] = pool
+            self._pools.move_to_end(key)
+            # Taken under the registry lock so eviction never sees the pool before its model loads.
+            pool.add_lease()
+            self._evict_locked()
+            return pool
+
+    def _evict_locked(self) -> None:
+        """Drop least recently used pools without leases beyond the configured limit."""
+        excess = len(self._pools) - self.max_loaded_models
+        if excess <= 0:
+            return
+        for key in list(self._pools.keys())[:-1]:
+            if excess <= 0:
+                break
+            if self._pools[key].leases == 0:
+                del self._pools[key]
+                self.evictions += 1
+                excess -= 1
+                logger.info(f"Evicted Whisper model {key[0]} ({key[1]}/{key[2]}) from registry")
+
+    @contextmanager
+    def acquire(self, model_size: str, device: str, compute_type: str) -> Iterator[ModelLease]:
+        """Borrow a model instance for the duration of the block."""
+        pool = self._pool_for((model_size, device, compute_type))
+        try:
+            started = time.perf_counter()
+            instance, cold = pool.take(self.acquire_timeout)
+            lease = ModelLease(instance, cold, time.perf_counter() - started)
+            self.last_acquire_seconds = lease.acquire_seconds
+            self.last_acquire_cold = cold
+            try:
+                yield lease
+            finally:
+                pool.give_back(instance)
+        finally:
+            pool.release_lease()
+
+    def warm_up(self, model_sizes: list, device: str, compute_type: str) -> float:
+        """Load one instance of each model size ahead of the first request."""
+        started = time.perf_counter()
+        for model_size in model_sizes:
+            pool = self._pool_for((model_size, device, compute_type))
+            try:
+                pool.preload()
+            finally:
+                pool.release_lease()
+        self.warmup_seconds = time.perf_counter() - started
+        logger.info(f"Whisper warm-up finished in {self.warmup_seconds:.2f}s ({', '.join(model_sizes)})")
+        return self.warmup_seconds
+
+    def clear(self) -> None:
+        """Forget every loaded model."""
+        with self._lock:
+            self._pools.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            pools = [pool.stats() for pool in self._pools.values()]
+        return {
+            "warmup_seconds": round(self.warmup_seconds, 3) if self.warmup_seconds is not None else None,
+            "last_acquire_seconds": round(self.last_acquire_seconds, 3) if self.last_acquire_seconds is not None else None,
+            "last_acquire_cold": self.last_acquire_cold,
+            "max_loaded_models": self.max_loaded_models,
+            "evictions": self.evictions,
+            "models": pools,
+        }
+
+
+model_registry = WhisperModelRegistry()
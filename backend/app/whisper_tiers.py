@@ -0,0 +1,177 @@
+"""
+Per-job choice of Whisper model, compute type and beam size from load and audio length
+"""
+import os
+import logging
+from typing import List, Optional
+
+from .whisper_pool import TRANSCRIPTION_CONCURRENCY
+
+logger = logging.getLogger(__name__)
+
+FIXED_TIER_POLICY = "fixed"
+ADAPTIVE_TIER_POLICY = "adaptive"
+WHISPER_TIER_POLICY = os.getenv("WHISPER_TIER_POLICY", FIXED_TIER_POLICY)
+# Most accurate first: name=model/compute type/beam size/audio seconds decoded per second.
+WHISPER_TIERS = os.getenv(
+    "WHISPER_TIERS",
+    "accurate=small/int8/5/3,balanced=base/int8/5/8,fast=tiny/int8/1/25",
+)
+WHISPER_LATENCY_TARGET_SECONDS = float(os.getenv("WHISPER_LATENCY_TARGET_SECONDS", "600"))
+# At this many other lectures queued or running, the fastest tier is used regardless of length.
+WHISPER_BACKLOG_QUEUE_DEPTH = int(os.getenv("WHISPER_BACKLOG_QUEUE_DEPTH", "4"))
+
+
+class WhisperTier:
+    """One model/compute/beam combination and its expected CPU throughput."""
+
+    def __init__(self, name: str, model_size: str, compute_type: str, beam_size: int, realtime_factor: float = 1.0):
+        self.name = name
+        self.model_size = model_size
+        self.compute_type = compute_type
+        self.beam_size = beam_size
+        self.realtime_factor = realtime_factor
+
+    def estimate_seconds(self, audio_seconds: float, queue_depth: int, speedup: float = 1.0) -> float:
+        """Expected transcription time; lectures beyond the transcription slots wait their turn."""
+        contention = max(1.0, (queue_depth + 1) / max(1, TRANSCRIPTION_CONCURRENCY))
+        return audio_seconds / (self.realtime_factor * max(1.0, speedup)) * contention
+
+    @property
+    def cache_identity(self) -> str:
+        """The settings that decide the transcript this tier produces, for cache keys."""
+        return tier_identity(self.to_dict())
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "model_size": self.model_size,
+            "compute_type": self.compute_type,
+            "beam_size": self.beam_size,
+        }
+
+
+def tier_identity(tier: dict) -> str:
+    """Cache identity of a tier as recorded in a transcript report (WhisperTier.to_dict)."""
+    return f"{tier['model_size']}/{tier['compute_type']}/{tier['beam_size']}"
+
+
+def parse_tiers(spec: str) -> List[WhisperTier]:
+    """Parse "name=model/compute/beam/realtime factor" entries separated by commas."""
+    tiers = []
+    for entry in spec.split(","):
+        if not entry.strip():
+            continue
+        try:
+            name, settings = entry.strip().split("=", 1)
+            model_size, compute_type, beam_size, realtime_factor = settings.split("/")
+            tiers.append(WhisperTier(name, model_size, compute_type, int(beam_size), float(realtime_factor)))
+        except ValueError:
+            raise ValueError(f"Invalid WHISPER_TIERS entry: {entry!r}")
+    if not tiers:
+        raise ValueError("WHISPER_TIERS defines no tiers")
+    return tiers
+
+
+class TierChoice:
+    """The tier picked for one lecture and why, recorded in the response for auditing."""
+
+    def __init__(self, tier: WhisperTier, reason: str, estimated_seconds: Optional[float] = None, queue_depth: int = 0):
+        self.tier = tier
+        self.reason = reason
+        self.estimated_seconds = estimated_seconds
+        self.queue_depth = queue_depth
+
+    def to_dict(self) -> dict:
+        return {
+            **self.tier.to_dict(),
+            "reason": self.reason,
+            "queue_depth": self.queue_depth,
+            "estimated_seconds": round(self.estimated_seconds, 1) if self.estimated_seconds is not None else None,
+        }
+
+
+class WhisperTierPolicy:
+    """Pick the most accurate tier expected to finish within the latency target."""
+
+    def __init__(
+        self,
+        policy: str = WHISPER_TIER_POLICY,
+        tiers: Optional[List[WhisperTier]] = None,
+        fixed_tier: Optional[WhisperTier] = None,
+        latency_target: float = WHISPER_LATENCY_TARGET_SECONDS,
+        backlog_queue_depth: int = WHISPER_BACKLOG_QUEUE_DEPTH,
+    ):
+        if policy not in (FIXED_TIER_POLICY, ADAPTIVE_TIER_POLICY):
+            raise ValueError(f"Unknown Whisper tier policy: {policy}")
+        self.policy = policy
+        self.tiers = tiers or parse_tiers(WHISPER_TIERS)
+        self.fixed_tier = fixed_tier or self.tiers[0]
+        self.latency_target = latency_target
+        self.backlog_queue_depth = backlog_queue_depth
+
+    def reusable_tiers(self, tier: Optional[WhisperTier] = None) -> List[WhisperTier]:
+        """Tiers whose cached transcript can stand in for one made with tier, most accurate first.
+
+        Without a tier, as before the audio length is known, a fixed policy means its fixed tier;
+        an adaptive one only trusts its most accurate tier, since no later choice could beat it.
+        A tier outside the ranked list only reuses its own transcripts.
+        """
+        if tier is None:
+            if self.policy == FIXED_TIER_POLICY:
+                return self.reusable_tiers(self.fixed_tier)
+            return self.tiers[:1]
+        if tier not in self.tiers:
+            return [tier]
+        return self.tiers[:self.tiers.index(tier) + 1]
+
+    def tier(self, name: str) -> WhisperTier:
+        tiers = [self.fixed_tier] + [tier for tier in self.tiers if tier.name != self.fixed_tier.name]
+        for tier in tiers:
+            if tier.name == name:
+                return tier
+        raise ValueError(f"Unknown Whisper tier: {name}; expected one of {', '.join(tier.name for tier in tiers)}")
+
+    def batch_tier(self, lectures: int) -> WhisperTier:
+        """One tier for every lecture of a batch, so they all reuse the same loaded model.
+
+        An adaptive policy treats a batch larger than the backlog depth as a backlog.
+        """
+        if self.policy == ADAPTIVE_TIER_POLICY and lectures > self.backlog_queue_depth:
+            return max(self.tiers, key=lambda tier: tier.realtime_factor)
+        return self.fixed_tier
+
+    def pinned(self, tier: WhisperTier, audio_seconds: float, queue_depth: int = 0, speedup: float = 1.0) -> TierChoice:
+        choice = TierChoice(tier, "pinned for batch", tier.estimate_seconds(audio_seconds, queue_depth, speedup), queue_depth)
+        logger.info(f"Whisper tier '{tier.name}' ({tier.model_size}/{tier.compute_type}, beam {tier.beam_size}) pinned for batch")
+        return choice
+
+    def choose(self, audio_seconds: float, queue_depth: int = 0, speedup: float = 1.0) -> TierChoice:
+        """speedup scales the expected throughput, e.g. for transcription split across processes."""
+        if self.policy == FIXED_TIER_POLICY:
+            return TierChoice(self.fixed_tier, "fixed", queue_depth=queue_depth)
+
+        fastest = max(self.tiers, key=lambda tier: tier.realtime_factor)
+        if queue_depth >= self.backlog_queue_depth:
+            choice = TierChoice(
+                fastest, f"queue depth {queue_depth} >= {self.backlog_queue_depth}",
+                fastest.estimate_seconds(audio_seconds, queue_depth, speedup), queue_depth,
+            )
+        else:
+            choice = None
+            for tier in self.tiers:
+                estimate = tier.estimate_seconds(audio_seconds, queue_depth, speedup)
+                if estimate <= self.latency_target:
+                    choice = TierChoice(tier, f"fits {self.latency_target:.0f}s latency target", estimate, queue_depth)
+                    break
+            if choice is None:
+                choice = TierChoice(
+                    fastest, f"no tier fits {self.latency_target:.0f}s latency target",
+                    fastest.estimate_seconds(audio_seconds, queue_depth, speedup), queue_depth,
+                )
+
+        logger.info(
+            f"Whisper tier '{choice.tier.name}' ({choice.tier.model_size}/{choice.tier.compute_type}, "
+            f"beam {choice.tier.beam_size}) for {audio_seconds:.0f}s audio: {choice.reason}"
+        )
+        return choice
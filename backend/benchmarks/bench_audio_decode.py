@@ -0,0 +1,124 @@
+"""
+Compare the ffmpeg pipe decode against the previous WAV round-trip audio path.
+
+Usage (from backend/):
+    python -m benchmarks.bench_audio_decode --seconds 1800
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+import tempfile
+import subprocess
+import multiprocessing
+
+import numpy as np
+import soundfile as sf
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services import AudioProcessor, AUDIO_SAMPLE_RATE, FFMPEG_BINARY  # noqa: E402
+
+
+def make_synthetic_audio(path: str, seconds: int, sample_rate: int = 44100) -> None:
+    """Write a stereo 16-bit WAV of tones and noise, block by block."""
+    rng = np.random.default_rng(0)
+    block = sample_rate * 10
+    with sf.SoundFile(path, "w", samplerate=sample_rate, channels=2, subtype="PCM_16") as f:
+        for offset in range(0, seconds * sample_rate, block):
+            t = (np.arange(block) + offset) / sample_rate
+            tone = 0.3 * np.sin(2 * np.pi * 220 * t) + 0.05 * rng.standard_normal(block)
+            f.write(np.stack([tone, tone], axis=1).astype(np.float32))
+
+
+def _rss_mb(usage) -> float:
+    return usage.ru_maxrss / 1024
+
+
+def legacy_path(media_path: str, extract_rate: int) -> int:
+    """moviepy-style WAV extract, soundfile read, FFT resample, temp WAV write and re-read."""
+    with tempfile.TemporaryDirectory() as tmp:
+        extracted = os.path.join(tmp, "audio.wav")
+        subprocess.run(
+            [FFMPEG_BINARY, "-nostdin", "-loglevel", "error", "-y", "-i", media_path,
+             "-vn", "-acodec", "pcm_s16le", "-ar", str(extract_rate), extracted],
+            check=True,
+        )
+        audio_data, sample_rate = sf.read(extracted)
+        audio_data = audio_data.astype(np.float32)
+        if len(audio_data.shape) > 1:
+            audio_data = np.mean(audio_data, axis=1)
+        if sample_rate != AUDIO_SAMPLE_RATE:
+            from scipy import signal
+            num_samples = int(len(audio_data) * AUDIO_SAMPLE_RATE / sample_rate)
+            audio_data = signal.resample(audio_data, num_samples).astype(np.float32)
+        whisper_input = os.path.join(tmp, "whisper.wav")
+        sf.write(whisper_input, audio_data, AUDIO_SAMPLE_RATE)
+        decoded, _ = sf.read(whisper_input, dtype="float32")
+        return len(decoded)
+
+
+def pipe_path(media_path: str, extract_rate: int) -> int:
+    """Single ffmpeg decode to mono 16 kHz float32 in memory."""
+    audio_data = AudioProcessor.decode_audio(media_path)
+    return len(audio_data)
+
+
+def _measure(name: str, media_path: str, extract_rate: int) -> dict:
+    runner = {"legacy": legacy_path, "pipe": pipe_path}[name]
+    baseline = _rss_mb(resource.getrusage(resource.RUSAGE_SELF))
+    started = time.perf_counter()
+    samples = runner(media_path, extract_rate)
+    elapsed = time.perf_counter() - started
+    return {
+        "path": name,
+        "wall_seconds": round(elapsed, 3),
+        "samples": samples,
+        "peak_rss_mb": round(_rss_mb(resource.getrusage(resource.RUSAGE_SELF)), 1),
+        "peak_rss_growth_mb": round(_rss_mb(resource.getrusage(resource.RUSAGE_SELF)) - baseline, 1),
+        "ffmpeg_peak_rss_mb": round(_rss_mb(resource.getrusage(resource.RUSAGE_CHILDREN)), 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seconds", type=int, default=600, help="length of the synthetic lecture audio")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--legacy-extract-rate", type=int, default=AUDIO_SAMPLE_RATE,
+        help="sample rate of the legacy extracted WAV; anything but 16000 exercises the FFT resample",
+    )
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as tmp:
+        media_path = os.path.join(tmp, "lecture.wav")
+        make_synthetic_audio(media_path, args.seconds)
+
+        results = []
+        for name in ("legacy", "pipe"):
+            for _ in range(args.repeat):
+                # A fresh process per run keeps the peak RSS figures independent.
+                with context.Pool(1) as pool:
+                    results.append(pool.apply(_measure, (name, media_path, args.legacy_extract_rate)))
+
+    summary = {"audio_seconds": args.seconds, "runs": results}
+    for name in ("legacy", "pipe"):
+        runs = [r for r in results if r["path"] == name]
+        summary[name] = {
+            "best_wall_seconds": min(r["wall_seconds"] for r in runs),
+            "max_peak_rss_growth_mb": max(r["peak_rss_growth_mb"] for r in runs),
+        }
+    summary["speedup"] = round(summary["legacy"]["best_wall_seconds"] / summary["pipe"]["best_wall_seconds"], 2)
+
+    print(json.dumps(summary, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
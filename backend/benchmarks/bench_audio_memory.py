@@ -0,0 +1,124 @@
+"""
+Check that peak memory of the audio path does not grow with lecture length.
+
+Each run decodes a synthetic 44.1 kHz stereo recording to 16 kHz mono, optionally trims
+silence, and feeds it to a stand-in Whisper model window by window, in a fresh process.
+The "in-memory" mode is the array path used when there is no lecture directory, for comparison.
+Exits with status 1 if a bounded run exceeds --max-rss-growth-mb, or if the longest bounded
+run grew more than --max-length-growth-mb beyond the shortest.
+
+Usage (from backend/):
+    python -m benchmarks.bench_audio_memory --minutes 10,60,180
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+import tempfile
+import multiprocessing
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_audio_decode import make_synthetic_audio  # noqa: E402
+
+MODES = ("ffmpeg", "wav", "in-memory")
+
+
+def _rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _measure(mode: str, media_path: str, workdir: str, vad_mode: str, whisper_rtf: float) -> dict:
+    """Run one audio path in this (fresh) process and report its peak RSS above the post-import baseline."""
+    os.environ["VAD_TRIM_MODE"] = vad_mode
+    os.environ["WHISPER_PARALLEL_WORKERS"] = "0"
+    from app import services
+    from app.whisper_pool import model_registry
+    from benchmarks.fixtures import FakeWhisperModel
+
+    services.WHISPER_AVAILABLE = True
+    model_registry._loader = lambda model_size, device, compute_type: FakeWhisperModel(whisper_rtf)
+    model_registry.warm_up(["base"], "cpu", "int8")
+    baseline = _rss_mb()
+
+    started = time.perf_counter()
+    if mode == "ffmpeg":
+        audio = services.AudioProcessor.decode_audio(media_path, output_path=os.path.join(workdir, "audio.f32"))
+    elif mode == "in-memory":
+        audio = services.AudioProcessor.decode_audio(media_path)
+    else:
+        audio = media_path
+    report = {}
+    segments = sum(1 for _ in services.TranscriptionService.stream_segments(
+        audio, "base", report=report, compute_type="int8", beam_size=1
+    ))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "mode": mode,
+        "wall_seconds": round(elapsed, 2),
+        "segments": segments,
+        "audio_seconds": report.get("audio_seconds"),
+        "speech_seconds": report.get("speech_seconds"),
+        "peak_rss_mb": round(_rss_mb(), 1),
+        "peak_rss_growth_mb": round(_rss_mb() - baseline, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--minutes", default="10,60", help="comma-separated lecture lengths")
+    parser.add_argument("--modes", default=",".join(MODES), help=f"comma-separated subset of {', '.join(MODES)}")
+    parser.add_argument("--vad", choices=["off", "energy"], default="energy", help="VAD_TRIM_MODE for the runs")
+    parser.add_argument("--whisper-rtf", type=float, default=2000.0, help="stand-in Whisper speed, times real time")
+    parser.add_argument("--max-rss-growth-mb", type=float, default=200.0)
+    parser.add_argument("--max-length-growth-mb", type=float, default=50.0)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    minutes = [float(value) for value in args.minutes.split(",")]
+    modes = [mode for mode in args.modes.split(",") if mode]
+    context = multiprocessing.get_context("spawn")
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for length in minutes:
+            media_path = os.path.join(tmp, f"lecture_{length:g}min.wav")
+            make_synthetic_audio(media_path, int(length * 60))
+            for mode in modes:
+                with tempfile.TemporaryDirectory(dir=tmp) as workdir, context.Pool(1) as pool:
+                    run = pool.apply(_measure, (mode, media_path, workdir, args.vad, args.whisper_rtf))
+                run["minutes"] = length
+                results.append(run)
+                print(json.dumps(run), flush=True)
+            os.remove(media_path)
+
+    failures = []
+    for mode in (mode for mode in modes if mode != "in-memory"):
+        runs = sorted((run for run in results if run["mode"] == mode), key=lambda run: run["minutes"])
+        for run in runs:
+            if run["peak_rss_growth_mb"] > args.max_rss_growth_mb:
+                failures.append(
+                    f"{mode} at {run['minutes']:g} min grew {run['peak_rss_growth_mb']} MB "
+                    f"(ceiling {args.max_rss_growth_mb:g} MB)"
+                )
+        if len(runs) > 1:
+            length_growth = runs[-1]["peak_rss_growth_mb"] - runs[0]["peak_rss_growth_mb"]
+            if length_growth > args.max_length_growth_mb:
+                failures.append(
+                    f"{mode} used {length_growth:.1f} MB more at {runs[-1]['minutes']:g} min than at "
+                    f"{runs[0]['minutes']:g} min (limit {args.max_length_growth_mb:g} MB)"
+                )
+
+    summary = {"vad_mode": args.vad, "runs": results, "failures": failures}
+    print(json.dumps(summary, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(summary, f, indent=2)
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
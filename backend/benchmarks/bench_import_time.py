@@ -0,0 +1,166 @@
+"""
+Measure how long the API takes to import and to answer /health after a cold start.
+
+Imports app.main under `python -X importtime` in fresh processes and reports the total and the
+slowest modules. With --serve it also starts uvicorn and times the first /health response and the
+background dependency preload. Exits with status 1 if the median import exceeds --max-import-ms,
+if a module that should load lazily (NumPy, the Gemini SDK, PyPDF2, soundfile, SciPy,
+faster_whisper) is imported with the app, or if /health takes longer than --max-health-seconds.
+
+Usage (from backend/):
+    python -m benchmarks.bench_import_time --runs 5 --serve
+"""
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import tempfile
+import statistics
+import subprocess
+import urllib.request
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that must stay out of the import path of the API process; tests/test_startup_imports.py checks them too.
+LAZY_MODULES = (
+    "numpy", "google.generativeai", "google.api_core", "PyPDF2", "soundfile", "scipy", "faster_whisper", "IPython",
+)
+
+
+def _environment(tmp: str) -> dict:
+    env = dict(os.environ)
+    env.update({
+        "JOB_BACKEND": "thread",
+        "LECTURE_DB_URL": f"sqlite:///{os.path.join(tmp, 'lectureiq.db')}",
+        "PYTHONDONTWRITEBYTECODE": "1",
+    })
+    return env
+
+
+def _parse_importtime(stderr: str) -> list:
+    """(module, self_us, cumulative_us) for every line python -X importtime printed."""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "| imported package" in line:
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue
+        modules.append((fields[2].strip(), int(fields[0]), int(fields[1])))
+    return modules
+
+
+def measure_import(env: dict) -> dict:
+    """Import app.main once in a fresh interpreter."""
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True,
+    )
+    wall = time.perf_counter() - started
+    if completed.returncode != 0:
+        raise RuntimeError(f"import app.main failed:\n{completed.stderr[-2000:]}")
+    modules = _parse_importtime(completed.stderr)
+    main = next(cumulative for name, _, cumulative in modules if name == "app.main")
+    return {"import_ms": round(main / 1000, 1), "process_seconds": round(wall, 3), "modules": modules}
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _get_health(url: str) -> dict:
+    with urllib.request.urlopen(url, timeout=1) as response:
+        return json.loads(response.read())
+
+
+def measure_serve(env: dict, timeout: float) -> dict:
+    """Start uvicorn and time the first /health answer and the end of the background preload."""
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}/health"
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port)],
+        cwd=BACKEND_DIR, env={**env, "PRELOAD_ON_STARTUP": "true"},
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    result = {"health_seconds": None, "health_dependencies": None, "preload_seconds": None}
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                health = _get_health(url)
+            except OSError:
+                time.sleep(0.01)
+                continue
+            elapsed = round(time.perf_counter() - started, 3)
+            if result["health_seconds"] is None:
+                result["health_seconds"] = elapsed
+                result["health_dependencies"] = health.get("dependencies")
+            if health.get("dependencies") in ("ready", "failed"):
+                result["preload_seconds"] = elapsed
+                result["preload_status"] = health["dependencies"]
+                break
+            time.sleep(0.05)
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="fresh-process imports to time")
+    parser.add_argument("--top", type=int, default=15, help="slowest modules to list")
+    parser.add_argument("--serve", action="store_true", help="also time /health on a uvicorn cold start")
+    parser.add_argument("--max-import-ms", type=float, default=1500.0)
+    parser.add_argument("--max-health-seconds", type=float, default=5.0)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    failures = []
+    with tempfile.TemporaryDirectory() as tmp:
+        env = _environment(tmp)
+        runs = [measure_import(env) for _ in range(max(1, args.runs))]
+        serve = measure_serve(env, args.max_health_seconds * 6) if args.serve else None
+
+    modules = runs[-1]["modules"]
+    slowest = sorted(modules, key=lambda module: module[2], reverse=True)[:args.top]
+    lazy_loaded = sorted({
+        name for name, _, _ in modules
+        if any(name == lazy or name.startswith(lazy + ".") for lazy in LAZY_MODULES)
+    })
+    import_ms = statistics.median(run["import_ms"] for run in runs)
+
+    if import_ms > args.max_import_ms:
+        failures.append(f"import app.main took {import_ms:.0f} ms (ceiling {args.max_import_ms:g} ms)")
+    if lazy_loaded:
+        failures.append(f"imported at startup instead of on first use: {', '.join(lazy_loaded[:10])}")
+    if serve is not None:
+        if serve["health_seconds"] is None or serve["health_seconds"] > args.max_health_seconds:
+            failures.append(f"/health answered after {serve['health_seconds']} s (ceiling {args.max_health_seconds:g} s)")
+
+    summary = {
+        "import_ms_median": import_ms,
+        "import_ms_runs": [run["import_ms"] for run in runs],
+        "process_seconds_median": statistics.median(run["process_seconds"] for run in runs),
+        "slowest_modules": [
+            {"module": name, "self_ms": round(self_us / 1000, 1), "cumulative_ms": round(cumulative_us / 1000, 1)}
+            for name, self_us, cumulative_us in slowest
+        ],
+        "serve": serve,
+        "failures": failures,
+    }
+    print(json.dumps(summary, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(summary, f, indent=2)
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Measure parallel Whisper transcription speedup against the number of worker processes.
+
+Each configuration splits the same cores between workers and per-worker threads, so the
+single-worker run is the baseline a plain faster-whisper call would give on this host.
+Synthetic audio only exercises decode cost; pass --audio with a real lecture for
+representative segment counts.
+
+Usage (from backend/):
+    python -m benchmarks.bench_parallel_transcription --seconds 900
+    python -m benchmarks.bench_parallel_transcription --audio lecture.mp4 --workers 1,2,4,8
+"""
+import os
+import sys
+import json
+import time
+import argparse
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixtures import synthetic_speech  # noqa: E402
+from app.parallel_transcription import ParallelTranscriber, WHISPER_WINDOW_SECONDS  # noqa: E402
+from app.services import (  # noqa: E402
+    AUDIO_LANGUAGE,
+    AUDIO_SAMPLE_RATE,
+    WHISPER_COMPUTE_TYPE,
+    WHISPER_DEVICE,
+    WHISPER_MODEL_SIZE,
+    AudioProcessor,
+)
+
+
+def _worker_counts(spec: str, cores: int) -> list:
+    if spec:
+        return [int(count) for count in spec.split(",")]
+    counts, count = [], 1
+    while count <= cores:
+        counts.append(count)
+        count *= 2
+    return counts
+
+
+def run(audio: np.ndarray, workers: int, threads: int, window_seconds: float, model_size: str) -> dict:
+    transcriber = ParallelTranscriber(workers=workers, threads_per_worker=threads, window_seconds=window_seconds)
+    try:
+        transcriber.warm_up(model_size, WHISPER_DEVICE, WHISPER_COMPUTE_TYPE)
+        started = time.perf_counter()
+        segments = []
+        windows = 0
+        for window_segments, _, _ in transcriber.stream(
+            audio, AUDIO_SAMPLE_RATE, model_size, WHISPER_DEVICE, WHISPER_COMPUTE_TYPE, AUDIO_LANGUAGE
+        ):
+            segments.extend(window_segments)
+            windows += 1
+        elapsed = time.perf_counter() - started
+    finally:
+        transcriber.shutdown()
+    return {
+        "workers": workers,
+        "threads_per_worker": threads,
+        "windows": windows,
+        "segments": len(segments),
+        "wall_seconds": round(elapsed, 2),
+        "realtime_factor": round(len(audio) / AUDIO_SAMPLE_RATE / elapsed, 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--audio", help="media file to transcribe instead of synthetic audio")
+    parser.add_argument("--seconds", type=int, default=600, help="length of the synthetic lecture audio")
+    parser.add_argument("--cores", type=int, default=os.cpu_count() or 1, help="cores shared by the workers")
+    parser.add_argument("--workers", default="", help="comma-separated worker counts; powers of two by default")
+    parser.add_argument("--window-seconds", type=float, default=WHISPER_WINDOW_SECONDS)
+    parser.add_argument("--model", default=WHISPER_MODEL_SIZE)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    audio = AudioProcessor.decode_audio(args.audio) if args.audio else synthetic_speech(args.seconds)
+    if audio is None:
+        sys.exit(f"Could not decode {args.audio}")
+
+    runs = []
+    for workers in _worker_counts(args.workers, args.cores):
+        threads = max(1, args.cores // workers)
+        # A single worker gets the whole lecture as one window, like the sequential path.
+        window_seconds = args.window_seconds if workers > 1 else len(audio) / AUDIO_SAMPLE_RATE
+        runs.append(run(audio, workers, threads, window_seconds, args.model))
+        print(json.dumps(runs[-1]))
+
+    baseline = runs[0]["wall_seconds"]
+    for result in runs:
+        result["speedup"] = round(baseline / result["wall_seconds"], 2)
+
+    summary = {
+        "audio_seconds": round(len(audio) / AUDIO_SAMPLE_RATE, 1),
+        "cores": args.cores,
+        "model": args.model,
+        "runs": runs,
+    }
+    print(json.dumps(summary, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
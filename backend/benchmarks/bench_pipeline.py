@@ -0,0 +1,324 @@
+"""
+Measure end-to-end lecture throughput offline, with Gemini replaced by a local stub.
+
+Synthetic lectures (audio track, optional video and text slides) are pushed through
+LectureProcessor.process_lecture directly and through POST /api/upload, at each
+concurrency level. Latency percentiles come from the whole lecture and from each
+pipeline stage and operation in the response timings; peak RSS per stage is the
+highest process RSS sampled while any lecture was in that stage. Results are saved
+as JSON so runs on two commits can be compared.
+
+Whisper runs for real unless --whisper fake is given, which decodes at a fixed
+multiple of real time so the rest of the pipeline can be measured without a model.
+ffmpeg is needed to build and decode the synthetic media.
+
+Usage (from backend/):
+    python -m benchmarks.bench_pipeline --seconds 600 --concurrency 1,2,4 --whisper fake
+    python -m benchmarks.bench_pipeline --target upload --slides-pages 40 --output before.json
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import resource
+import tempfile
+import threading
+import subprocess
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+RSS_SAMPLE_SECONDS = 0.05
+RESULT_POLL_SECONDS = 0.05
+
+
+def _percentiles(values: list) -> dict:
+    if not values:
+        return {"count": 0}
+    return {
+        "count": len(values),
+        "p50": round(float(np.percentile(values, 50)), 3),
+        "p95": round(float(np.percentile(values, 95)), 3),
+        "max": round(max(values), 3),
+    }
+
+
+def _current_rss_mb() -> float:
+    """Resident set size of this process; falls back to the peak where /proc is unavailable."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class StageMonitor:
+    """Samples RSS in the background and tracks which pipeline stages are running at each sample."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._active = {}
+        self.stage_peak_rss = {}
+        self.peak_rss = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, name="rss-sampler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _sample(self) -> None:
+        while not self._stop.is_set():
+            self._record(_current_rss_mb())
+            self._stop.wait(RSS_SAMPLE_SECONDS)
+
+    def _record(self, rss: float) -> None:
+        with self._lock:
+            self.peak_rss = max(self.peak_rss, rss)
+            for stage, running in self._active.items():
+                if running:
+                    self.stage_peak_rss[stage] = max(self.stage_peak_rss.get(stage, 0.0), rss)
+
+    def on_event(self, event_type: str, data: dict) -> None:
+        if event_type != "stage":
+            return
+        with self._lock:
+            delta = 1 if data["state"] == "started" else -1
+            self._active[data["stage"]] = self._active.get(data["stage"], 0) + delta
+        # Stages shorter than the sampling interval still get a reading.
+        self._record(_current_rss_mb())
+
+    def wrap(self, on_event):
+        def forward(event_type: str, data: dict) -> None:
+            self.on_event(event_type, data)
+            if on_event:
+                on_event(event_type, data)
+        return forward
+
+
+def install_fakes(args) -> None:
+    """Point the app at the fake Gemini model, and at the fake Whisper model if asked, before it is used."""
+    import google.generativeai as genai
+    from benchmarks.fixtures import FakeGenerativeModel, FakeWhisperModel
+    from app import services
+    from app.whisper_pool import model_registry
+    from app.parallel_transcription import parallel_transcriber
+
+    FakeGenerativeModel.configure(
+        args.gemini_latency, args.gemini_jitter, args.gemini_chars_per_second, args.gemini_failure_rate
+    )
+    genai.GenerativeModel = FakeGenerativeModel
+    if args.whisper == "fake":
+        services.WHISPER_AVAILABLE = True
+        model_registry._loader = lambda model_size, device, compute_type: FakeWhisperModel(args.whisper_rtf)
+        # Worker processes load the real faster-whisper, so the fake only runs in-process.
+        parallel_transcriber.workers = 0
+
+
+def monitor_pipeline(monitor: StageMonitor) -> None:
+    """Route stage events of every process_lecture call, including those made by job workers, to monitor."""
+    from app.services import LectureProcessor
+    process_lecture = LectureProcessor.process_lecture
+
+    def monitored(*args, on_event=None, **kwargs):
+        return process_lecture(*args, on_event=monitor.wrap(on_event), **kwargs)
+
+    LectureProcessor.process_lecture = staticmethod(monitored)
+
+
+def prepare_lectures(workdir: str, count: int, args) -> list:
+    """Write count distinct synthetic lectures so no two hash to the same cached result."""
+    from benchmarks.fixtures import write_synthetic_media, write_synthetic_pdf
+    from app.services import FFMPEG_BINARY
+
+    lectures = []
+    for index in range(count):
+        video_path = os.path.join(workdir, f"lecture_{index}.{args.media}")
+        write_synthetic_media(video_path, args.seconds, FFMPEG_BINARY, seed=index)
+        slides_path = None
+        if args.slides_pages:
+            slides_path = write_synthetic_pdf(os.path.join(workdir, f"slides_{index}.pdf"), args.slides_pages, seed=index)
+        lectures.append({"video_path": video_path, "slides_path": slides_path})
+    return lectures
+
+
+def run_process_lecture(lecture: dict, workdir: str) -> dict:
+    from app.services import LectureProcessor
+
+    lecture_dir = tempfile.mkdtemp(dir=workdir)
+    started = time.perf_counter()
+    try:
+        result = LectureProcessor.process_lecture(
+            video_path=lecture["video_path"], slides_path=lecture["slides_path"], lecture_dir=Path(lecture_dir)
+        )
+    finally:
+        shutil.rmtree(lecture_dir, ignore_errors=True)
+    return {"latency": time.perf_counter() - started, "status": result["status"], "timings": result.get("timings")}
+
+
+def run_upload(client, lecture: dict) -> dict:
+    started = time.perf_counter()
+    files = {"video": (os.path.basename(lecture["video_path"]), open(lecture["video_path"], "rb"))}
+    if lecture["slides_path"]:
+        files["slides"] = (os.path.basename(lecture["slides_path"]), open(lecture["slides_path"], "rb"))
+    try:
+        response = client.post("/api/upload", data={"title": "Benchmark lecture"}, files=files)
+    finally:
+        for _, handle in files.values():
+            handle.close()
+    if response.status_code != 202:
+        return {"latency": time.perf_counter() - started, "status": f"upload {response.status_code}", "timings": None}
+
+    job_id = response.json()["job_id"]
+    while True:
+        result = client.get(f"/api/jobs/{job_id}/result")
+        if result.status_code == 200:
+            break
+        time.sleep(RESULT_POLL_SECONDS)
+    body = result.json()
+    return {"latency": time.perf_counter() - started, "status": body["status"], "timings": body.get("timings")}
+
+
+def summarize(runs: list, wall_seconds: float, audio_seconds: float, monitor: StageMonitor) -> dict:
+    stages, operations = {}, {}
+    for run in runs:
+        timings = run["timings"] or {}
+        for stage, seconds in (timings.get("stages") or {}).items():
+            stages.setdefault(stage, []).append(seconds)
+        for operation, entry in (timings.get("operations") or {}).items():
+            operations.setdefault(operation, []).append(entry["seconds"])
+        for extra in ("upload_seconds", "queue_wait_seconds"):
+            if timings.get(extra) is not None:
+                operations.setdefault(extra.replace("_seconds", ""), []).append(timings[extra])
+
+    statuses = {}
+    for run in runs:
+        statuses[run["status"]] = statuses.get(run["status"], 0) + 1
+    return {
+        "lectures": len(runs),
+        "statuses": statuses,
+        "wall_seconds": round(wall_seconds, 2),
+        "lectures_per_minute": round(60 * len(runs) / wall_seconds, 2),
+        "audio_hours_per_hour": round(audio_seconds * len(runs) / wall_seconds, 2),
+        "latency": _percentiles([run["latency"] for run in runs]),
+        "stages": {
+            stage: {**_percentiles(values), "peak_rss_mb": round(monitor.stage_peak_rss.get(stage, 0.0), 1)}
+            for stage, values in stages.items()
+        },
+        "operations": {operation: _percentiles(values) for operation, values in operations.items()},
+        "peak_rss_mb": round(monitor.peak_rss, 1),
+    }
+
+
+def run_level(target: str, concurrency: int, lectures: list, workdir: str, audio_seconds: float, client=None) -> dict:
+    from benchmarks.fixtures import FakeGenerativeModel
+    from app.services import LectureProcessor
+
+    monitor = StageMonitor()
+    process_lecture = LectureProcessor.process_lecture
+    monitor_pipeline(monitor)
+    monitor.start()
+    calls_before = FakeGenerativeModel.calls
+    started = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            if target == "process":
+                runs = list(executor.map(lambda lecture: run_process_lecture(lecture, workdir), lectures))
+            else:
+                runs = list(executor.map(lambda lecture: run_upload(client, lecture), lectures))
+        wall_seconds = time.perf_counter() - started
+    finally:
+        monitor.stop()
+        LectureProcessor.process_lecture = staticmethod(process_lecture)
+
+    summary = summarize(runs, wall_seconds, audio_seconds, monitor)
+    summary.update({"target": target, "concurrency": concurrency, "gemini_calls": FakeGenerativeModel.calls - calls_before})
+    return summary
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--target", choices=["process", "upload", "both"], default="both")
+    parser.add_argument("--concurrency", default="1,2,4", help="comma-separated numbers of lectures in flight")
+    parser.add_argument("--lectures", type=int, default=0, help="lectures per level; twice the concurrency by default")
+    parser.add_argument("--seconds", type=float, default=300, help="length of each synthetic lecture")
+    parser.add_argument("--media", choices=["mp4", "wav"], default="mp4", help="video container or audio-only upload")
+    parser.add_argument("--slides-pages", type=int, default=20, help="pages in each synthetic PDF; 0 for no slides")
+    parser.add_argument("--gemini-latency", type=float, default=2.0, help="base seconds per fake Gemini call")
+    parser.add_argument("--gemini-jitter", type=float, default=1.0, help="extra random seconds per call, at most")
+    parser.add_argument("--gemini-chars-per-second", type=float, default=0.0, help="prompt processing rate; 0 ignores prompt size")
+    parser.add_argument("--gemini-failure-rate", type=float, default=0.0, help="share of calls failing with a 429")
+    parser.add_argument("--whisper", choices=["real", "fake"], default="real")
+    parser.add_argument("--whisper-rtf", type=float, default=20.0, help="audio seconds the fake Whisper decodes per second")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    levels = [int(level) for level in args.concurrency.split(",")]
+    # Read at import time, so they are set before the app is loaded.
+    os.environ.setdefault("GEMINI_API_KEY", "offline-benchmark")
+    os.environ["RESULT_CACHE_ENABLED"] = "false"
+    os.environ["JOB_BACKEND"] = "thread"
+    os.environ["JOB_WORKERS"] = str(max(levels))
+    os.environ["JOB_MAX_PENDING"] = str(max(levels) * 4 + (args.lectures or 0))
+
+    install_fakes(args)
+    from app.services import FFMPEG_BINARY, AudioProcessor
+    if not AudioProcessor.ffmpeg_available():
+        sys.exit(f"ffmpeg not found ({FFMPEG_BINARY}); set FFMPEG_BINARY to build and decode the synthetic lectures")
+
+    targets = ["process", "upload"] if args.target == "both" else [args.target]
+    client = None
+    if "upload" in targets:
+        from fastapi.testclient import TestClient
+        from app.main import app
+        client = TestClient(app)
+
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for target in targets:
+            for concurrency in levels:
+                count = args.lectures or concurrency * 2
+                lectures = prepare_lectures(workdir, count, args)
+                result = run_level(target, concurrency, lectures, workdir, args.seconds, client)
+                results.append(result)
+                print(json.dumps({key: result[key] for key in ("target", "concurrency", "latency", "audio_hours_per_hour", "peak_rss_mb")}))
+                for lecture in lectures:
+                    for path in lecture.values():
+                        if path:
+                            os.remove(path)
+
+    summary = {
+        "revision": _git_revision(),
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "settings": vars(args),
+        "results": results,
+    }
+    print(json.dumps(summary, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
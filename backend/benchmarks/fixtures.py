@@ -0,0 +1,229 @@
+"""
+Synthetic lectures and offline stand-ins for Gemini and Whisper, shared by the benchmarks.
+"""
+import os
+import re
+import json
+import time
+import types
+import random
+import threading
+import subprocess
+from typing import List, Optional
+
+import numpy as np
+import soundfile as sf
+
+AUDIO_SAMPLE_RATE = 16000
+SEGMENT_SECONDS = 5.0
+
+TOPIC_WORDS = [
+    "gradient", "entropy", "protocol", "theorem", "enzyme", "market", "vector", "circuit",
+    "inference", "lattice", "equilibrium", "sampling", "recursion", "membrane", "latency", "tensor",
+]
+FILLER_WORDS = [
+    "the", "a", "of", "we", "see", "that", "this", "is", "how", "when", "because", "so",
+    "which", "means", "every", "now", "then", "consider", "notice", "define",
+]
+
+
+def synthetic_speech(seconds: float, sample_rate: int = AUDIO_SAMPLE_RATE, seed: int = 0) -> np.ndarray:
+    """Voiced bursts of harmonics and noise separated by short pauses, as mono float32."""
+    rng = np.random.default_rng(seed)
+    total_samples = int(seconds * sample_rate)
+    parts = []
+    total = 0
+    while total < total_samples:
+        burst = int(sample_rate * rng.uniform(4, 15))
+        t = np.arange(burst) / sample_rate
+        pitch = rng.uniform(100, 220)
+        voiced = sum(np.sin(2 * np.pi * pitch * k * t) / k for k in range(1, 6))
+        envelope = 0.5 + 0.5 * np.sin(2 * np.pi * 3 * t)
+        parts.append((0.2 * voiced * envelope + 0.02 * rng.standard_normal(burst)).astype(np.float32))
+        pause = int(sample_rate * rng.uniform(0.3, 1.5))
+        parts.append((0.001 * rng.standard_normal(pause)).astype(np.float32))
+        total += burst + pause
+    return np.concatenate(parts)[:total_samples]
+
+
+def sentence(rng: random.Random, words: int = 12) -> str:
+    chosen = [rng.choice(TOPIC_WORDS if index % 4 == 2 else FILLER_WORDS) for index in range(words)]
+    return " ".join(chosen).capitalize() + "."
+
+
+def write_synthetic_media(path: str, seconds: float, ffmpeg_binary: str = "ffmpeg", seed: int = 0) -> str:
+    """Write a synthetic lecture recording; .wav paths get audio only, anything else a video muxed by ffmpeg."""
+    audio = synthetic_speech(seconds, seed=seed)
+    if path.endswith(".wav"):
+        sf.write(path, audio, AUDIO_SAMPLE_RATE, subtype="PCM_16")
+        return path
+
+    wav_path = path + ".wav"
+    sf.write(wav_path, audio, AUDIO_SAMPLE_RATE, subtype="PCM_16")
+    try:
+        subprocess.run(
+            [ffmpeg_binary, "-nostdin", "-loglevel", "error", "-y",
+             "-f", "lavfi", "-i", f"color=c=gray:s=320x240:r=5:d={seconds}",
+             "-i", wav_path, "-shortest", "-c:v", "mpeg4",
+             "-c:a", "aac", "-b:a", "64k", path],
+            check=True,
+        )
+    finally:
+        os.remove(wav_path)
+    return path
+
+
+def write_synthetic_pdf(path: str, pages: int, lines_per_page: int = 30, seed: int = 0) -> str:
+    """Write a PDF of text-only slides that PyPDF2 can extract, without any PDF-writing dependency."""
+    rng = random.Random(seed)
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # page tree, filled in once the page object numbers are known
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    page_ids = []
+    for page in range(pages):
+        lines = [f"Slide {page + 1}: {rng.choice(TOPIC_WORDS).capitalize()}"]
+        lines += [sentence(rng, 8) for _ in range(lines_per_page - 1)]
+        text = " T* ".join(f"({line}) Tj" for line in lines)
+        stream = f"BT /F1 11 Tf 14 TL 40 760 Td {text} ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        content_id = len(objects)
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>"
+        )
+        page_ids.append(len(objects))
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(f'{i} 0 R' for i in page_ids)}] /Count {pages} >>"
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref_offset = len(output)
+    output += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    output += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode("latin-1")
+    output += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode("latin-1")
+    with open(path, "wb") as f:
+        f.write(output)
+    return path
+
+
+def _count(pattern: str, prompt: str, default: int) -> int:
+    match = re.search(pattern, prompt)
+    return int(match.group(1)) if match else default
+
+
+def canned_flashcards(count: int) -> List[dict]:
+    return [
+        {"question": f"What is {TOPIC_WORDS[i % len(TOPIC_WORDS)]}?", "answer": f"Answer {i + 1}.",
+         "difficulty": ("easy", "medium", "hard")[i % 3]}
+        for i in range(count)
+    ]
+
+
+def canned_quiz(count: int) -> List[dict]:
+    return [
+        {"question": f"Which statement about {TOPIC_WORDS[i % len(TOPIC_WORDS)]} is true?",
+         "options": {letter: f"Option {letter}{i + 1}" for letter in "ABCD"},
+         "correct_answer": "ABCD"[i % 4], "explanation": f"Because of point {i + 1}."}
+        for i in range(count)
+    ]
+
+
+def canned_notes(prompt: str) -> str:
+    topics = sorted({word for word in TOPIC_WORDS if word in prompt}) or TOPIC_WORDS[:3]
+    sections = [f"## {topic.capitalize()}\n- Key idea about {topic}.\n- Worked example." for topic in topics]
+    return "# Study Notes\n\n" + "\n\n".join(sections)
+
+
+class FakeGenerativeModel:
+    """Drop-in for genai.GenerativeModel that sleeps instead of calling the API and returns canned output.
+
+    Latency is latency_seconds plus up to jitter_seconds, plus the prompt length over chars_per_second.
+    A failure_rate share of calls raise a 429 quota error after the same delay.
+    """
+
+    latency_seconds = 1.0
+    jitter_seconds = 0.5
+    chars_per_second = 0.0
+    failure_rate = 0.0
+    calls = 0
+    _calls_lock = threading.Lock()
+
+    def __init__(self, model_name: str = "", **kwargs):
+        self.model_name = model_name
+
+    @classmethod
+    def configure(
+        cls, latency_seconds: float, jitter_seconds: float = 0.0, chars_per_second: float = 0.0, failure_rate: float = 0.0
+    ) -> None:
+        cls.latency_seconds = latency_seconds
+        cls.jitter_seconds = jitter_seconds
+        cls.chars_per_second = chars_per_second
+        cls.failure_rate = failure_rate
+        cls.calls = 0
+
+    def _response_text(self, prompt: str) -> str:
+        head = prompt[:200]
+        if "complete study pack" in head:
+            return json.dumps({
+                "notes": canned_notes(prompt),
+                "flashcards": canned_flashcards(_count(r"exactly (\d+) flashcards", prompt, 10)),
+                "quiz": canned_quiz(_count(r"exactly (\d+) multiple-choice", prompt, 5)),
+            })
+        if head.startswith("Create") and "flashcards" in head:
+            return json.dumps(canned_flashcards(_count(r"Create (\d+) flashcards", prompt, 10)))
+        if head.startswith("Create") and "multiple-choice" in head:
+            return json.dumps(canned_quiz(_count(r"Create (\d+) multiple-choice", prompt, 5)))
+        return canned_notes(prompt)
+
+    def generate_content(self, prompt, stream: bool = False, **kwargs):
+        """Replies all at once, or with stream=True as an iterator of chunks like the real SDK."""
+        with FakeGenerativeModel._calls_lock:
+            FakeGenerativeModel.calls += 1
+        prompt = prompt if isinstance(prompt, str) else str(prompt)
+        delay = self.latency_seconds + random.uniform(0, self.jitter_seconds)
+        if self.chars_per_second:
+            delay += len(prompt) / self.chars_per_second
+        if random.random() < self.failure_rate:
+            time.sleep(delay)
+            from google.api_core import exceptions as google_exceptions
+            raise google_exceptions.ResourceExhausted("Simulated quota exhaustion")
+        text = self._response_text(prompt)
+        usage = types.SimpleNamespace(prompt_token_count=len(prompt) // 4, candidates_token_count=len(text) // 4)
+        if not stream:
+            time.sleep(delay)
+            return types.SimpleNamespace(text=text, usage_metadata=usage)
+        return self._stream(text, usage, delay)
+
+    @staticmethod
+    def _stream(text: str, usage, delay: float, pieces: int = 8):
+        size = max(1, -(-len(text) // pieces))
+        for start in range(0, len(text), size):
+            time.sleep(delay / pieces)
+            last = start + size >= len(text)
+            yield types.SimpleNamespace(text=text[start:start + size], usage_metadata=usage if last else None)
+
+
+class FakeWhisperModel:
+    """Stands in for faster_whisper.WhisperModel, decoding at a fixed multiple of real time."""
+
+    def __init__(self, realtime_factor: float = 20.0, seed: int = 0):
+        self.realtime_factor = realtime_factor
+        self.seed = seed
+
+    def transcribe(self, audio, language: Optional[str] = None, beam_size: int = 5, vad_filter: bool = False, **kwargs):
+        duration = len(audio) / AUDIO_SAMPLE_RATE
+        rng = random.Random(self.seed)
+
+        def segments():
+            start = 0.0
+            while start < duration:
+                end = min(duration, start + SEGMENT_SECONDS)
+                time.sleep((end - start) / self.realtime_factor)
+                yield types.SimpleNamespace(start=start, end=end, text=" " + sentence(rng))
+                start = end
+
+        return segments(), types.SimpleNamespace(duration=duration, duration_after_vad=None)
@@ -0,0 +1,57 @@
+"""
+Peak memory of the transcription path stays bounded by the audio window, not the lecture length
+"""
+import os
+import resource
+import multiprocessing
+
+SAMPLE_RATE = 16000
+WINDOW_SECONDS = 60
+# Ceiling on peak RSS growth while transcribing; a 40-minute lecture alone is 146 MB of PCM.
+MAX_RSS_GROWTH_MB = 32.0
+MAX_LENGTH_GROWTH_MB = 8.0
+
+
+def _peak_rss_growth_mb(minutes: float, workdir: str) -> float:
+    """Transcribe a synthetic PCM lecture with a stand-in Whisper model, in a fresh process."""
+    os.environ["VAD_TRIM_MODE"] = "energy"
+    os.environ["WHISPER_PARALLEL_WORKERS"] = "0"
+    os.environ["AUDIO_WINDOW_SECONDS"] = str(WINDOW_SECONDS)
+    import numpy as np
+    from app import services
+    from app.audio_io import PcmWriter
+    from app.whisper_pool import model_registry
+    from benchmarks.fixtures import FakeWhisperModel
+
+    services.WHISPER_AVAILABLE = True
+    model_registry._loader = lambda model_size, device, compute_type: FakeWhisperModel(5000.0)
+    model_registry.warm_up(["base"], "cpu", "int8")
+
+    # Ten-second blocks of a tone followed by two seconds of silence, written straight to disk.
+    t = np.arange(SAMPLE_RATE * 10) / SAMPLE_RATE
+    block = (0.3 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+    block[-SAMPLE_RATE * 2:] = 0
+    with PcmWriter(os.path.join(workdir, "lecture.f32"), SAMPLE_RATE) as writer:
+        for _ in range(int(minutes * 6)):
+            writer.write(block)
+        audio = writer.close()
+
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    segments = sum(1 for _ in services.TranscriptionService.stream_segments(
+        audio, "base", report={}, compute_type="int8", beam_size=1
+    ))
+    assert segments > 0
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024 - baseline
+
+
+def _measure(minutes: float, workdir: str) -> float:
+    with multiprocessing.get_context("spawn").Pool(1) as pool:
+        return pool.apply(_peak_rss_growth_mb, (minutes, workdir))
+
+
+def test_transcription_memory_does_not_grow_with_lecture_length(tmp_path):
+    short = _measure(10, str(tmp_path))
+    long = _measure(40, str(tmp_path))
+
+    assert long < MAX_RSS_GROWTH_MB, f"40-minute lecture grew peak RSS by {long:.1f} MB"
+    assert long - short < MAX_LENGTH_GROWTH_MB, f"peak RSS grew {short:.1f} MB at 10 min and {long:.1f} MB at 40 min"
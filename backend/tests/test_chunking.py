@@ -0,0 +1,34 @@
+"""
+Per-chunk generation sends only the slide pages that match the chunk
+"""
+from app.chunking import slides_for_chunk
+
+SLIDES = "\n\n".join(
+    f"[Page {number}]\n{text}"
+    for number, text in enumerate([
+        "Introduction to thermodynamics and entropy",
+        "Entropy increases in isolated systems",
+        "Photosynthesis converts light energy",
+        "Course logistics and grading",
+    ], start=1)
+)
+
+
+def test_slides_for_chunk_keeps_matching_pages_in_order():
+    selected = slides_for_chunk(SLIDES, "Today: entropy in isolated systems and why thermodynamics cares.")
+
+    assert selected == (
+        "[Page 1]\nIntroduction to thermodynamics and entropy\n\n"
+        "[Page 2]\nEntropy increases in isolated systems"
+    )
+
+
+def test_slides_for_chunk_respects_the_budget():
+    selected = slides_for_chunk(SLIDES, "entropy in isolated systems and thermodynamics", max_chars=60)
+
+    assert selected == "[Page 2]\nEntropy increases in isolated systems"
+
+
+def test_slides_for_chunk_sends_nothing_without_a_match():
+    assert slides_for_chunk(SLIDES, "an unrelated aside about the weather") is None
+    assert slides_for_chunk(None, "entropy") is None
@@ -0,0 +1,17 @@
+"""
+Search snippets are safe to render as HTML
+"""
+from app.store import LectureStore
+
+
+def test_snippet_escapes_indexed_markup(tmp_path):
+    store = LectureStore(f"sqlite:///{tmp_path / 'lectureiq.db'}")
+    store.create_lecture("lecture-1", "Web security", {})
+    store.save_checkpoint("lecture-1", "slides", "[Page 1]\nNever trust <script>alert(1)</script> & friends")
+
+    results = store.search_index.search("script")["results"]
+
+    assert len(results) == 1
+    snippet = results[0]["snippet"]
+    assert "<script" not in snippet
+    assert "&lt;<mark>script</mark>&gt;alert(1)&lt;/<mark>script</mark>&gt; &amp; friends" in snippet
@@ -0,0 +1,32 @@
+"""
+The API imports without the ML stack, which loads on first use or in the background preload
+"""
+import os
+import sys
+import json
+import subprocess
+
+from benchmarks.bench_import_time import LAZY_MODULES
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_importing_the_app_leaves_ml_libraries_unloaded(tmp_path):
+    env = {
+        **os.environ,
+        "JOB_BACKEND": "thread",
+        "LECTURE_DB_URL": f"sqlite:///{tmp_path / 'lectureiq.db'}",
+        "PRELOAD_ON_STARTUP": "false",
+    }
+    completed = subprocess.run(
+        [sys.executable, "-c", "import sys, json, app.main; print(json.dumps(sorted(sys.modules)))"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, timeout=120,
+    )
+    assert completed.returncode == 0, completed.stderr[-2000:]
+
+    modules = json.loads(completed.stdout.strip().splitlines()[-1])
+    loaded = [
+        name for name in modules
+        if any(name == lazy or name.startswith(lazy + ".") for lazy in LAZY_MODULES)
+    ]
+    assert loaded == [], f"imported with app.main: {', '.join(loaded)}"
@@ -0,0 +1,56 @@
+"""
+Silence trimming removes pauses and leaves audio without pauses whole
+"""
+import numpy as np
+
+from app.vad import trim_silence
+
+SAMPLE_RATE = 16000
+SECONDS = 60
+
+
+def _timeline() -> np.ndarray:
+    return np.arange(SAMPLE_RATE * SECONDS) / SAMPLE_RATE
+
+
+def _trimmed_seconds(audio: np.ndarray) -> float:
+    return trim_silence(audio.astype(np.float32), SAMPLE_RATE, 1.0, 0.2).speech_seconds
+
+
+def test_constant_level_audio_is_kept_whole():
+    t = _timeline()
+    tone = 0.3 * np.sin(2 * np.pi * 220 * t)
+    noise = np.random.default_rng(0).normal(0, 0.05, len(t))
+
+    assert _trimmed_seconds(tone) == SECONDS
+    assert _trimmed_seconds(noise) == SECONDS
+
+
+def test_continuous_modulated_audio_is_kept_whole():
+    t = _timeline()
+    # Syllable-rate bursts under a slowly varying loudness, with no pause of a second or more.
+    speech = np.sin(2 * np.pi * 220 * t) * np.abs(np.sin(2 * np.pi * 2 * t)) * (0.6 + 0.4 * np.sin(2 * np.pi * 0.05 * t))
+
+    assert _trimmed_seconds(speech) == SECONDS
+
+
+def test_trimming_that_would_remove_most_audio_keeps_it_whole():
+    t = _timeline()
+    mostly_silent = 0.3 * np.sin(2 * np.pi * 220 * t)
+    mostly_silent[(t % 10) > 2] = 0
+
+    trimmed = trim_silence(mostly_silent.astype(np.float32), SAMPLE_RATE, 1.0, 0.2)
+
+    assert trimmed.regions == [(0, len(t))]
+    assert trimmed.to_original(30.0) == 30.0
+
+
+def test_pauses_are_trimmed():
+    t = _timeline()
+    lecture = 0.3 * np.sin(2 * np.pi * 220 * t)
+    lecture[(t % 10) > 8] = 0
+
+    trimmed = trim_silence(lecture.astype(np.float32), SAMPLE_RATE, 1.0, 0.2)
+
+    assert 48 < trimmed.speech_seconds < 52
+    assert trimmed.to_original(9.0) > 10.0
@@ -4,12 +4,16 @@ import { lectureDB, type Lecture } from '../utils/db'
 
 const API_BASE = import.meta.env.VITE_API_URL || 'http://localhost:8000'
 const HEALTH_CHECK_TIMEOUT = 10000 // 10 seconds for health check
+const JOB_POLL_INTERVAL = 3000 // 3 seconds between job status checks
+const SSE_FIRST_EVENT_TIMEOUT = 15000 // give up on the event stream if nothing arrives within 15 seconds
+const SSE_MAX_CONSECUTIVE_ERRORS = 3 // reconnect attempts without an event before falling back to polling
 
 export interface UploadResponse {
   lecture_id: string
   status: 'processing' | 'completed' | 'failed'
   message: string
   transcript?: string
+  segments?: Array<{ start: number; end: number; text: string }>
   notes?: string
   flashcards?: Array<{ question: string; answer: string; difficulty?: string }>
   quiz?: Array<{ 
@@ -21,8 +25,29 @@ export interface UploadResponse {
   error?: string
 }
 
+export interface JobStatusResponse {
+  job_id: string
+  lecture_id: string
+  status: 'queued' | 'running' | 'completed' | 'failed'
+  error?: string | null
+}
+
 export interface ProgressCallback {
-  (stage: 'waking' | 'uploading' | 'processing', progress?: number): void
+  (stage: 'waking' | 'uploading' | 'processing', progress?: number, detail?: string): void
+}
+
+const STAGE_DETAILS: Record<string, string> = {
+  audio: 'Extracting and preparing audio stream',
+  transcript: 'Transcribing speech to text',
+  slides: 'Reading slides',
+  generation: 'Generating notes, flashcards and quiz',
+}
+
+const ARTIFACT_DETAILS: Record<string, string> = {
+  transcript: 'Transcript ready, building study materials',
+  notes: 'Notes ready',
+  flashcards: 'Flashcards ready',
+  quiz: 'Quiz ready',
 }
 
 /**
@@ -53,6 +78,104 @@ async function checkServerConnection(onProgress?: ProgressCallback): Promise<boo
   }
 }
 
+/**
+ * Poll a processing job until it finishes, then fetch its study pack
+ */
+async function waitForJobResult(jobId: string, onProgress?: ProgressCallback): Promise<UploadResponse> {
+  let progress = 70
+  for (;;) {
+    const response = await fetch(`${API_BASE}/api/jobs/${jobId}`)
+    if (!response.ok) {
+      const error = await response.json().catch(() => ({ detail: 'Processing status unavailable' }))
+      throw new Error(error.detail || 'Processing status unavailable')
+    }
+
+    const job: JobStatusResponse = await response.json()
+    if (job.status === 'completed' || job.status === 'failed') break
+
+    progress = Math.min(progress + 1, 88)
+    onProgress?.('processing', progress)
+    await new Promise((resolve) => setTimeout(resolve, JOB_POLL_INTERVAL))
+  }
+
+  const resultResponse = await fetch(`${API_BASE}/api/jobs/${jobId}/result`)
+  if (!resultResponse.ok) {
+    throw new Error('Failed to fetch processing result')
+  }
+  return await resultResponse.json()
+}
+
+/**
+ * Follow a processing job over Server-Sent Events; resolves with its study pack.
+ * Rejects if the stream is unavailable so the caller can fall back to polling: when it closes,
+ * when reconnects keep failing, or when no event arrives in time (e.g. a proxy buffering the stream).
+ */
+function streamJobResult(jobId: string, onProgress?: ProgressCallback): Promise<UploadResponse> {
+  return new Promise((resolve, reject) => {
+    if (typeof EventSource === 'undefined') {
+      reject(new Error('Event streams are not supported'))
+      return
+    }
+
+    const source = new EventSource(`${API_BASE}/api/jobs/${jobId}/events`)
+    let progress = 70
+    let finished = false
+    let consecutiveErrors = 0
+    const giveUp = (reason: string) => {
+      if (finished) return
+      finished = true
+      clearTimeout(firstEventTimer)
+      source.close()
+      reject(new Error(reason))
+    }
+    const firstEventTimer = setTimeout(() => giveUp('No progress events received'), SSE_FIRST_EVENT_TIMEOUT)
+    const received = () => {
+      consecutiveErrors = 0
+      clearTimeout(firstEventTimer)
+    }
+    const report = (value: number, detail?: string) => {
+      progress = Math.max(progress, Math.min(value, 88))
+      onProgress?.('processing', progress, detail)
+    }
+
+    source.addEventListener('status', received)
+    source.addEventListener('stage', (event) => {
+      received()
+      const data = JSON.parse((event as MessageEvent).data)
+      if (data.state === 'started' && STAGE_DETAILS[data.stage]) {
+        report(progress, STAGE_DETAILS[data.stage])
+      }
+    })
+    source.addEventListener('transcription', (event) => {
+      received()
+      const data = JSON.parse((event as MessageEvent).data)
+      const percent: number = data.percent ?? 0
+      report(70 + percent / 10, `Transcribing speech to text (${percent}%)`)
+    })
+    source.addEventListener('artifact', (event) => {
+      received()
+      const data = JSON.parse((event as MessageEvent).data)
+      report(progress + 2, ARTIFACT_DETAILS[data.name])
+    })
+    source.addEventListener('result', (event) => {
+      finished = true
+      clearTimeout(firstEventTimer)
+      source.close()
+      resolve(JSON.parse((event as MessageEvent).data))
+    })
+    source.onerror = () => {
+      // EventSource reconnects on its own while the job is running; an unreachable server or a
+      // proxy that strips the stream keeps it reconnecting forever, so stop after a few attempts.
+      consecutiveErrors += 1
+      if (source.readyState === EventSource.CLOSED) {
+        giveUp('Progress stream closed')
+      } else if (consecutiveErrors >= SSE_MAX_CONSECUTIVE_ERRORS) {
+        giveUp(`Progress stream failed ${consecutiveErrors} times in a row`)
+      }
+    }
+  })
+}
+
 /**
  * Upload lecture to backend for processing, then save to IndexedDB
  */
@@ -90,7 +213,15 @@ export async function uploadAndProcessLecture(
     throw new Error(error.detail || 'Upload failed')
   }
 
-  const result: UploadResponse = await response.json()
+  const queued: { job_id?: string; error?: string } = await response.json()
+  if (!queued.job_id) {
+    throw new Error(queued.error || 'Upload failed')
+  }
+
+  const result = await streamJobResult(queued.job_id, onProgress).catch((error) => {
+    console.warn('Falling back to polling for job status:', error)
+    return waitForJobResult(queued.job_id!, onProgress)
+  })
   onProgress?.('processing', 90)
 
   // Create lecture object
@@ -14,6 +14,7 @@ export default function UploadForm() {
   const [uploadStage, setUploadStage] = useState<UploadStage>('idle');
   const [progressPercent, setProgressPercent] = useState(0);
   const [processingSeconds, setProcessingSeconds] = useState(0);
+  const [processingDetail, setProcessingDetail] = useState<string | null>(null);
   const [error, setError] = useState<string | null>(null);
 
   const formatFileSize = (bytes: number) => {
@@ -48,7 +49,7 @@ export default function UploadForm() {
         return {
           icon: Cpu,
           text: 'Processing your lecture...',
-          subtext: getProcessingHint(processingSeconds)
+          subtext: processingDetail ?? getProcessingHint(processingSeconds)
         }
       default:
         return {
@@ -103,9 +104,13 @@ export default function UploadForm() {
     setError(null);
     setProgressPercent(0);
     setProcessingSeconds(0);
+    setProcessingDetail(null);
 
-    const progressCallback: ProgressCallback = (stage, progress) => {
+    const progressCallback: ProgressCallback = (stage, progress, detail) => {
       setUploadStage(stage);
+      if (detail) {
+        setProcessingDetail(detail);
+      }
       if (typeof progress === 'number') {
         setProgressPercent((previous) => Math.max(previous, progress));
       }